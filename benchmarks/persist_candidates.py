@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable, List
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.db.candidate_repo import insert_candidate, insert_candidates
+from src.db.domain_repo import (
+    insert_block_domain_map,
+    insert_domain,
+    insert_domain_alias,
+    insert_domain_source,
+)
+from src.db.repo import insert_pdfs
+from src.db.schema import create_schema
+from src.pipeline.candidates import DomainCandidate
+from src.pipeline.merge_persist import persist_merge_results
+
+
+def synthetic_candidates(count: int, pdfs: int, cluster_size: int) -> List[DomainCandidate]:
+    return [
+        DomainCandidate(
+            candidate_id=f"pdf_{idx % pdfs}_b{idx:06d}",
+            candidate_name=f"Domain {idx // cluster_size} variant {idx % cluster_size}",
+            normalized_name=f"domain {idx // cluster_size}",
+            source_pdf_id=f"pdf_{idx % pdfs}",
+            source_block_id=f"pdf_{idx % pdfs}_b{idx:06d}",
+            heading_level=2,
+            representative_text=f"Representative text for candidate {idx}.",
+        )
+        for idx in range(count)
+    ]
+
+
+def per_row(conn: sqlite3.Connection, candidates: List[DomainCandidate], cluster_size: int) -> None:
+    for candidate in candidates:
+        insert_candidate(
+            conn,
+            candidate_id=candidate.candidate_id,
+            candidate_name=candidate.candidate_name,
+            normalized_name=candidate.normalized_name,
+            source_pdf_id=candidate.source_pdf_id,
+            source_block_id=candidate.source_block_id,
+            heading_level=candidate.heading_level,
+            representative_text=candidate.representative_text,
+        )
+    for start in range(0, len(candidates), cluster_size):
+        domain_id = f"domain_{start // cluster_size:06d}"
+        cluster = candidates[start : start + cluster_size]
+        insert_domain(conn, domain_id, cluster[0].candidate_name, "2025-01-01T00:00:00Z")
+        seen = set()
+        for candidate in cluster:
+            insert_domain_alias(
+                conn, domain_id, candidate.candidate_name, candidate.source_pdf_id, 2
+            )
+            insert_block_domain_map(conn, candidate.source_block_id, domain_id)
+            if candidate.source_pdf_id not in seen:
+                insert_domain_source(conn, domain_id, candidate.source_pdf_id)
+                seen.add(candidate.source_pdf_id)
+
+
+def batched(conn: sqlite3.Connection, candidates: List[DomainCandidate], cluster_size: int) -> None:
+    insert_candidates(conn, (asdict(candidate) for candidate in candidates))
+    clusters = [
+        {c.candidate_id for c in candidates[start : start + cluster_size]}
+        for start in range(0, len(candidates), cluster_size)
+    ]
+    persist_merge_results(
+        conn,
+        clusters=clusters,
+        candidates={c.candidate_id: c for c in candidates},
+        review_items=[],
+        persist_pairs=[],
+        created_at="2025-01-01T00:00:00Z",
+        preferred_display_language="en",
+        min_review_threshold=0.0,
+    )
+
+
+def time_strategy(
+    name: str,
+    strategy: Callable[[sqlite3.Connection, List[DomainCandidate], int], None],
+    candidates: List[DomainCandidate],
+    pdfs: int,
+    cluster_size: int,
+    workdir: Path,
+) -> float:
+    conn = sqlite3.connect(workdir / f"{name}.db")
+    try:
+        create_schema(conn)
+        insert_pdfs(
+            conn,
+            (
+                {
+                    "pdf_id": f"pdf_{idx}",
+                    "file_path": f"pdf_{idx}.pdf",
+                    "checksum": f"checksum_{idx}",
+                    "ingested_at": "2025-01-01T00:00:00Z",
+                }
+                for idx in range(pdfs)
+            ),
+        )
+        started = time.perf_counter()
+        strategy(conn, candidates, cluster_size)
+        return time.perf_counter() - started
+    finally:
+        conn.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare per-row commits with unit-of-work batches when persisting candidates."
+    )
+    parser.add_argument("--candidates", type=int, default=50_000)
+    parser.add_argument("--pdfs", type=int, default=200)
+    parser.add_argument("--cluster-size", type=int, default=5)
+    args = parser.parse_args()
+
+    candidates = synthetic_candidates(args.candidates, args.pdfs, args.cluster_size)
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        results = {
+            name: time_strategy(name, strategy, candidates, args.pdfs, args.cluster_size, workdir)
+            for name, strategy in (("per_row", per_row), ("batched", batched))
+        }
+    for name, seconds in results.items():
+        print(f"{name:>8}: {seconds:8.2f}s")
+    print(f" speedup: {results['per_row'] / results['batched']:8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
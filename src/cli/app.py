@@ -1,12 +1,31 @@
 ﻿from __future__ import annotations
 
+import math
 import sqlite3
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
 
 from rich.console import Console
 from src.config import load_config
-from src.db.schema import create_schema
-from src.db.token_usage_repo import get_latest_run_usage, get_total_usage
+from src.db.connection import connect
+from src.db.maintenance import TableSize, maintain_database, table_sizes
+from src.db.token_usage_repo import (
+    cache_hit_rate,
+    get_latest_run_usage,
+    get_total_cache_usage,
+    get_total_usage,
+)
+from src.pipeline.columnar import (
+    DEFAULT_CHUNK_ROWS,
+    EXPORT_FORMATS,
+    TABLE_NAMES,
+    export_tables,
+    import_tables,
+)
+from src.pipeline.pdf_registry import DEFAULT_HASH_WORKERS, register_pdf_directory
 from src.pipeline.run import run_pipeline
+from src.pipeline.run_lock import pipeline_lock
+from src.pipeline.watch import watch_directory
 
 
 def run_cli(args: list[str]) -> int:
@@ -17,7 +36,24 @@ def run_cli(args: list[str]) -> int:
         console.print("[bold]Domain Discovery CLI[/bold]")
         console.print("Usage:")
         console.print("  python src/main.py ui")
-        console.print("  python src/main.py run")
+        console.print(
+            "  python src/main.py run [--resume]  "
+            "(--resume skips PDFs already parsed; later stages rerun)"
+        )
+        console.print("  python src/main.py ingest <dir> [--link] [--workers N]")
+        console.print("  python src/main.py watch [dir]")
+        console.print("  python src/main.py db sizes")
+        console.print(
+            "  python src/main.py db maintain [--older-than-days N] [--max-cache-mb N] "
+            "[--full-vacuum]"
+        )
+        console.print(
+            "  python src/main.py export <dir> [--format parquet] [--chunk-rows N] "
+            "[--table NAME]"
+        )
+        console.print(
+            "  python src/main.py import <dir> [--format parquet] [--table NAME]"
+        )
         console.print("  python src/main.py help")
         console.print("")
         console.print("Current config:")
@@ -32,8 +68,15 @@ def run_cli(args: list[str]) -> int:
         return 0
 
     if args[0] == "run":
-        console.print("[bold]Running pipeline...[/bold]")
-        success = run_pipeline(config)
+        unexpected = [arg for arg in args[1:] if arg != "--resume"]
+        if unexpected:
+            console.print(f"[red]Unexpected argument:[/red] {unexpected[0]}")
+            return 1
+        resume = "--resume" in args[1:]
+        console.print(
+            "[bold]Resuming pipeline...[/bold]" if resume else "[bold]Running pipeline...[/bold]"
+        )
+        success = run_pipeline(config, resume=resume)
         if success:
             console.print("[green]Pipeline run completed.[/green]")
             _print_token_usage(console, config.db_path)
@@ -41,31 +84,264 @@ def run_cli(args: list[str]) -> int:
         console.print("[yellow]Pipeline run skipped (no PDFs or candidates).[/yellow]")
         return 1
 
+    if args[0] == "ingest":
+        return _run_ingest(console, config, args[1:])
+
+    if args[0] == "watch":
+        watch_dir = Path(args[1]) if len(args) > 1 else Path(config.pdf_storage_dir)
+        console.print(f"[bold]Watching {watch_dir} for new PDFs (Ctrl+C to stop)...[/bold]")
+        try:
+            watch_directory(
+                config,
+                watch_dir,
+                debounce_seconds=config.watch_debounce_seconds,
+                poll_seconds=config.watch_poll_seconds,
+            )
+        except KeyboardInterrupt:
+            console.print("Stopped watching.")
+        return 0
+
+    if args[0] == "db":
+        return _run_db(console, config, args[1:])
+
+    if args[0] in ("export", "import"):
+        return _run_columnar(console, config, args[0], args[1:])
+
     console.print(f"[red]Unknown command:[/red] {args[0]}")
     console.print("Use: python src/main.py help")
     return 1
 
 
+def _run_ingest(console: Console, config, args: list[str]) -> int:
+    usage = "[red]Usage:[/red] python src/main.py ingest <dir> [--link] [--workers N]"
+    directory = None
+    link = False
+    workers = DEFAULT_HASH_WORKERS
+    idx = 0
+    while idx < len(args):
+        arg = args[idx]
+        if arg == "--link":
+            link = True
+        elif arg == "--workers" and idx + 1 < len(args):
+            idx += 1
+            workers = _positive_int(args[idx])
+            if workers is None:
+                console.print(usage)
+                return 1
+        elif directory is None and not arg.startswith("--"):
+            directory = Path(arg)
+        else:
+            console.print(f"[red]Unexpected argument:[/red] {arg}")
+            return 1
+        idx += 1
+
+    if directory is None or not directory.is_dir():
+        console.print(usage)
+        return 1
+
+    conn = connect(config.db_path)
+    try:
+        result = register_pdf_directory(
+            conn,
+            directory,
+            Path(config.pdf_storage_dir),
+            link=link,
+            workers=workers,
+        )
+    finally:
+        conn.close()
+    console.print(
+        f"[green]Registered {len(result.registered)} PDFs[/green] "
+        f"({len(result.duplicates)} duplicates skipped)."
+    )
+    return 0
+
+
+def _run_columnar(console: Console, config, command: str, args: list[str]) -> int:
+    directory = None
+    export_format = EXPORT_FORMATS[0]
+    chunk_rows = DEFAULT_CHUNK_ROWS
+    tables: list[str] = []
+    idx = 0
+    while idx < len(args):
+        arg = args[idx]
+        if arg == "--format" and idx + 1 < len(args):
+            idx += 1
+            export_format = args[idx]
+        elif arg == "--chunk-rows" and idx + 1 < len(args):
+            idx += 1
+            parsed_rows = _positive_int(args[idx])
+            if parsed_rows is None:
+                console.print(f"[red]Invalid --chunk-rows:[/red] {args[idx]}")
+                return 1
+            chunk_rows = parsed_rows
+        elif arg == "--table" and idx + 1 < len(args):
+            idx += 1
+            tables.append(args[idx])
+        elif directory is None and not arg.startswith("--"):
+            directory = Path(arg)
+        else:
+            console.print(f"[red]Unexpected argument:[/red] {arg}")
+            return 1
+        idx += 1
+
+    if directory is None or (command == "import" and not directory.is_dir()):
+        console.print(f"[red]Usage:[/red] python src/main.py {command} <dir> [--format parquet]")
+        return 1
+    if export_format not in EXPORT_FORMATS:
+        console.print(f"[red]Unsupported format:[/red] {export_format}")
+        return 1
+    unknown = sorted(set(tables) - set(TABLE_NAMES))
+    if unknown:
+        console.print(f"[red]Unknown tables:[/red] {', '.join(unknown)}")
+        return 1
+
+    try:
+        if command == "export":
+            counts = export_tables(
+                config.db_path, directory, tables=tables or None, chunk_rows=chunk_rows
+            )
+        else:
+            with pipeline_lock(config.db_path) as acquired:
+                if not acquired:
+                    console.print(
+                        "[yellow]A pipeline run is in progress; try again later.[/yellow]"
+                    )
+                    return 1
+                conn = connect(config.db_path)
+                try:
+                    counts = import_tables(
+                        conn,
+                        directory,
+                        tables=tables or None,
+                        chunk_rows=chunk_rows,
+                        dtype=config.embedding_storage_dtype,
+                    )
+                finally:
+                    conn.close()
+    except (RuntimeError, sqlite3.Error) as exc:
+        console.print(f"[red]{exc}[/red]")
+        return 1
+    verb = "Exported" if command == "export" else "Imported"
+    for table, count in counts.items():
+        console.print(f"{verb} {count} rows of {table}.")
+    return 0
+
+
+def _run_db(console: Console, config, args: list[str]) -> int:
+    if args[:1] == ["sizes"]:
+        conn = connect(config.db_path, read_only=True)
+        try:
+            _print_table_sizes(console, table_sizes(conn))
+        finally:
+            conn.close()
+        return 0
+    if args[:1] != ["maintain"]:
+        console.print("[red]Usage:[/red] python src/main.py db sizes|maintain")
+        return 1
+
+    retention_days = config.cache_retention_days
+    max_cache_mb = config.cache_max_mb
+    full = False
+    rest = args[1:]
+    idx = 0
+    while idx < len(rest):
+        arg = rest[idx]
+        if arg in ("--older-than-days", "--max-cache-mb") and idx + 1 < len(rest):
+            idx += 1
+            value = _finite_float(rest[idx])
+            if value is None:
+                console.print(f"[red]Invalid {arg}:[/red] {rest[idx]}")
+                return 1
+            if arg == "--older-than-days":
+                retention_days = value
+            else:
+                max_cache_mb = value
+        elif arg == "--full-vacuum":
+            full = True
+        else:
+            console.print(f"[red]Unexpected argument:[/red] {arg}")
+            return 1
+        idx += 1
+
+    older_than = None
+    if retention_days > 0:
+        older_than = (datetime.now(timezone.utc) - timedelta(days=retention_days)).isoformat()
+    max_cache_bytes = int(max_cache_mb * 1024 * 1024) if max_cache_mb > 0 else None
+    with pipeline_lock(config.db_path) as acquired:
+        if not acquired:
+            console.print("[yellow]A pipeline run is in progress; try again later.[/yellow]")
+            return 1
+        conn = connect(config.db_path)
+        try:
+            report = maintain_database(
+                conn,
+                older_than=older_than,
+                max_cache_bytes=max_cache_bytes,
+                full=full,
+            )
+        finally:
+            conn.close()
+    for table, count in report.evicted.items():
+        if count:
+            console.print(f"Evicted {count} rows from {table}.")
+    action = "Full VACUUM" if report.full_vacuum else "Incremental VACUUM"
+    console.print(f"{action} freed {report.freed_pages} pages.")
+    _print_table_sizes(console, report.sizes_after)
+    return 0
+
+
+def _positive_int(value: str) -> int | None:
+    try:
+        number = int(value)
+    except ValueError:
+        return None
+    return number if number > 0 else None
+
+
+def _finite_float(value: str) -> float | None:
+    try:
+        number = float(value)
+    except ValueError:
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _print_table_sizes(console: Console, sizes: list[TableSize]) -> None:
+    console.print("[bold]Table sizes:[/bold]")
+    for size in sizes:
+        console.print(f"  {size.name}: {size.rows} rows, {size.bytes / 1024:.1f} KiB")
+
+
 def _print_token_usage(console: Console, db_path: str) -> None:
-    conn = sqlite3.connect(db_path)
+    conn = connect(db_path, read_only=True)
     try:
-        create_schema(conn)
         latest = get_latest_run_usage(conn)
         totals = get_total_usage(conn)
+        total_cache = get_total_cache_usage(conn)
         if not latest and not totals:
             console.print("[yellow]No token usage recorded yet.[/yellow]")
             return
         console.print("[bold]Token usage (latest run):[/bold]")
         if latest and latest.tokens_by_model:
             for model_name, total in latest.tokens_by_model.items():
-                console.print(f"  {model_name}: {total}")
+                cache = latest.cache_by_model.get(model_name, (0, 0))
+                console.print(f"  {model_name}: {total}{_format_cache_usage(*cache)}")
         else:
             console.print("  (no run usage available)")
         console.print("[bold]Token usage (cumulative):[/bold]")
         if totals:
             for model_name, total in totals.items():
-                console.print(f"  {model_name}: {total}")
+                cache = total_cache.get(model_name, (0, 0))
+                console.print(f"  {model_name}: {total}{_format_cache_usage(*cache)}")
         else:
             console.print("  (no totals available)")
     finally:
         conn.close()
+
+
+def _format_cache_usage(cache_hits: int, cache_misses: int) -> str:
+    rate = cache_hit_rate(cache_hits, cache_misses)
+    if rate is None:
+        return ""
+    return f" (embedding cache: {cache_hits}/{cache_hits + cache_misses} hits, {rate:.0%})"
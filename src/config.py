@@ -10,6 +10,10 @@ class AppConfig:
     embedding_model: str
     embedding_model_options: List[str]
     embedding_dimensions: dict[str, int]
+    embedding_storage_dtype: str
+    embedding_concurrency: int
+    embedding_batch_max_inputs: int
+    embedding_batch_max_tokens: int
     merge_threshold_name_only: float
     review_threshold_name_only: float
     merge_threshold_name_plus_summary: float
@@ -22,6 +26,12 @@ class AppConfig:
     rag_parser: str
     rag_parse_method: str
     rag_output_dir: str
+    parse_workers: int
+    parse_shard_pages: int
+    watch_debounce_seconds: float
+    watch_poll_seconds: float
+    cache_retention_days: float
+    cache_max_mb: float
     skip_processed_pdfs: bool
     artifact_dir: str
 
@@ -36,6 +46,10 @@ def load_config() -> AppConfig:
         embedding_model=getenv("EMBEDDING_MODEL", "text-embedding-3-small"),
         embedding_model_options=embedding_model_options,
         embedding_dimensions=embedding_dimensions,
+        embedding_storage_dtype=getenv("EMBEDDING_STORAGE_DTYPE", "float32"),
+        embedding_concurrency=int(getenv("EMBEDDING_CONCURRENCY", "4")),
+        embedding_batch_max_inputs=int(getenv("EMBEDDING_BATCH_MAX_INPUTS", "256")),
+        embedding_batch_max_tokens=int(getenv("EMBEDDING_BATCH_MAX_TOKENS", "32768")),
         merge_threshold_name_only=float(getenv("MERGE_THRESHOLD_NAME_ONLY", "0.90")),
         review_threshold_name_only=float(getenv("REVIEW_THRESHOLD_NAME_ONLY", "0.85")),
         merge_threshold_name_plus_summary=float(
@@ -55,6 +69,12 @@ def load_config() -> AppConfig:
         rag_parser=getenv("RAG_PARSER", "mineru"),
         rag_parse_method=getenv("RAG_PARSE_METHOD", "auto"),
         rag_output_dir=getenv("RAG_OUTPUT_DIR", "./data/rag_output"),
+        parse_workers=int(getenv("PARSE_WORKERS", "2")),
+        parse_shard_pages=int(getenv("PARSE_SHARD_PAGES", "100")),
+        watch_debounce_seconds=float(getenv("WATCH_DEBOUNCE_SECONDS", "10")),
+        watch_poll_seconds=float(getenv("WATCH_POLL_SECONDS", "2")),
+        cache_retention_days=float(getenv("CACHE_RETENTION_DAYS", "90")),
+        cache_max_mb=float(getenv("CACHE_MAX_MB", "0")),
         skip_processed_pdfs=getenv("SKIP_PROCESSED_PDFS", "true").lower() == "true",
         artifact_dir=getenv("ARTIFACT_DIR", "./artifacts"),
     )
@@ -1,7 +1,21 @@
 from __future__ import annotations
 
 import sqlite3
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List
+
+from src.db.connection import query
+from src.db.pagination import DEFAULT_PAGE_SIZE, RowFactory, iter_keyset
+from src.db.transaction import commit
+
+CANDIDATE_COLUMNS = (
+    "candidate_id",
+    "candidate_name",
+    "normalized_name",
+    "source_pdf_id",
+    "source_block_id",
+    "heading_level",
+    "representative_text",
+)
 
 
 def insert_candidate(
@@ -37,25 +51,63 @@ def insert_candidate(
             representative_text,
         ),
     )
-    conn.commit()
+    commit(conn)
 
 
-def list_candidates(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
-        """
-        SELECT candidate_id, candidate_name, normalized_name, source_pdf_id,
-               source_block_id, heading_level, representative_text
-        FROM domain_candidates
-        ORDER BY candidate_id;
+def insert_candidates(
+    conn: sqlite3.Connection, candidates: Iterable[Dict[str, Any]]
+) -> None:
+    conn.executemany(
         """
-    ).fetchall()
-    return [dict(row) for row in rows]
+        INSERT INTO domain_candidates(
+            candidate_id,
+            candidate_name,
+            normalized_name,
+            source_pdf_id,
+            source_block_id,
+            heading_level,
+            representative_text
+        )
+        VALUES(?, ?, ?, ?, ?, ?, ?);
+        """,
+        (
+            (
+                candidate["candidate_id"],
+                candidate["candidate_name"],
+                candidate["normalized_name"],
+                candidate["source_pdf_id"],
+                candidate["source_block_id"],
+                candidate["heading_level"],
+                candidate["representative_text"],
+            )
+            for candidate in candidates
+        ),
+    )
+    commit(conn)
+
+
+def iter_candidates(
+    conn: sqlite3.Connection,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    row_factory: RowFactory | None = None,
+) -> Iterator[Any]:
+    return iter_keyset(
+        conn,
+        "domain_candidates",
+        CANDIDATE_COLUMNS,
+        ("candidate_id",),
+        page_size=page_size,
+        row_factory=row_factory,
+    )
+
+
+def list_candidates(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    return list(iter_candidates(conn))
 
 
 def get_candidate(conn: sqlite3.Connection, candidate_id: str) -> Dict[str, Any] | None:
-    conn.row_factory = sqlite3.Row
-    row = conn.execute(
+    row = query(
+        conn,
         """
         SELECT candidate_id, candidate_name, normalized_name, source_pdf_id,
                source_block_id, heading_level, representative_text
@@ -66,3 +118,25 @@ def get_candidate(conn: sqlite3.Connection, candidate_id: str) -> Dict[str, Any]
         (candidate_id,),
     ).fetchone()
     return dict(row) if row else None
+
+
+def has_candidates_for_pdf(conn: sqlite3.Connection, pdf_id: str) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM domain_candidates WHERE source_pdf_id = ? LIMIT 1;", (pdf_id,)
+    ).fetchone()
+    return row is not None
+
+
+def list_unassigned_candidate_ids(conn: sqlite3.Connection) -> List[str]:
+    rows = conn.execute(
+        """
+        SELECT candidate_id
+        FROM domain_candidates
+        WHERE NOT EXISTS (
+            SELECT 1 FROM block_domain_map
+            WHERE block_domain_map.block_id = domain_candidates.source_block_id
+        )
+        ORDER BY candidate_id;
+        """
+    ).fetchall()
+    return [row[0] for row in rows]
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Sequence, Tuple
+from urllib.parse import quote
+
+from src.db.migrations import SCHEMA_VERSION, migrate, schema_version
+from src.db.transaction import in_unit_of_work
+
+BUSY_TIMEOUT_SECONDS = 30.0
+STATEMENT_CACHE_SIZE = 512
+CACHE_SIZE_KIB = 65536
+MMAP_SIZE_BYTES = 256 * 1024 * 1024
+IN_CLAUSE_CHUNK = 500
+
+_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL;",
+    f"PRAGMA cache_size = -{CACHE_SIZE_KIB};",
+    f"PRAGMA mmap_size = {MMAP_SIZE_BYTES};",
+    "PRAGMA temp_store = MEMORY;",
+    "PRAGMA foreign_keys = ON;",
+)
+
+_LOCAL = threading.local()
+
+
+def connect(db_path: str, read_only: bool = False) -> sqlite3.Connection:
+    if _is_memory(db_path):
+        if read_only:
+            raise ValueError("read-only connections require a database file")
+        conn = _open(db_path, uri=False)
+        migrate(conn)
+        return conn
+    if read_only:
+        uri = f"file:{quote(str(Path(db_path).resolve()))}?mode=ro"
+        if not Path(db_path).exists():
+            connect(db_path).close()
+        conn = _open(uri, uri=True)
+        if schema_version(conn) < SCHEMA_VERSION:
+            conn.close()
+            connect(db_path).close()
+            conn = _open(uri, uri=True)
+        conn.execute("PRAGMA query_only = ON;")
+        return conn
+    conn = _open(db_path, uri=False)
+    version = schema_version(conn)
+    if version == 0:
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL;")
+    conn.execute("PRAGMA journal_mode = WAL;")
+    if version != SCHEMA_VERSION:
+        migrate(conn)
+    return conn
+
+
+def get_connection(db_path: str, read_only: bool = False) -> sqlite3.Connection:
+    connections: Dict[Tuple[str, bool], sqlite3.Connection] = _thread_connections()
+    key = (db_path, read_only)
+    conn = connections.get(key)
+    if conn is None:
+        conn = connect(db_path, read_only=read_only)
+        connections[key] = conn
+    return conn
+
+
+def close_thread_connections() -> None:
+    connections = _thread_connections()
+    for conn in connections.values():
+        conn.close()
+    connections.clear()
+
+
+def query(conn: sqlite3.Connection, sql: str, params=()) -> sqlite3.Cursor:
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    return cursor.execute(sql, params)
+
+
+def iter_in_chunks(
+    conn: sqlite3.Connection,
+    sql_template: str,
+    keys: Iterable[Any],
+    params: Sequence[Any] = (),
+    repeat: int = 1,
+) -> Iterator[sqlite3.Row]:
+    for sql, chunk_params in _in_chunks(sql_template, keys, params, repeat):
+        yield from query(conn, sql, chunk_params)
+
+
+def execute_in_chunks(
+    conn: sqlite3.Connection,
+    sql_template: str,
+    keys: Iterable[Any],
+    params: Sequence[Any] = (),
+    repeat: int = 1,
+) -> int:
+    changed = 0
+    for sql, chunk_params in _in_chunks(sql_template, keys, params, repeat):
+        changed += conn.execute(sql, chunk_params).rowcount
+    return changed
+
+
+def insert_missing_rows(
+    conn: sqlite3.Connection,
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+) -> int:
+    cursor = conn.executemany(
+        f"INSERT OR IGNORE INTO {table}({', '.join(columns)}) "
+        f"VALUES({', '.join('?' for _ in columns)});",
+        rows,
+    )
+    return cursor.rowcount
+
+
+@contextmanager
+def foreign_keys_disabled(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    enabled = conn.execute("PRAGMA foreign_keys;").fetchone()[0]
+    if not enabled:
+        yield conn
+        return
+    if conn.in_transaction or in_unit_of_work(conn):
+        raise RuntimeError("foreign keys cannot be toggled inside an open transaction")
+    conn.execute("PRAGMA foreign_keys = OFF;")
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute("PRAGMA foreign_keys = ON;")
+
+
+def _in_chunks(
+    sql_template: str, keys: Iterable[Any], params: Sequence[Any], repeat: int
+) -> Iterator[Tuple[str, Tuple[Any, ...]]]:
+    unique = sorted(set(keys))
+    for start in range(0, len(unique), IN_CLAUSE_CHUNK):
+        chunk = unique[start : start + IN_CLAUSE_CHUNK]
+        placeholders = ", ".join("?" for _ in chunk)
+        yield sql_template.format(placeholders=placeholders), (*params, *(chunk * repeat))
+
+
+def _open(database: str, uri: bool) -> sqlite3.Connection:
+    conn = sqlite3.connect(
+        database,
+        timeout=BUSY_TIMEOUT_SECONDS,
+        cached_statements=STATEMENT_CACHE_SIZE,
+        uri=uri,
+    )
+    for pragma in _PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def _thread_connections() -> Dict[Tuple[str, bool], sqlite3.Connection]:
+    connections = getattr(_LOCAL, "connections", None)
+    if connections is None:
+        connections = {}
+        _LOCAL.connections = connections
+    return connections
+
+
+def _is_memory(db_path: str) -> bool:
+    return db_path == ":memory:" or db_path.startswith("file::memory:")
@@ -1,71 +1,112 @@
 ﻿from __future__ import annotations
 
 import sqlite3
-from typing import Any, Dict, Iterable, List
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List
+
+from src.db.pagination import DEFAULT_PAGE_SIZE, RowFactory, iter_keyset
+from src.db.transaction import commit
+
+CONTENT_BLOCK_BATCH_SIZE = 500
+CONTENT_BLOCK_COLUMNS = (
+    "block_id",
+    "pdf_id",
+    "section_path",
+    "heading_level",
+    "block_type",
+    "text",
+    "page_index",
+    "position_index",
+)
 
 
 def insert_content_blocks(
-    conn: sqlite3.Connection, blocks: Iterable[Dict[str, Any]]
-) -> None:
-    conn.executemany(
-        """
-        INSERT OR REPLACE INTO content_blocks(
-            block_id,
-            pdf_id,
-            section_path,
-            heading_level,
-            block_type,
-            text,
-            page_index,
-            position_index
+    conn: sqlite3.Connection,
+    blocks: Iterable[Dict[str, Any]],
+    batch_size: int = CONTENT_BLOCK_BATCH_SIZE,
+) -> int:
+    rows = (
+        (
+            block["block_id"],
+            block["pdf_id"],
+            block.get("section_path"),
+            block.get("heading_level"),
+            block.get("block_type"),
+            block.get("text"),
+            block.get("page_index"),
+            block.get("position_index"),
         )
-        VALUES(?, ?, ?, ?, ?, ?, ?, ?);
-        """,
-        [
-            (
-                block["block_id"],
-                block["pdf_id"],
-                block.get("section_path"),
-                block.get("heading_level"),
-                block.get("block_type"),
-                block.get("text"),
-                block.get("page_index"),
-                block.get("position_index"),
+        for block in blocks
+    )
+    inserted = 0
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        conn.executemany(
+            """
+            INSERT INTO content_blocks(
+                block_id,
+                pdf_id,
+                section_path,
+                heading_level,
+                block_type,
+                text,
+                page_index,
+                position_index
             )
-            for block in blocks
-        ],
+            VALUES(?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(block_id) DO UPDATE SET
+                pdf_id = excluded.pdf_id,
+                section_path = excluded.section_path,
+                heading_level = excluded.heading_level,
+                block_type = excluded.block_type,
+                text = excluded.text,
+                page_index = excluded.page_index,
+                position_index = excluded.position_index;
+            """,
+            batch,
+        )
+        inserted += len(batch)
+    commit(conn)
+    return inserted
+
+
+def iter_content_block_rows(
+    conn: sqlite3.Connection,
+    pdf_id: str | None = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    row_factory: RowFactory | None = None,
+) -> Iterator[Any]:
+    if pdf_id is None:
+        return iter_keyset(
+            conn,
+            "content_blocks",
+            CONTENT_BLOCK_COLUMNS,
+            ("pdf_id", "position_index", "block_id"),
+            page_size=page_size,
+            row_factory=row_factory,
+        )
+    return iter_keyset(
+        conn,
+        "content_blocks",
+        CONTENT_BLOCK_COLUMNS,
+        ("position_index", "block_id"),
+        where="pdf_id = ?",
+        params=(pdf_id,),
+        page_size=page_size,
+        row_factory=row_factory,
     )
-    conn.commit()
 
 
 def list_content_blocks(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
-        """
-        SELECT block_id, pdf_id, section_path, heading_level, block_type,
-               text, page_index, position_index
-        FROM content_blocks
-        ORDER BY pdf_id, position_index;
-        """
-    ).fetchall()
-    return [dict(row) for row in rows]
+    return list(iter_content_block_rows(conn))
 
 
 def list_content_blocks_by_pdf(
     conn: sqlite3.Connection, pdf_id: str
 ) -> List[Dict[str, Any]]:
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
-        """
-        SELECT block_id, pdf_id, section_path, heading_level, block_type,
-               text, page_index, position_index
-        FROM content_blocks
-        WHERE pdf_id = ?
-        ORDER BY position_index;
-        """,
-        (pdf_id,),
-    ).fetchall()
-    return [dict(row) for row in rows]
+    return list(iter_content_block_rows(conn, pdf_id))
 
 
 def has_content_blocks_for_pdf(conn: sqlite3.Connection, pdf_id: str) -> bool:
@@ -77,9 +118,9 @@ def has_content_blocks_for_pdf(conn: sqlite3.Connection, pdf_id: str) -> bool:
 
 def delete_content_blocks_for_pdf(conn: sqlite3.Connection, pdf_id: str) -> None:
     conn.execute("DELETE FROM content_blocks WHERE pdf_id = ?;", (pdf_id,))
-    conn.commit()
+    commit(conn)
 
 
 def clear_content_blocks(conn: sqlite3.Connection) -> None:
     conn.execute("DELETE FROM content_blocks;")
-    conn.commit()
+    commit(conn)
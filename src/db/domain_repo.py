@@ -1,7 +1,11 @@
 from __future__ import annotations
 
 import sqlite3
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
+
+from src.db.connection import execute_in_chunks, iter_in_chunks
+from src.db.pagination import DEFAULT_PAGE_SIZE, RowFactory, iter_keyset
+from src.db.transaction import commit
 
 
 def insert_domain(
@@ -14,15 +18,68 @@ def insert_domain(
         """,
         (domain_id, display_name, created_at),
     )
-    conn.commit()
+    commit(conn)
+
+
+def insert_domains(
+    conn: sqlite3.Connection, domains: Iterable[Tuple[str, str, str]]
+) -> None:
+    conn.executemany(
+        """
+        INSERT INTO domains(domain_id, display_name, created_at)
+        VALUES(?, ?, ?);
+        """,
+        domains,
+    )
+    commit(conn)
+
+
+def iter_domains(
+    conn: sqlite3.Connection,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    row_factory: RowFactory | None = None,
+) -> Iterator[Any]:
+    return iter_keyset(
+        conn,
+        "domains",
+        ("domain_id", "display_name", "created_at"),
+        ("domain_id",),
+        page_size=page_size,
+        row_factory=row_factory,
+    )
 
 
 def list_domains(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
-        "SELECT domain_id, display_name, created_at FROM domains ORDER BY domain_id;"
-    ).fetchall()
-    return [dict(row) for row in rows]
+    return list(iter_domains(conn))
+
+
+def next_domain_number(conn: sqlite3.Connection) -> int:
+    row = conn.execute(
+        """
+        SELECT MAX(CAST(SUBSTR(domain_id, 8) AS INTEGER))
+        FROM domains
+        WHERE domain_id GLOB 'domain_[0-9]*';
+        """
+    ).fetchone()
+    return (row[0] or 0) + 1
+
+
+def delete_domains(conn: sqlite3.Connection, domain_ids: Iterable[str]) -> None:
+    execute_in_chunks(
+        conn, "DELETE FROM domains WHERE domain_id IN ({placeholders});", domain_ids
+    )
+    commit(conn)
+
+
+def get_domain_ids_for_blocks(
+    conn: sqlite3.Connection, block_ids: Iterable[str]
+) -> Set[str]:
+    rows = iter_in_chunks(
+        conn,
+        "SELECT DISTINCT domain_id FROM block_domain_map WHERE block_id IN ({placeholders});",
+        block_ids,
+    )
+    return {row[0] for row in rows}
 
 
 def insert_domain_alias(
@@ -34,12 +91,29 @@ def insert_domain_alias(
 ) -> None:
     conn.execute(
         """
-        INSERT OR REPLACE INTO domain_aliases(domain_id, alias, source_pdf_id, heading_level)
-        VALUES(?, ?, ?, ?);
+        INSERT INTO domain_aliases(domain_id, alias, source_pdf_id, heading_level)
+        VALUES(?, ?, ?, ?)
+        ON CONFLICT(domain_id, alias, source_pdf_id) DO UPDATE SET
+            heading_level = excluded.heading_level;
         """,
         (domain_id, alias, source_pdf_id, heading_level),
     )
-    conn.commit()
+    commit(conn)
+
+
+def insert_domain_aliases(
+    conn: sqlite3.Connection, aliases: Iterable[Tuple[str, str, str, int]]
+) -> None:
+    conn.executemany(
+        """
+        INSERT INTO domain_aliases(domain_id, alias, source_pdf_id, heading_level)
+        VALUES(?, ?, ?, ?)
+        ON CONFLICT(domain_id, alias, source_pdf_id) DO UPDATE SET
+            heading_level = excluded.heading_level;
+        """,
+        aliases,
+    )
+    commit(conn)
 
 
 def insert_domain_source(conn: sqlite3.Connection, domain_id: str, pdf_id: str) -> None:
@@ -50,7 +124,20 @@ def insert_domain_source(conn: sqlite3.Connection, domain_id: str, pdf_id: str)
         """,
         (domain_id, pdf_id),
     )
-    conn.commit()
+    commit(conn)
+
+
+def insert_domain_sources(
+    conn: sqlite3.Connection, sources: Iterable[Tuple[str, str]]
+) -> None:
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO domain_sources(domain_id, pdf_id)
+        VALUES(?, ?);
+        """,
+        sources,
+    )
+    commit(conn)
 
 
 def insert_block_domain_map(
@@ -63,40 +150,74 @@ def insert_block_domain_map(
         """,
         (block_id, domain_id),
     )
-    conn.commit()
+    commit(conn)
 
 
-def list_domain_aliases(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
-        """
-        SELECT domain_id, alias, source_pdf_id, heading_level
-        FROM domain_aliases
-        ORDER BY domain_id, alias;
+def insert_block_domain_maps(
+    conn: sqlite3.Connection, mappings: Iterable[Tuple[str, str]]
+) -> None:
+    conn.executemany(
         """
-    ).fetchall()
-    return [dict(row) for row in rows]
+        INSERT OR REPLACE INTO block_domain_map(block_id, domain_id)
+        VALUES(?, ?);
+        """,
+        mappings,
+    )
+    commit(conn)
+
+
+def iter_domain_aliases(
+    conn: sqlite3.Connection,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    row_factory: RowFactory | None = None,
+) -> Iterator[Any]:
+    return iter_keyset(
+        conn,
+        "domain_aliases",
+        ("domain_id", "alias", "source_pdf_id", "heading_level"),
+        ("domain_id", "alias", "source_pdf_id"),
+        page_size=page_size,
+        row_factory=row_factory,
+    )
+
+
+def list_domain_aliases(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    return list(iter_domain_aliases(conn))
+
+
+def iter_domain_sources(
+    conn: sqlite3.Connection,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    row_factory: RowFactory | None = None,
+) -> Iterator[Any]:
+    return iter_keyset(
+        conn,
+        "domain_sources",
+        ("domain_id", "pdf_id"),
+        ("domain_id", "pdf_id"),
+        page_size=page_size,
+        row_factory=row_factory,
+    )
 
 
 def list_domain_sources(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
-        """
-        SELECT domain_id, pdf_id
-        FROM domain_sources
-        ORDER BY domain_id, pdf_id;
-        """
-    ).fetchall()
-    return [dict(row) for row in rows]
+    return list(iter_domain_sources(conn))
+
+
+def iter_block_domain_map(
+    conn: sqlite3.Connection,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    row_factory: RowFactory | None = None,
+) -> Iterator[Any]:
+    return iter_keyset(
+        conn,
+        "block_domain_map",
+        ("block_id", "domain_id"),
+        ("block_id", "domain_id"),
+        page_size=page_size,
+        row_factory=row_factory,
+    )
 
 
 def list_block_domain_map(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
-        """
-        SELECT block_id, domain_id
-        FROM block_domain_map
-        ORDER BY block_id, domain_id;
-        """
-    ).fetchall()
-    return [dict(row) for row in rows]
+    return list(iter_block_domain_map(conn))
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from src.db.connection import execute_in_chunks, iter_in_chunks
+from src.db.embedding_repo import DEFAULT_VECTOR_DTYPE, decode_vector, encode_vector
+from src.db.transaction import commit
+
+
+def get_cached_embeddings(
+    conn: sqlite3.Connection,
+    text_hashes: Iterable[str],
+    model_name: str,
+    dimensions: int,
+) -> Dict[str, List[float]]:
+    rows = iter_in_chunks(
+        conn,
+        """
+        SELECT text_hash, vector, dtype
+        FROM embedding_cache
+        WHERE model_name = ? AND dimensions = ? AND text_hash IN ({placeholders});
+        """,
+        text_hashes,
+        (model_name, dimensions),
+    )
+    return {
+        row["text_hash"]: decode_vector(row["vector"], row["dtype"]).tolist()
+        for row in rows
+    }
+
+
+def set_cached_embeddings(
+    conn: sqlite3.Connection,
+    entries: Iterable[Tuple[str, Sequence[float]]],
+    model_name: str,
+    dimensions: int,
+    created_at: str,
+    dtype: str = DEFAULT_VECTOR_DTYPE,
+) -> None:
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO embedding_cache(
+            text_hash, model_name, dimensions, vector, dtype, created_at, last_used_at
+        )
+        VALUES(?, ?, ?, ?, ?, ?, ?);
+        """,
+        (
+            (
+                text_hash,
+                model_name,
+                dimensions,
+                encode_vector(vector, dtype)[0],
+                dtype,
+                created_at,
+                created_at,
+            )
+            for text_hash, vector in entries
+        ),
+    )
+    commit(conn)
+
+
+def touch_cached_embeddings(
+    conn: sqlite3.Connection,
+    text_hashes: Iterable[str],
+    model_name: str,
+    dimensions: int,
+    used_at: str,
+) -> None:
+    execute_in_chunks(
+        conn,
+        """
+        UPDATE embedding_cache
+        SET last_used_at = ?
+        WHERE model_name = ? AND dimensions = ? AND text_hash IN ({placeholders});
+        """,
+        text_hashes,
+        (used_at, model_name, dimensions),
+    )
+    commit(conn)
@@ -1,29 +1,49 @@
 from __future__ import annotations
 
-import sqlite3
 import json
-from typing import Any, Dict, List
+import sqlite3
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.db.pagination import DEFAULT_PAGE_SIZE, RowFactory, iter_keyset
+from src.db.transaction import commit
+
+VECTOR_DTYPES = {"float32": np.float32, "float16": np.float16}
+DEFAULT_VECTOR_DTYPE = "float32"
+
+VectorInput = Union[str, Sequence[float], np.ndarray]
 
 
 def insert_candidate_embedding(
     conn: sqlite3.Connection,
     candidate_id: str,
     model_name: str,
-    vector: str,
+    vector: VectorInput,
     token_count: int,
     tokenization_mode: str,
+    dtype: str = DEFAULT_VECTOR_DTYPE,
 ) -> None:
-    _ensure_json_vector(vector)
-    conn.execute(
+    insert_candidate_embeddings(
+        conn, [(candidate_id, model_name, vector, token_count, tokenization_mode)], dtype
+    )
+
+
+def insert_candidate_embeddings(
+    conn: sqlite3.Connection,
+    rows: Iterable[Tuple[str, str, VectorInput, int, str]],
+    dtype: str = DEFAULT_VECTOR_DTYPE,
+) -> None:
+    conn.executemany(
         """
         INSERT OR REPLACE INTO candidate_embeddings(
-            candidate_id, model_name, vector, token_count, tokenization_mode
+            candidate_id, model_name, vector, dim, dtype, token_count, tokenization_mode
         )
-        VALUES(?, ?, ?, ?, ?);
+        VALUES(?, ?, ?, ?, ?, ?, ?);
         """,
-        (candidate_id, model_name, vector, token_count, tokenization_mode),
+        _encoded_rows(rows, dtype),
     )
-    conn.commit()
+    commit(conn)
 
 
 def insert_candidate_embedding_vector(
@@ -38,7 +58,7 @@ def insert_candidate_embedding_vector(
         conn,
         candidate_id=candidate_id,
         model_name=model_name,
-        vector=json.dumps(vector),
+        vector=vector,
         token_count=token_count,
         tokenization_mode=tokenization_mode,
     )
@@ -48,21 +68,31 @@ def insert_domain_embedding(
     conn: sqlite3.Connection,
     domain_id: str,
     model_name: str,
-    vector: str,
+    vector: VectorInput,
     token_count: int,
     tokenization_mode: str,
+    dtype: str = DEFAULT_VECTOR_DTYPE,
+) -> None:
+    insert_domain_embeddings(
+        conn, [(domain_id, model_name, vector, token_count, tokenization_mode)], dtype
+    )
+
+
+def insert_domain_embeddings(
+    conn: sqlite3.Connection,
+    rows: Iterable[Tuple[str, str, VectorInput, int, str]],
+    dtype: str = DEFAULT_VECTOR_DTYPE,
 ) -> None:
-    _ensure_json_vector(vector)
-    conn.execute(
+    conn.executemany(
         """
         INSERT OR REPLACE INTO domain_embeddings(
-            domain_id, model_name, vector, token_count, tokenization_mode
+            domain_id, model_name, vector, dim, dtype, token_count, tokenization_mode
         )
-        VALUES(?, ?, ?, ?, ?);
+        VALUES(?, ?, ?, ?, ?, ?, ?);
         """,
-        (domain_id, model_name, vector, token_count, tokenization_mode),
+        _encoded_rows(rows, dtype),
     )
-    conn.commit()
+    commit(conn)
 
 
 def insert_domain_embedding_vector(
@@ -77,41 +107,115 @@ def insert_domain_embedding_vector(
         conn,
         domain_id=domain_id,
         model_name=model_name,
-        vector=json.dumps(vector),
+        vector=vector,
         token_count=token_count,
         tokenization_mode=tokenization_mode,
     )
 
 
-def list_candidate_embeddings(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
-        """
-        SELECT candidate_id, model_name, vector, token_count, tokenization_mode
-        FROM candidate_embeddings
-        ORDER BY candidate_id;
-        """
-    ).fetchall()
-    return [dict(row) for row in rows]
+def iter_candidate_embeddings(
+    conn: sqlite3.Connection,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    row_factory: RowFactory | None = None,
+) -> Iterator[Any]:
+    return iter_keyset(
+        conn,
+        "candidate_embeddings",
+        ("candidate_id", "model_name", "vector", "dim", "dtype", "token_count", "tokenization_mode"),
+        ("candidate_id",),
+        page_size=page_size,
+        row_factory=row_factory,
+    )
 
 
-def list_domain_embeddings(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
-        """
-        SELECT domain_id, model_name, vector, token_count, tokenization_mode
-        FROM domain_embeddings
-        ORDER BY domain_id;
-        """
-    ).fetchall()
-    return [dict(row) for row in rows]
+def list_candidate_embeddings(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    return list(iter_candidate_embeddings(conn))
 
 
-def parse_vector(vector_text: str) -> List[float]:
-    return json.loads(vector_text)
+def iter_domain_embeddings(
+    conn: sqlite3.Connection,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    row_factory: RowFactory | None = None,
+) -> Iterator[Any]:
+    return iter_keyset(
+        conn,
+        "domain_embeddings",
+        ("domain_id", "model_name", "vector", "dim", "dtype", "token_count", "tokenization_mode"),
+        ("domain_id",),
+        page_size=page_size,
+        row_factory=row_factory,
+    )
 
 
-def _ensure_json_vector(vector_text: str) -> None:
-    parsed = json.loads(vector_text)
-    if not isinstance(parsed, list):
-        raise ValueError("vector must be a JSON array")
+def list_domain_embeddings(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    return list(iter_domain_embeddings(conn))
+
+
+def load_candidate_embedding_matrix(
+    conn: sqlite3.Connection, model_name: str | None = None
+) -> Tuple[List[str], np.ndarray]:
+    return _load_matrix(conn, "candidate_embeddings", "candidate_id", model_name)
+
+
+def load_domain_embedding_matrix(
+    conn: sqlite3.Connection, model_name: str | None = None
+) -> Tuple[List[str], np.ndarray]:
+    return _load_matrix(conn, "domain_embeddings", "domain_id", model_name)
+
+
+def encode_vector(
+    vector: VectorInput, dtype: str = DEFAULT_VECTOR_DTYPE
+) -> Tuple[bytes, int]:
+    if dtype not in VECTOR_DTYPES:
+        raise ValueError(f"unsupported vector dtype: {dtype}")
+    if isinstance(vector, str):
+        try:
+            vector = json.loads(vector)
+        except json.JSONDecodeError as exc:
+            raise ValueError("vector must be a JSON array") from exc
+        if not isinstance(vector, list):
+            raise ValueError("vector must be a JSON array")
+    array = np.asarray(vector, dtype=VECTOR_DTYPES[dtype])
+    if array.ndim != 1 or array.size == 0:
+        raise ValueError("vector must be a non-empty one-dimensional sequence")
+    return array.tobytes(), int(array.size)
+
+
+def decode_vector(blob: bytes, dtype: str = DEFAULT_VECTOR_DTYPE) -> np.ndarray:
+    return np.frombuffer(blob, dtype=VECTOR_DTYPES[dtype])
+
+
+def parse_vector(vector: bytes | str, dtype: str = DEFAULT_VECTOR_DTYPE) -> List[float]:
+    if isinstance(vector, str):
+        return json.loads(vector)
+    return decode_vector(vector, dtype).astype(np.float64).tolist()
+
+
+def _encoded_rows(
+    rows: Iterable[Tuple[str, str, VectorInput, int, str]], dtype: str
+) -> Iterable[Tuple[str, str, bytes, int, str, int, str]]:
+    for key, model_name, vector, token_count, tokenization_mode in rows:
+        blob, dim = encode_vector(vector, dtype)
+        yield key, model_name, blob, dim, dtype, token_count, tokenization_mode
+
+
+def _load_matrix(
+    conn: sqlite3.Connection, table: str, key_column: str, model_name: str | None
+) -> Tuple[List[str], np.ndarray]:
+    sql = f"SELECT {key_column}, vector, dim, dtype FROM {table}"
+    params: Tuple[str, ...] = ()
+    if model_name is not None:
+        sql += " WHERE model_name = ?"
+        params = (model_name,)
+    rows = conn.execute(sql + f" ORDER BY {key_column};", params).fetchall()
+    if not rows:
+        return [], np.zeros((0, 0), dtype=np.float32)
+    layouts = {(row[2], row[3]) for row in rows}
+    if len(layouts) != 1:
+        raise ValueError(f"{table} mixes vector layouts: {sorted(layouts)}")
+    dim, dtype = layouts.pop()
+    matrix = np.frombuffer(b"".join(row[1] for row in rows), dtype=VECTOR_DTYPES[dtype])
+    matrix = matrix.reshape(len(rows), dim)
+    if dtype != "float32":
+        matrix = matrix.astype(np.float32)
+    return [row[0] for row in rows], matrix
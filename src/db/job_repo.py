@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List
+
+from src.db.connection import query
+from src.db.transaction import commit
+
+ACTIVE_JOB_STATUSES = ("queued", "running")
+FINISHED_JOB_STATUSES = ("completed", "skipped", "busy", "failed", "cancelled")
+JOB_LOG_TAIL_LINES = 200
+
+_JOB_COLUMNS = """
+    job_id, kind, status, progress, stage, log_tail, params, error,
+    cancel_requested, owner, created_at, started_at, heartbeat_at, finished_at
+"""
+
+
+def create_job(
+    conn: sqlite3.Connection,
+    job_id: str,
+    kind: str,
+    created_at: str,
+    params: Dict[str, Any] | None = None,
+) -> bool:
+    cursor = conn.execute(
+        """
+        INSERT OR IGNORE INTO jobs(job_id, kind, status, params, created_at)
+        VALUES(?, ?, 'queued', ?, ?);
+        """,
+        (job_id, kind, json.dumps(params) if params is not None else None, created_at),
+    )
+    commit(conn)
+    return cursor.rowcount == 1
+
+
+def get_job(conn: sqlite3.Connection, job_id: str) -> Dict[str, Any] | None:
+    row = query(
+        conn, f"SELECT {_JOB_COLUMNS} FROM jobs WHERE job_id = ?;", (job_id,)
+    ).fetchone()
+    return _job_from_row(row) if row else None
+
+
+def get_active_job(conn: sqlite3.Connection, kind: str) -> Dict[str, Any] | None:
+    row = query(
+        conn,
+        f"""
+        SELECT {_JOB_COLUMNS}
+        FROM jobs
+        WHERE kind = ? AND status IN ('queued', 'running');
+        """,
+        (kind,),
+    ).fetchone()
+    return _job_from_row(row) if row else None
+
+
+def list_recent_jobs(
+    conn: sqlite3.Connection, kind: str, limit: int = 10
+) -> List[Dict[str, Any]]:
+    rows = query(
+        conn,
+        f"""
+        SELECT {_JOB_COLUMNS}
+        FROM jobs
+        WHERE kind = ?
+        ORDER BY created_at DESC, job_id DESC
+        LIMIT ?;
+        """,
+        (kind, limit),
+    ).fetchall()
+    return [_job_from_row(row) for row in rows]
+
+
+def start_job(conn: sqlite3.Connection, job_id: str, owner: str, now: str) -> bool:
+    cursor = conn.execute(
+        """
+        UPDATE jobs
+        SET status = 'running', owner = ?, started_at = ?, heartbeat_at = ?
+        WHERE job_id = ? AND status = 'queued' AND cancel_requested = 0;
+        """,
+        (owner, now, now, job_id),
+    )
+    commit(conn)
+    return cursor.rowcount == 1
+
+
+def update_job_progress(
+    conn: sqlite3.Connection,
+    job_id: str,
+    stage: str,
+    progress: float,
+    now: str,
+) -> None:
+    conn.execute(
+        """
+        UPDATE jobs
+        SET stage = ?, progress = ?, heartbeat_at = ?
+        WHERE job_id = ?;
+        """,
+        (stage, min(max(progress, 0.0), 1.0), now, job_id),
+    )
+    commit(conn)
+
+
+def append_job_log(
+    conn: sqlite3.Connection,
+    job_id: str,
+    lines: Iterable[str],
+    max_lines: int = JOB_LOG_TAIL_LINES,
+) -> None:
+    row = conn.execute("SELECT log_tail FROM jobs WHERE job_id = ?;", (job_id,)).fetchone()
+    if row is None:
+        return
+    tail = row[0].splitlines() if row[0] else []
+    tail.extend(line.rstrip("\n") for line in lines)
+    conn.execute(
+        "UPDATE jobs SET log_tail = ? WHERE job_id = ?;",
+        ("\n".join(tail[-max_lines:]), job_id),
+    )
+    commit(conn)
+
+
+def heartbeat_job(conn: sqlite3.Connection, job_id: str, now: str) -> bool:
+    cursor = conn.execute(
+        "UPDATE jobs SET heartbeat_at = ? WHERE job_id = ? AND status = 'running';",
+        (now, job_id),
+    )
+    commit(conn)
+    return cursor.rowcount == 1
+
+
+def request_job_cancel(conn: sqlite3.Connection, job_id: str) -> bool:
+    cursor = conn.execute(
+        """
+        UPDATE jobs
+        SET cancel_requested = 1
+        WHERE job_id = ? AND status IN ('queued', 'running');
+        """,
+        (job_id,),
+    )
+    commit(conn)
+    return cursor.rowcount == 1
+
+
+def is_job_cancel_requested(conn: sqlite3.Connection, job_id: str) -> bool:
+    row = conn.execute(
+        "SELECT cancel_requested FROM jobs WHERE job_id = ?;", (job_id,)
+    ).fetchone()
+    return bool(row and row[0])
+
+
+def finish_job(
+    conn: sqlite3.Connection,
+    job_id: str,
+    status: str,
+    now: str,
+    error: str | None = None,
+) -> None:
+    if status not in FINISHED_JOB_STATUSES:
+        raise ValueError(f"unsupported job status: {status}")
+    conn.execute(
+        """
+        UPDATE jobs
+        SET status = ?, error = ?, finished_at = ?, heartbeat_at = ?,
+            progress = CASE WHEN ? = 'completed' THEN 1.0 ELSE progress END
+        WHERE job_id = ?;
+        """,
+        (status, error, now, now, status, job_id),
+    )
+    commit(conn)
+
+
+def fail_stale_jobs(
+    conn: sqlite3.Connection, now: datetime, stale_after_seconds: float
+) -> int:
+    cutoff = (now - timedelta(seconds=stale_after_seconds)).isoformat()
+    cursor = conn.execute(
+        """
+        UPDATE jobs
+        SET status = 'failed', error = 'Worker stopped responding.', finished_at = ?
+        WHERE status IN ('queued', 'running')
+          AND COALESCE(heartbeat_at, created_at) < ?;
+        """,
+        (now.isoformat(), cutoff),
+    )
+    commit(conn)
+    return cursor.rowcount
+
+
+def _job_from_row(row: sqlite3.Row) -> Dict[str, Any]:
+    job = dict(row)
+    job["params"] = json.loads(job["params"]) if job["params"] else {}
+    job["cancel_requested"] = bool(job["cancel_requested"])
+    return job
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+from src.db.connection import query
+
+
+def acquire_lock(
+    conn: sqlite3.Connection,
+    name: str,
+    owner: str,
+    now: datetime,
+    stale_after_seconds: float,
+) -> bool:
+    conn.execute("BEGIN IMMEDIATE;")
+    try:
+        row = conn.execute(
+            "SELECT owner, heartbeat_at FROM pipeline_locks WHERE name = ?;",
+            (name,),
+        ).fetchone()
+        if row and row[0] != owner:
+            heartbeat_at = datetime.fromisoformat(row[1])
+            if now - heartbeat_at < timedelta(seconds=stale_after_seconds):
+                conn.rollback()
+                return False
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO pipeline_locks(name, owner, acquired_at, heartbeat_at)
+            VALUES(?, ?, ?, ?);
+            """,
+            (name, owner, now.isoformat(), now.isoformat()),
+        )
+        conn.commit()
+        return True
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def refresh_lock(
+    conn: sqlite3.Connection, name: str, owner: str, now: datetime
+) -> bool:
+    cursor = conn.execute(
+        "UPDATE pipeline_locks SET heartbeat_at = ? WHERE name = ? AND owner = ?;",
+        (now.isoformat(), name, owner),
+    )
+    conn.commit()
+    return cursor.rowcount == 1
+
+
+def release_lock(conn: sqlite3.Connection, name: str, owner: str) -> None:
+    conn.execute(
+        "DELETE FROM pipeline_locks WHERE name = ? AND owner = ?;", (name, owner)
+    )
+    conn.commit()
+
+
+def get_lock(conn: sqlite3.Connection, name: str) -> Dict[str, Any] | None:
+    row = query(
+        conn,
+        """
+        SELECT name, owner, acquired_at, heartbeat_at
+        FROM pipeline_locks
+        WHERE name = ?;
+        """,
+        (name,),
+    ).fetchone()
+    return dict(row) if row else None
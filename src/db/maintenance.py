@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from typing import Dict, List
+
+from src.db.search_repo import optimize_search_index, rebuild_search_index
+from src.db.transaction import unit_of_work
+
+CACHE_TABLES: Dict[str, str] = {
+    "token_count_cache": "length(text_hash) + length(model_name) + 16",
+    "trunc_text_cache": (
+        "length(text_hash) + length(model_name) + 16"
+        " + COALESCE(length(CAST(truncated_text AS BLOB)), 0)"
+    ),
+    "embedding_cache": "length(text_hash) + length(model_name) + length(vector) + 32",
+}
+ANALYSIS_LIMIT = 400
+_DELETE_CHUNK = 500
+
+
+@dataclass(frozen=True)
+class TableSize:
+    name: str
+    rows: int
+    bytes: int
+
+
+@dataclass(frozen=True)
+class MaintenanceReport:
+    sizes_before: List[TableSize]
+    sizes_after: List[TableSize]
+    evicted: Dict[str, int]
+    freed_pages: int
+    full_vacuum: bool
+
+
+def table_sizes(conn: sqlite3.Connection) -> List[TableSize]:
+    tables = [
+        row[0]
+        for row in conn.execute(
+            "SELECT name FROM sqlite_schema WHERE type = 'table' AND name NOT LIKE 'sqlite_%';"
+        )
+    ]
+    try:
+        bytes_by_table = dict(
+            conn.execute(
+                """
+                SELECT s.tbl_name, SUM(d.pgsize)
+                FROM dbstat AS d
+                JOIN sqlite_schema AS s ON s.name = d.name
+                GROUP BY s.tbl_name;
+                """
+            ).fetchall()
+        )
+    except sqlite3.OperationalError:
+        bytes_by_table = {}
+    sizes = [
+        TableSize(
+            name=table,
+            rows=conn.execute(f'SELECT COUNT(*) FROM "{table}";').fetchone()[0],
+            bytes=int(bytes_by_table.get(table) or 0),
+        )
+        for table in tables
+    ]
+    return sorted(sizes, key=lambda size: (-size.bytes, size.name))
+
+
+def database_bytes(conn: sqlite3.Connection) -> int:
+    page_size = conn.execute("PRAGMA page_size;").fetchone()[0]
+    page_count = conn.execute("PRAGMA page_count;").fetchone()[0]
+    return page_size * page_count
+
+
+def evict_cache_entries(
+    conn: sqlite3.Connection,
+    older_than: str | None = None,
+    max_bytes: int | None = None,
+) -> Dict[str, int]:
+    evicted = {table: 0 for table in CACHE_TABLES}
+    with unit_of_work(conn):
+        if older_than is not None:
+            for table in CACHE_TABLES:
+                cursor = conn.execute(
+                    f"DELETE FROM {table} WHERE COALESCE(last_used_at, '') < ?;",
+                    (older_than,),
+                )
+                evicted[table] += cursor.rowcount
+        if max_bytes is not None:
+            ranked = " UNION ALL ".join(
+                f"SELECT '{table}' AS tbl, rowid AS rid, "
+                f"COALESCE(last_used_at, '') AS used, {size} AS bytes FROM {table}"
+                for table, size in CACHE_TABLES.items()
+            )
+            rows = conn.execute(
+                f"""
+                SELECT tbl, rid
+                FROM (
+                    SELECT tbl, rid, SUM(bytes) OVER (
+                        ORDER BY used DESC, tbl, rid ROWS UNBOUNDED PRECEDING
+                    ) AS running
+                    FROM ({ranked})
+                )
+                WHERE running > ?;
+                """,
+                (max_bytes,),
+            ).fetchall()
+            rowids: Dict[str, List[int]] = {}
+            for table, rowid in rows:
+                rowids.setdefault(table, []).append(rowid)
+            for table, ids in rowids.items():
+                for start in range(0, len(ids), _DELETE_CHUNK):
+                    chunk = ids[start : start + _DELETE_CHUNK]
+                    placeholders = ", ".join("?" for _ in chunk)
+                    conn.execute(f"DELETE FROM {table} WHERE rowid IN ({placeholders});", chunk)
+                evicted[table] += len(ids)
+    return evicted
+
+
+def incremental_vacuum(conn: sqlite3.Connection, pages: int | None = None) -> int:
+    if conn.execute("PRAGMA auto_vacuum;").fetchone()[0] != 2:
+        return 0
+    before = conn.execute("PRAGMA freelist_count;").fetchone()[0]
+    conn.commit()
+    if pages is None:
+        conn.execute("PRAGMA incremental_vacuum;").fetchall()
+    else:
+        conn.execute(f"PRAGMA incremental_vacuum({int(pages)});").fetchall()
+    conn.commit()
+    return before - conn.execute("PRAGMA freelist_count;").fetchone()[0]
+
+
+def full_vacuum(conn: sqlite3.Connection) -> None:
+    conn.commit()
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL;")
+    conn.execute("VACUUM;")
+    rebuild_search_index(conn)
+
+
+def optimize(conn: sqlite3.Connection) -> None:
+    optimize_search_index(conn)
+    conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT};")
+    conn.execute("ANALYZE;")
+    conn.execute("PRAGMA optimize;")
+    conn.commit()
+    conn.execute("PRAGMA wal_checkpoint(PASSIVE);").fetchall()
+
+
+def maintain_database(
+    conn: sqlite3.Connection,
+    older_than: str | None = None,
+    max_cache_bytes: int | None = None,
+    vacuum_pages: int | None = None,
+    full: bool = False,
+) -> MaintenanceReport:
+    sizes_before = table_sizes(conn)
+    evicted = evict_cache_entries(conn, older_than=older_than, max_bytes=max_cache_bytes)
+    if full:
+        pages_before = conn.execute("PRAGMA page_count;").fetchone()[0]
+        full_vacuum(conn)
+        freed_pages = pages_before - conn.execute("PRAGMA page_count;").fetchone()[0]
+    else:
+        freed_pages = incremental_vacuum(conn, vacuum_pages)
+    optimize(conn)
+    return MaintenanceReport(
+        sizes_before=sizes_before,
+        sizes_after=table_sizes(conn),
+        evicted=evicted,
+        freed_pages=freed_pages,
+        full_vacuum=full,
+    )
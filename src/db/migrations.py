@@ -0,0 +1,729 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from datetime import datetime, timezone
+from typing import Callable, Sequence
+
+import numpy as np
+
+from src.pipeline.hash_utils import text_hash
+
+_BASELINE_SCHEMA: Sequence[str] = (
+    """
+    CREATE TABLE IF NOT EXISTS pdfs(
+      pdf_id TEXT PRIMARY KEY,
+      file_path TEXT NOT NULL,
+      checksum TEXT NOT NULL,
+      ingested_at TEXT NOT NULL
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS content_blocks(
+      block_id TEXT PRIMARY KEY,
+      pdf_id TEXT NOT NULL,
+      section_path TEXT,
+      heading_level INTEGER,
+      block_type TEXT NOT NULL,
+      text TEXT NOT NULL,
+      page_index INTEGER,
+      position_index INTEGER,
+      FOREIGN KEY(pdf_id) REFERENCES pdfs(pdf_id)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS domain_candidates(
+      candidate_id TEXT PRIMARY KEY,
+      candidate_name TEXT NOT NULL,
+      normalized_name TEXT NOT NULL,
+      source_pdf_id TEXT NOT NULL,
+      source_block_id TEXT NOT NULL,
+      heading_level INTEGER,
+      representative_text TEXT NOT NULL,
+      FOREIGN KEY(source_pdf_id) REFERENCES pdfs(pdf_id),
+      FOREIGN KEY(source_block_id) REFERENCES content_blocks(block_id)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS candidate_embeddings(
+      candidate_id TEXT PRIMARY KEY,
+      model_name TEXT NOT NULL,
+      vector TEXT NOT NULL,
+      token_count INTEGER NOT NULL,
+      tokenization_mode TEXT NOT NULL,
+      FOREIGN KEY(candidate_id) REFERENCES domain_candidates(candidate_id)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS candidate_similarity(
+      candidate_a_id TEXT NOT NULL,
+      candidate_b_id TEXT NOT NULL,
+      similarity REAL NOT NULL,
+      mode TEXT NOT NULL,
+      PRIMARY KEY(candidate_a_id, candidate_b_id),
+      FOREIGN KEY(candidate_a_id) REFERENCES domain_candidates(candidate_id),
+      FOREIGN KEY(candidate_b_id) REFERENCES domain_candidates(candidate_id)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS review_queue(
+      review_id TEXT PRIMARY KEY,
+      candidate_a_id TEXT NOT NULL,
+      candidate_b_id TEXT NOT NULL,
+      similarity REAL NOT NULL,
+      reason TEXT NOT NULL,
+      status TEXT NOT NULL,
+      created_at TEXT NOT NULL,
+      resolved_at TEXT,
+      FOREIGN KEY(candidate_a_id) REFERENCES domain_candidates(candidate_id),
+      FOREIGN KEY(candidate_b_id) REFERENCES domain_candidates(candidate_id)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS domains(
+      domain_id TEXT PRIMARY KEY,
+      display_name TEXT NOT NULL,
+      created_at TEXT NOT NULL
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS domain_aliases(
+      domain_id TEXT NOT NULL,
+      alias TEXT NOT NULL,
+      source_pdf_id TEXT NOT NULL,
+      heading_level INTEGER,
+      PRIMARY KEY(domain_id, alias, source_pdf_id),
+      FOREIGN KEY(domain_id) REFERENCES domains(domain_id),
+      FOREIGN KEY(source_pdf_id) REFERENCES pdfs(pdf_id)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS domain_sources(
+      domain_id TEXT NOT NULL,
+      pdf_id TEXT NOT NULL,
+      PRIMARY KEY(domain_id, pdf_id),
+      FOREIGN KEY(domain_id) REFERENCES domains(domain_id),
+      FOREIGN KEY(pdf_id) REFERENCES pdfs(pdf_id)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS domain_embeddings(
+      domain_id TEXT PRIMARY KEY,
+      model_name TEXT NOT NULL,
+      vector TEXT NOT NULL,
+      token_count INTEGER NOT NULL,
+      tokenization_mode TEXT NOT NULL,
+      FOREIGN KEY(domain_id) REFERENCES domains(domain_id)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS block_domain_map(
+      block_id TEXT NOT NULL,
+      domain_id TEXT NOT NULL,
+      PRIMARY KEY(block_id, domain_id),
+      FOREIGN KEY(block_id) REFERENCES content_blocks(block_id),
+      FOREIGN KEY(domain_id) REFERENCES domains(domain_id)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS token_count_cache(
+      text_hash TEXT NOT NULL,
+      model_name TEXT NOT NULL,
+      token_count INTEGER NOT NULL,
+      tokenization_mode TEXT NOT NULL,
+      PRIMARY KEY(text_hash, model_name)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS trunc_text_cache(
+      text_hash TEXT NOT NULL,
+      model_name TEXT NOT NULL,
+      max_tokens INTEGER NOT NULL,
+      truncated_text TEXT NOT NULL,
+      tokenization_mode TEXT NOT NULL,
+      PRIMARY KEY(text_hash, model_name, max_tokens)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS parse_cache(
+      checksum TEXT NOT NULL,
+      parser_name TEXT NOT NULL,
+      parse_method TEXT NOT NULL,
+      parser_version TEXT NOT NULL,
+      content_list BLOB NOT NULL,
+      markdown BLOB NOT NULL,
+      created_at TEXT NOT NULL,
+      hit_count INTEGER NOT NULL DEFAULT 0,
+      PRIMARY KEY(checksum, parser_name, parse_method, parser_version)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS parse_cache_stats(
+      parser_name TEXT NOT NULL,
+      parse_method TEXT NOT NULL,
+      hits INTEGER NOT NULL,
+      misses INTEGER NOT NULL,
+      PRIMARY KEY(parser_name, parse_method)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS pipeline_runs(
+      run_id TEXT PRIMARY KEY,
+      status TEXT NOT NULL,
+      started_at TEXT NOT NULL,
+      updated_at TEXT NOT NULL,
+      error TEXT
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS stage_checkpoints(
+      run_id TEXT NOT NULL,
+      stage TEXT NOT NULL,
+      unit_id TEXT NOT NULL,
+      status TEXT NOT NULL,
+      detail TEXT,
+      updated_at TEXT NOT NULL,
+      PRIMARY KEY(run_id, stage, unit_id),
+      FOREIGN KEY(run_id) REFERENCES pipeline_runs(run_id)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS embedding_checkpoints(
+      run_id TEXT NOT NULL,
+      purpose TEXT NOT NULL,
+      batch_start INTEGER NOT NULL,
+      batch_hash TEXT NOT NULL,
+      vectors TEXT NOT NULL,
+      total_tokens INTEGER NOT NULL,
+      PRIMARY KEY(run_id, purpose, batch_start),
+      FOREIGN KEY(run_id) REFERENCES pipeline_runs(run_id)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS pipeline_locks(
+      name TEXT PRIMARY KEY,
+      owner TEXT NOT NULL,
+      acquired_at TEXT NOT NULL,
+      heartbeat_at TEXT NOT NULL
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS token_usage(
+      run_id TEXT NOT NULL,
+      model_name TEXT NOT NULL,
+      total_tokens INTEGER NOT NULL,
+      created_at TEXT NOT NULL,
+      PRIMARY KEY(run_id, model_name)
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_content_blocks_pdf_id ON content_blocks(pdf_id);",
+    "CREATE INDEX IF NOT EXISTS idx_candidates_pdf_id ON domain_candidates(source_pdf_id);",
+    "CREATE INDEX IF NOT EXISTS idx_candidates_norm_name ON domain_candidates(normalized_name);",
+    "CREATE INDEX IF NOT EXISTS idx_candidate_similarity_mode ON candidate_similarity(mode);",
+    "CREATE INDEX IF NOT EXISTS idx_review_queue_status ON review_queue(status);",
+    "CREATE INDEX IF NOT EXISTS idx_domain_aliases_domain_id ON domain_aliases(domain_id);",
+    "CREATE INDEX IF NOT EXISTS idx_domain_sources_domain_id ON domain_sources(domain_id);",
+    "CREATE INDEX IF NOT EXISTS idx_pipeline_runs_started_at ON pipeline_runs(started_at);",
+)
+
+
+def _baseline(conn: sqlite3.Connection) -> None:
+    for statement in _BASELINE_SCHEMA:
+        conn.execute(statement)
+
+
+_BINARY_VECTOR_TABLES = (
+    (
+        "candidate_embeddings",
+        "candidate_id",
+        "FOREIGN KEY(candidate_id) REFERENCES domain_candidates(candidate_id)",
+    ),
+    (
+        "domain_embeddings",
+        "domain_id",
+        "FOREIGN KEY(domain_id) REFERENCES domains(domain_id)",
+    ),
+)
+
+
+def _binary_vectors(conn: sqlite3.Connection) -> None:
+    for table, key_column, foreign_key in _BINARY_VECTOR_TABLES:
+        conn.execute(
+            f"""
+            CREATE TABLE {table}_v2(
+              {key_column} TEXT PRIMARY KEY,
+              model_name TEXT NOT NULL,
+              vector BLOB NOT NULL,
+              dim INTEGER NOT NULL,
+              dtype TEXT NOT NULL,
+              token_count INTEGER NOT NULL,
+              tokenization_mode TEXT NOT NULL,
+              {foreign_key}
+            );
+            """
+        )
+        rows = conn.execute(
+            f"SELECT {key_column}, model_name, vector, token_count, tokenization_mode "
+            f"FROM {table};"
+        )
+        conn.executemany(
+            f"""
+            INSERT INTO {table}_v2(
+                {key_column}, model_name, vector, dim, dtype, token_count, tokenization_mode
+            )
+            VALUES(?, ?, ?, ?, 'float32', ?, ?);
+            """,
+            (
+                (key, model_name, vector.tobytes(), vector.size, token_count, mode)
+                for key, model_name, text, token_count, mode in rows
+                for vector in (np.asarray(json.loads(text), dtype=np.float32),)
+            ),
+        )
+        conn.execute(f"DROP TABLE {table};")
+        conn.execute(f"ALTER TABLE {table}_v2 RENAME TO {table};")
+
+
+def _embedding_cache(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS embedding_cache(
+          text_hash TEXT NOT NULL,
+          model_name TEXT NOT NULL,
+          dimensions INTEGER NOT NULL,
+          vector BLOB NOT NULL,
+          dtype TEXT NOT NULL,
+          created_at TEXT NOT NULL,
+          PRIMARY KEY(text_hash, model_name, dimensions)
+        );
+        """
+    )
+    conn.execute(
+        "ALTER TABLE token_usage ADD COLUMN cache_hits INTEGER NOT NULL DEFAULT 0;"
+    )
+    conn.execute(
+        "ALTER TABLE token_usage ADD COLUMN cache_misses INTEGER NOT NULL DEFAULT 0;"
+    )
+
+
+def _untruncated_text_as_null(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE trunc_text_cache_v2(
+          text_hash TEXT NOT NULL,
+          model_name TEXT NOT NULL,
+          max_tokens INTEGER NOT NULL,
+          truncated_text TEXT,
+          tokenization_mode TEXT NOT NULL,
+          PRIMARY KEY(text_hash, model_name, max_tokens)
+        );
+        """
+    )
+    rows = conn.execute(
+        "SELECT text_hash, model_name, max_tokens, truncated_text, tokenization_mode "
+        "FROM trunc_text_cache;"
+    )
+    conn.executemany(
+        """
+        INSERT INTO trunc_text_cache_v2(
+            text_hash, model_name, max_tokens, truncated_text, tokenization_mode
+        )
+        VALUES(?, ?, ?, ?, ?);
+        """,
+        (
+            (
+                digest,
+                model_name,
+                max_tokens,
+                None if text_hash(truncated) == digest else truncated,
+                mode,
+            )
+            for digest, model_name, max_tokens, truncated, mode in rows
+        ),
+    )
+    conn.execute("DROP TABLE trunc_text_cache;")
+    conn.execute("ALTER TABLE trunc_text_cache_v2 RENAME TO trunc_text_cache;")
+
+
+def _cache_last_used(conn: sqlite3.Connection) -> None:
+    migrated_at = datetime.now(timezone.utc).isoformat()
+    for table in ("token_count_cache", "trunc_text_cache", "embedding_cache"):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN last_used_at TEXT;")
+    conn.execute("UPDATE embedding_cache SET last_used_at = created_at;")
+    for table in ("token_count_cache", "trunc_text_cache"):
+        conn.execute(f"UPDATE {table} SET last_used_at = ?;", (migrated_at,))
+
+
+def _content_block_keyset_index(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_content_blocks_pdf_position "
+        "ON content_blocks(pdf_id, position_index, block_id);"
+    )
+
+
+def _canonical_review_pairs(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        UPDATE review_queue
+        SET candidate_a_id = candidate_b_id, candidate_b_id = candidate_a_id
+        WHERE candidate_a_id > candidate_b_id;
+        """
+    )
+    conn.execute(
+        """
+        DELETE FROM review_queue
+        WHERE rowid IN (
+            SELECT rowid
+            FROM (
+                SELECT rowid, ROW_NUMBER() OVER (
+                    PARTITION BY candidate_a_id, candidate_b_id
+                    ORDER BY status = 'pending', created_at, review_id
+                ) AS rank
+                FROM review_queue
+            )
+            WHERE rank > 1
+        );
+        """
+    )
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_review_queue_pair "
+        "ON review_queue(candidate_a_id, candidate_b_id);"
+    )
+
+
+_CASCADE_TABLES = (
+    (
+        "content_blocks",
+        """
+        block_id TEXT PRIMARY KEY,
+        pdf_id TEXT NOT NULL,
+        section_path TEXT,
+        heading_level INTEGER,
+        block_type TEXT NOT NULL,
+        text TEXT NOT NULL,
+        page_index INTEGER,
+        position_index INTEGER,
+        FOREIGN KEY(pdf_id) REFERENCES pdfs(pdf_id) ON DELETE CASCADE
+        """,
+    ),
+    (
+        "domain_candidates",
+        """
+        candidate_id TEXT PRIMARY KEY,
+        candidate_name TEXT NOT NULL,
+        normalized_name TEXT NOT NULL,
+        source_pdf_id TEXT NOT NULL,
+        source_block_id TEXT NOT NULL,
+        heading_level INTEGER,
+        representative_text TEXT NOT NULL,
+        FOREIGN KEY(source_pdf_id) REFERENCES pdfs(pdf_id) ON DELETE CASCADE,
+        FOREIGN KEY(source_block_id) REFERENCES content_blocks(block_id) ON DELETE CASCADE
+        """,
+    ),
+    (
+        "candidate_embeddings",
+        """
+        candidate_id TEXT PRIMARY KEY,
+        model_name TEXT NOT NULL,
+        vector BLOB NOT NULL,
+        dim INTEGER NOT NULL,
+        dtype TEXT NOT NULL,
+        token_count INTEGER NOT NULL,
+        tokenization_mode TEXT NOT NULL,
+        FOREIGN KEY(candidate_id) REFERENCES domain_candidates(candidate_id)
+          ON DELETE CASCADE
+        """,
+    ),
+    (
+        "candidate_similarity",
+        """
+        candidate_a_id TEXT NOT NULL,
+        candidate_b_id TEXT NOT NULL,
+        similarity REAL NOT NULL,
+        mode TEXT NOT NULL,
+        PRIMARY KEY(candidate_a_id, candidate_b_id),
+        FOREIGN KEY(candidate_a_id) REFERENCES domain_candidates(candidate_id)
+          ON DELETE CASCADE,
+        FOREIGN KEY(candidate_b_id) REFERENCES domain_candidates(candidate_id)
+          ON DELETE CASCADE
+        """,
+    ),
+    (
+        "review_queue",
+        """
+        review_id TEXT PRIMARY KEY,
+        candidate_a_id TEXT NOT NULL,
+        candidate_b_id TEXT NOT NULL,
+        similarity REAL NOT NULL,
+        reason TEXT NOT NULL,
+        status TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        resolved_at TEXT
+        """,
+    ),
+    (
+        "domain_aliases",
+        """
+        domain_id TEXT NOT NULL,
+        alias TEXT NOT NULL,
+        source_pdf_id TEXT NOT NULL,
+        heading_level INTEGER,
+        PRIMARY KEY(domain_id, alias, source_pdf_id),
+        FOREIGN KEY(domain_id) REFERENCES domains(domain_id) ON DELETE CASCADE,
+        FOREIGN KEY(source_pdf_id) REFERENCES pdfs(pdf_id) ON DELETE CASCADE
+        """,
+    ),
+    (
+        "domain_sources",
+        """
+        domain_id TEXT NOT NULL,
+        pdf_id TEXT NOT NULL,
+        PRIMARY KEY(domain_id, pdf_id),
+        FOREIGN KEY(domain_id) REFERENCES domains(domain_id) ON DELETE CASCADE,
+        FOREIGN KEY(pdf_id) REFERENCES pdfs(pdf_id) ON DELETE CASCADE
+        """,
+    ),
+    (
+        "domain_embeddings",
+        """
+        domain_id TEXT PRIMARY KEY,
+        model_name TEXT NOT NULL,
+        vector BLOB NOT NULL,
+        dim INTEGER NOT NULL,
+        dtype TEXT NOT NULL,
+        token_count INTEGER NOT NULL,
+        tokenization_mode TEXT NOT NULL,
+        FOREIGN KEY(domain_id) REFERENCES domains(domain_id) ON DELETE CASCADE
+        """,
+    ),
+    (
+        "block_domain_map",
+        """
+        block_id TEXT NOT NULL,
+        domain_id TEXT NOT NULL,
+        PRIMARY KEY(block_id, domain_id),
+        FOREIGN KEY(block_id) REFERENCES content_blocks(block_id) ON DELETE CASCADE,
+        FOREIGN KEY(domain_id) REFERENCES domains(domain_id) ON DELETE CASCADE
+        """,
+    ),
+)
+
+_CASCADE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_content_blocks_pdf_id ON content_blocks(pdf_id);",
+    "CREATE INDEX IF NOT EXISTS idx_content_blocks_pdf_position "
+    "ON content_blocks(pdf_id, position_index, block_id);",
+    "CREATE INDEX IF NOT EXISTS idx_candidates_pdf_id ON domain_candidates(source_pdf_id);",
+    "CREATE INDEX IF NOT EXISTS idx_candidates_block_id ON domain_candidates(source_block_id);",
+    "CREATE INDEX IF NOT EXISTS idx_candidates_norm_name ON domain_candidates(normalized_name);",
+    "CREATE INDEX IF NOT EXISTS idx_candidate_similarity_mode ON candidate_similarity(mode);",
+    "CREATE INDEX IF NOT EXISTS idx_candidate_similarity_b "
+    "ON candidate_similarity(candidate_b_id);",
+    "CREATE INDEX IF NOT EXISTS idx_review_queue_status ON review_queue(status);",
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_review_queue_pair "
+    "ON review_queue(candidate_a_id, candidate_b_id);",
+    "CREATE INDEX IF NOT EXISTS idx_domain_aliases_domain_id ON domain_aliases(domain_id);",
+    "CREATE INDEX IF NOT EXISTS idx_domain_aliases_pdf_id ON domain_aliases(source_pdf_id);",
+    "CREATE INDEX IF NOT EXISTS idx_domain_sources_domain_id ON domain_sources(domain_id);",
+    "CREATE INDEX IF NOT EXISTS idx_domain_sources_pdf_id ON domain_sources(pdf_id);",
+    "CREATE INDEX IF NOT EXISTS idx_block_domain_map_domain_id ON block_domain_map(domain_id);",
+)
+
+
+def _cascade_derived_data(conn: sqlite3.Connection) -> None:
+    for table, columns in _CASCADE_TABLES:
+        _rebuild_table(conn, table, columns)
+    for statement in _CASCADE_INDEXES:
+        conn.execute(statement)
+
+
+def _rebuild_table(conn: sqlite3.Connection, table: str, columns: str) -> None:
+    conn.execute(f"CREATE TABLE {table}_v2({columns});")
+    conn.execute(f"INSERT INTO {table}_v2 SELECT * FROM {table};")
+    conn.execute(f"DROP TABLE {table};")
+    conn.execute(f"ALTER TABLE {table}_v2 RENAME TO {table};")
+
+
+_FULL_TEXT_INDEXES = (
+    ("content_blocks", "content_blocks_fts", ("section_path", "text")),
+    ("domain_aliases", "domain_aliases_fts", ("alias",)),
+)
+
+
+def _full_text_search(conn: sqlite3.Connection) -> None:
+    for table, fts, columns in _FULL_TEXT_INDEXES:
+        column_list = ", ".join(columns)
+        new_values = ", ".join(f"new.{column}" for column in columns)
+        old_values = ", ".join(f"old.{column}" for column in columns)
+        conn.execute(
+            f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts}
+            USING fts5({column_list}, content='{table}', tokenize='trigram');
+            """
+        )
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN
+              INSERT INTO {fts}(rowid, {column_list}) VALUES(new.rowid, {new_values});
+            END;
+            """
+        )
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN
+              INSERT INTO {fts}({fts}, rowid, {column_list})
+              VALUES('delete', old.rowid, {old_values});
+            END;
+            """
+        )
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {column_list} ON {table}
+            BEGIN
+              INSERT INTO {fts}({fts}, rowid, {column_list})
+              VALUES('delete', old.rowid, {old_values});
+              INSERT INTO {fts}(rowid, {column_list}) VALUES(new.rowid, {new_values});
+            END;
+            """
+        )
+        conn.execute(f"INSERT INTO {fts}({fts}) VALUES('rebuild');")
+
+
+def _background_jobs(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS jobs(
+          job_id TEXT PRIMARY KEY,
+          kind TEXT NOT NULL,
+          status TEXT NOT NULL CHECK(
+            status IN ('queued', 'running', 'completed', 'skipped', 'failed', 'cancelled')
+          ),
+          progress REAL NOT NULL DEFAULT 0,
+          stage TEXT,
+          log_tail TEXT NOT NULL DEFAULT '',
+          params TEXT,
+          error TEXT,
+          cancel_requested INTEGER NOT NULL DEFAULT 0,
+          owner TEXT,
+          created_at TEXT NOT NULL,
+          started_at TEXT,
+          heartbeat_at TEXT,
+          finished_at TEXT
+        );
+        """
+    )
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_active_kind "
+        "ON jobs(kind) WHERE status IN ('queued', 'running');"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs(created_at);")
+
+
+def _drop_embedding_checkpoints(conn: sqlite3.Connection) -> None:
+    conn.execute("DROP TABLE IF EXISTS embedding_checkpoints;")
+
+
+def _similarity_pair_per_mode(conn: sqlite3.Connection) -> None:
+    _rebuild_table(
+        conn,
+        "candidate_similarity",
+        """
+        candidate_a_id TEXT NOT NULL,
+        candidate_b_id TEXT NOT NULL,
+        similarity REAL NOT NULL,
+        mode TEXT NOT NULL,
+        PRIMARY KEY(candidate_a_id, candidate_b_id, mode),
+        FOREIGN KEY(candidate_a_id) REFERENCES domain_candidates(candidate_id)
+          ON DELETE CASCADE,
+        FOREIGN KEY(candidate_b_id) REFERENCES domain_candidates(candidate_id)
+          ON DELETE CASCADE
+        """,
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_candidate_similarity_mode "
+        "ON candidate_similarity(mode);"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_candidate_similarity_b "
+        "ON candidate_similarity(candidate_b_id);"
+    )
+
+
+def _busy_job_status(conn: sqlite3.Connection) -> None:
+    _rebuild_table(
+        conn,
+        "jobs",
+        """
+        job_id TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        status TEXT NOT NULL CHECK(
+          status IN (
+            'queued', 'running', 'completed', 'skipped', 'busy', 'failed', 'cancelled'
+          )
+        ),
+        progress REAL NOT NULL DEFAULT 0,
+        stage TEXT,
+        log_tail TEXT NOT NULL DEFAULT '',
+        params TEXT,
+        error TEXT,
+        cancel_requested INTEGER NOT NULL DEFAULT 0,
+        owner TEXT,
+        created_at TEXT NOT NULL,
+        started_at TEXT,
+        heartbeat_at TEXT,
+        finished_at TEXT
+        """,
+    )
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_active_kind "
+        "ON jobs(kind) WHERE status IN ('queued', 'running');"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs(created_at);")
+
+
+MIGRATIONS: Sequence[Callable[[sqlite3.Connection], None]] = (
+    _baseline,
+    _binary_vectors,
+    _embedding_cache,
+    _untruncated_text_as_null,
+    _cache_last_used,
+    _content_block_keyset_index,
+    _canonical_review_pairs,
+    _cascade_derived_data,
+    _full_text_search,
+    _background_jobs,
+    _drop_embedding_checkpoints,
+    _similarity_pair_per_mode,
+    _busy_job_status,
+)
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version;").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    current = schema_version(conn)
+    if current > SCHEMA_VERSION:
+        raise ValueError(
+            f"database schema version {current} is newer than supported {SCHEMA_VERSION}"
+        )
+    if current == SCHEMA_VERSION:
+        return current
+    foreign_keys = conn.execute("PRAGMA foreign_keys;").fetchone()[0]
+    conn.commit()
+    conn.execute("PRAGMA foreign_keys = OFF;")
+    try:
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            current = schema_version(conn)
+            for version in range(current + 1, SCHEMA_VERSION + 1):
+                MIGRATIONS[version - 1](conn)
+                conn.execute(f"PRAGMA user_version = {version};")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    finally:
+        if foreign_keys:
+            conn.execute("PRAGMA foreign_keys = ON;")
+    return SCHEMA_VERSION
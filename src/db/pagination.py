@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import Any, Callable, Dict, Iterator, Sequence, Tuple, TypeVar
+
+DEFAULT_PAGE_SIZE = 1000
+
+T = TypeVar("T")
+RowFactory = Callable[[Tuple[Any, ...]], T]
+
+
+def iter_keyset(
+    conn: sqlite3.Connection,
+    table: str,
+    columns: Sequence[str],
+    key: Sequence[str],
+    where: str = "",
+    params: Sequence[Any] = (),
+    page_size: int = DEFAULT_PAGE_SIZE,
+    row_factory: RowFactory | None = None,
+) -> Iterator[Any]:
+    if page_size <= 0:
+        raise ValueError("page_size must be positive")
+    key_indexes = [columns.index(column) for column in key]
+    order_by = ", ".join(key)
+    key_tuple = f"({order_by})" if len(key) > 1 else key[0]
+    key_params = f"({', '.join('?' for _ in key)})" if len(key) > 1 else "?"
+    base = f"SELECT {', '.join(columns)} FROM {table}"
+    first_page = f"{base} {f'WHERE {where}' if where else ''} ORDER BY {order_by} LIMIT ?;"
+    next_page = (
+        f"{base} WHERE {f'({where}) AND ' if where else ''}{key_tuple} > {key_params} "
+        f"ORDER BY {order_by} LIMIT ?;"
+    )
+    build = row_factory or _dict_factory(columns)
+    rows = conn.execute(first_page, (*params, page_size)).fetchall()
+    while rows:
+        for row in rows:
+            yield build(row)
+        if len(rows) < page_size:
+            return
+        last = rows[-1]
+        rows = conn.execute(
+            next_page, (*params, *(last[idx] for idx in key_indexes), page_size)
+        ).fetchall()
+
+
+def _dict_factory(columns: Sequence[str]) -> Callable[[Tuple[Any, ...]], Dict[str, Any]]:
+    names = tuple(columns)
+    return lambda row: dict(zip(names, row))
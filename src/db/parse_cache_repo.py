@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import zlib
+from typing import Any, Dict, List, Optional
+
+from src.db.connection import query
+from src.db.transaction import commit
+
+
+def set_parse_cache(
+    conn: sqlite3.Connection,
+    checksum: str,
+    parser_name: str,
+    parse_method: str,
+    parser_version: str,
+    content_list: List[Dict[str, Any]],
+    markdown: str,
+    created_at: str,
+) -> None:
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO parse_cache(
+            checksum, parser_name, parse_method, parser_version,
+            content_list, markdown, created_at, hit_count
+        )
+        VALUES(?, ?, ?, ?, ?, ?, ?, 0);
+        """,
+        (
+            checksum,
+            parser_name,
+            parse_method,
+            parser_version,
+            _pack(json.dumps(content_list, ensure_ascii=False, separators=(",", ":"))),
+            _pack(markdown),
+            created_at,
+        ),
+    )
+    commit(conn)
+
+
+def get_parse_cache(
+    conn: sqlite3.Connection,
+    checksum: str,
+    parser_name: str,
+    parse_method: str,
+    parser_version: str,
+) -> Optional[Dict[str, Any]]:
+    row = conn.execute(
+        """
+        SELECT content_list, markdown
+        FROM parse_cache
+        WHERE checksum = ? AND parser_name = ? AND parse_method = ? AND parser_version = ?;
+        """,
+        (checksum, parser_name, parse_method, parser_version),
+    ).fetchone()
+    if not row:
+        return None
+    return {
+        "content_list": json.loads(_unpack(row[0])),
+        "markdown": _unpack(row[1]),
+    }
+
+
+def record_parse_cache_lookup(
+    conn: sqlite3.Connection,
+    checksum: str,
+    parser_name: str,
+    parse_method: str,
+    parser_version: str,
+    hit: bool,
+) -> None:
+    if hit:
+        conn.execute(
+            """
+            UPDATE parse_cache
+            SET hit_count = hit_count + 1
+            WHERE checksum = ? AND parser_name = ? AND parse_method = ? AND parser_version = ?;
+            """,
+            (checksum, parser_name, parse_method, parser_version),
+        )
+    conn.execute(
+        """
+        INSERT INTO parse_cache_stats(parser_name, parse_method, hits, misses)
+        VALUES(?, ?, ?, ?)
+        ON CONFLICT(parser_name, parse_method) DO UPDATE SET
+            hits = hits + excluded.hits,
+            misses = misses + excluded.misses;
+        """,
+        (parser_name, parse_method, 1 if hit else 0, 0 if hit else 1),
+    )
+    commit(conn)
+
+
+def get_parse_cache_stats(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    rows = query(
+        conn,
+        """
+        SELECT parser_name, parse_method, hits, misses
+        FROM parse_cache_stats
+        ORDER BY parser_name, parse_method;
+        """
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def _pack(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"))
+
+
+def _unpack(data: bytes) -> str:
+    return zlib.decompress(data).decode("utf-8")
@@ -1,7 +1,28 @@
 from __future__ import annotations
 
 import sqlite3
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List
+
+from src.db.connection import (
+    execute_in_chunks,
+    foreign_keys_disabled,
+    iter_in_chunks,
+    query,
+)
+from src.db.pagination import DEFAULT_PAGE_SIZE, RowFactory, iter_keyset
+from src.db.transaction import commit, unit_of_work
+
+PDF_COLUMNS = ("pdf_id", "file_path", "checksum", "ingested_at")
+_DERIVED_TABLES = (
+    "candidate_embeddings",
+    "candidate_similarity",
+    "domain_embeddings",
+    "block_domain_map",
+    "domain_aliases",
+    "domain_sources",
+    "domains",
+    "domain_candidates",
+)
 
 
 def insert_pdf(
@@ -18,20 +39,44 @@ def insert_pdf(
         """,
         (pdf_id, file_path, checksum, ingested_at),
     )
-    conn.commit()
+    commit(conn)
+
+
+def insert_pdfs(conn: sqlite3.Connection, pdfs: Iterable[Dict[str, Any]]) -> None:
+    conn.executemany(
+        """
+        INSERT INTO pdfs(pdf_id, file_path, checksum, ingested_at)
+        VALUES(?, ?, ?, ?);
+        """,
+        (
+            (pdf["pdf_id"], pdf["file_path"], pdf["checksum"], pdf["ingested_at"])
+            for pdf in pdfs
+        ),
+    )
+    commit(conn)
+
+
+def iter_pdfs(
+    conn: sqlite3.Connection,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    row_factory: RowFactory | None = None,
+) -> Iterator[Any]:
+    return iter_keyset(
+        conn, "pdfs", PDF_COLUMNS, ("pdf_id",), page_size=page_size, row_factory=row_factory
+    )
 
 
 def list_pdfs(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
+    rows = query(
+        conn,
         "SELECT pdf_id, file_path, checksum, ingested_at FROM pdfs ORDER BY pdf_id;"
     ).fetchall()
     return [dict(row) for row in rows]
 
 
 def list_processed_pdfs(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
+    rows = query(
+        conn,
         """
         SELECT DISTINCT pdfs.pdf_id, pdfs.file_path, pdfs.checksum, pdfs.ingested_at
         FROM pdfs
@@ -45,8 +90,8 @@ def list_processed_pdfs(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
 def get_pdf_by_checksum(
     conn: sqlite3.Connection, checksum: str
 ) -> Dict[str, Any] | None:
-    conn.row_factory = sqlite3.Row
-    row = conn.execute(
+    row = query(
+        conn,
         """
         SELECT pdf_id, file_path, checksum, ingested_at
         FROM pdfs
@@ -58,9 +103,28 @@ def get_pdf_by_checksum(
     return dict(row) if row else None
 
 
+def get_pdfs_by_checksums(
+    conn: sqlite3.Connection, checksums: Iterable[str]
+) -> Dict[str, Dict[str, Any]]:
+    found: Dict[str, Dict[str, Any]] = {}
+    rows = iter_in_chunks(
+        conn,
+        """
+        SELECT pdf_id, file_path, checksum, ingested_at
+        FROM pdfs
+        WHERE checksum IN ({placeholders})
+        ORDER BY pdf_id;
+        """,
+        checksums,
+    )
+    for row in rows:
+        found.setdefault(row["checksum"], dict(row))
+    return found
+
+
 def get_pdf_by_path(conn: sqlite3.Connection, file_path: str) -> Dict[str, Any] | None:
-    conn.row_factory = sqlite3.Row
-    row = conn.execute(
+    row = query(
+        conn,
         """
         SELECT pdf_id, file_path, checksum, ingested_at
         FROM pdfs
@@ -73,21 +137,51 @@ def get_pdf_by_path(conn: sqlite3.Connection, file_path: str) -> Dict[str, Any]
 
 
 def delete_pdf(conn: sqlite3.Connection, pdf_id: str) -> None:
-    conn.execute("DELETE FROM pdfs WHERE pdf_id = ?;", (pdf_id,))
-    conn.commit()
+    with unit_of_work(conn):
+        invalidate_pdfs(conn, [pdf_id])
+        conn.execute("DELETE FROM pdfs WHERE pdf_id = ?;", (pdf_id,))
+
+
+def invalidate_pdfs(conn: sqlite3.Connection, pdf_ids: Iterable[str]) -> None:
+    unique = set(pdf_ids)
+    with unit_of_work(conn):
+        execute_in_chunks(
+            conn,
+            """
+            DELETE FROM domains
+            WHERE domain_id IN (
+                SELECT domain_id FROM domain_sources WHERE pdf_id IN ({placeholders})
+            );
+            """,
+            unique,
+        )
+        execute_in_chunks(
+            conn,
+            """
+            DELETE FROM review_queue
+            WHERE status = 'pending'
+              AND (
+                candidate_a_id IN (
+                    SELECT candidate_id FROM domain_candidates
+                    WHERE source_pdf_id IN ({placeholders})
+                )
+                OR candidate_b_id IN (
+                    SELECT candidate_id FROM domain_candidates
+                    WHERE source_pdf_id IN ({placeholders})
+                )
+              );
+            """,
+            unique,
+            repeat=2,
+        )
+        execute_in_chunks(
+            conn,
+            "DELETE FROM domain_candidates WHERE source_pdf_id IN ({placeholders});",
+            unique,
+        )
 
 
 def clear_derived_tables(conn: sqlite3.Connection) -> None:
-    conn.executescript(
-        """
-        DELETE FROM candidate_embeddings;
-        DELETE FROM candidate_similarity;
-        DELETE FROM domain_embeddings;
-        DELETE FROM block_domain_map;
-        DELETE FROM domain_aliases;
-        DELETE FROM domain_sources;
-        DELETE FROM domains;
-        DELETE FROM domain_candidates;
-        """
-    )
-    conn.commit()
+    with foreign_keys_disabled(conn):
+        for table in _DERIVED_TABLES:
+            conn.execute(f"DELETE FROM {table};")
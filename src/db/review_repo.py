@@ -1,7 +1,14 @@
 from __future__ import annotations
 
 import sqlite3
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Tuple
+
+from src.db.connection import query
+from src.db.transaction import commit
+
+
+def canonical_pair(a: str, b: str) -> Tuple[str, str]:
+    return (a, b) if a <= b else (b, a)
 
 
 def insert_review_item(
@@ -14,9 +21,19 @@ def insert_review_item(
     status: str,
     created_at: str,
 ) -> None:
-    conn.execute(
+    insert_review_items(
+        conn,
+        [(review_id, candidate_a_id, candidate_b_id, similarity, reason, status, created_at)],
+    )
+
+
+def insert_review_items(
+    conn: sqlite3.Connection,
+    items: Iterable[Tuple[str, str, str, float, str, str, str]],
+) -> None:
+    conn.executemany(
         """
-        INSERT INTO review_queue(
+        INSERT OR IGNORE INTO review_queue(
             review_id,
             candidate_a_id,
             candidate_b_id,
@@ -27,14 +44,17 @@ def insert_review_item(
         )
         VALUES(?, ?, ?, ?, ?, ?, ?);
         """,
-        (review_id, candidate_a_id, candidate_b_id, similarity, reason, status, created_at),
+        (
+            (review_id, *canonical_pair(a, b), similarity, reason, status, created_at)
+            for review_id, a, b, similarity, reason, status, created_at in items
+        ),
     )
-    conn.commit()
+    commit(conn)
 
 
 def list_pending_reviews(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
+    rows = query(
+        conn,
         """
         SELECT review_id, candidate_a_id, candidate_b_id, similarity, reason, status
         FROM review_queue
@@ -46,8 +66,8 @@ def list_pending_reviews(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
 
 
 def list_rejected_pairs(conn: sqlite3.Connection) -> set[tuple[str, str]]:
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
+    rows = query(
+        conn,
         """
         SELECT candidate_a_id, candidate_b_id
         FROM review_queue
@@ -62,15 +82,21 @@ def has_review_pair(conn: sqlite3.Connection, a: str, b: str) -> bool:
         """
         SELECT 1
         FROM review_queue
-        WHERE (candidate_a_id = ? AND candidate_b_id = ?)
-           OR (candidate_a_id = ? AND candidate_b_id = ?)
+        WHERE candidate_a_id = ? AND candidate_b_id = ?
         LIMIT 1;
         """,
-        (a, b, b, a),
+        canonical_pair(a, b),
     ).fetchone()
     return row is not None
 
 
+def list_review_pairs(conn: sqlite3.Connection) -> set[tuple[str, str]]:
+    rows = conn.execute(
+        "SELECT candidate_a_id, candidate_b_id FROM review_queue;"
+    ).fetchall()
+    return {(row[0], row[1]) for row in rows}
+
+
 def resolve_review(
     conn: sqlite3.Connection, review_id: str, status: str, resolved_at: str
 ) -> None:
@@ -82,4 +108,4 @@ def resolve_review(
         """,
         (status, resolved_at, review_id),
     )
-    conn.commit()
+    commit(conn)
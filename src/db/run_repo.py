@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import Any, Dict, Iterable, List
+
+from src.db.connection import query
+from src.db.transaction import commit
+
+RESUMABLE_RUN_STATUSES = ("running", "failed")
+
+
+def create_pipeline_run(conn: sqlite3.Connection, run_id: str, started_at: str) -> None:
+    conn.execute(
+        """
+        INSERT INTO pipeline_runs(run_id, status, started_at, updated_at, error)
+        VALUES(?, 'running', ?, ?, NULL);
+        """,
+        (run_id, started_at, started_at),
+    )
+    commit(conn)
+
+
+def update_pipeline_run(
+    conn: sqlite3.Connection,
+    run_id: str,
+    status: str,
+    updated_at: str,
+    error: str | None = None,
+) -> None:
+    conn.execute(
+        """
+        UPDATE pipeline_runs
+        SET status = ?, updated_at = ?, error = ?
+        WHERE run_id = ?;
+        """,
+        (status, updated_at, error, run_id),
+    )
+    commit(conn)
+
+
+def get_pipeline_run(conn: sqlite3.Connection, run_id: str) -> Dict[str, Any] | None:
+    row = query(
+        conn,
+        """
+        SELECT run_id, status, started_at, updated_at, error
+        FROM pipeline_runs
+        WHERE run_id = ?;
+        """,
+        (run_id,),
+    ).fetchone()
+    return dict(row) if row else None
+
+
+def get_resumable_run(conn: sqlite3.Connection) -> Dict[str, Any] | None:
+    row = query(
+        conn,
+        """
+        SELECT run_id, status, started_at, updated_at, error
+        FROM pipeline_runs
+        ORDER BY started_at DESC, run_id DESC
+        LIMIT 1;
+        """
+    ).fetchone()
+    if not row or row["status"] not in RESUMABLE_RUN_STATUSES:
+        return None
+    return dict(row)
+
+
+def set_stage_checkpoint(
+    conn: sqlite3.Connection,
+    run_id: str,
+    stage: str,
+    unit_id: str,
+    status: str,
+    updated_at: str,
+    detail: str | None = None,
+) -> None:
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO stage_checkpoints(
+            run_id, stage, unit_id, status, detail, updated_at
+        )
+        VALUES(?, ?, ?, ?, ?, ?);
+        """,
+        (run_id, stage, unit_id, status, detail, updated_at),
+    )
+    commit(conn)
+
+
+def set_stage_checkpoints(
+    conn: sqlite3.Connection,
+    run_id: str,
+    stage: str,
+    unit_ids: Iterable[str],
+    status: str,
+    updated_at: str,
+) -> None:
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO stage_checkpoints(
+            run_id, stage, unit_id, status, detail, updated_at
+        )
+        VALUES(?, ?, ?, ?, NULL, ?);
+        """,
+        ((run_id, stage, unit_id, status, updated_at) for unit_id in unit_ids),
+    )
+    commit(conn)
+
+
+def list_stage_checkpoints(
+    conn: sqlite3.Connection, run_id: str, stage: str
+) -> List[Dict[str, Any]]:
+    rows = query(
+        conn,
+        """
+        SELECT run_id, stage, unit_id, status, detail, updated_at
+        FROM stage_checkpoints
+        WHERE run_id = ? AND stage = ?
+        ORDER BY unit_id;
+        """,
+        (run_id, stage),
+    ).fetchall()
+    return [dict(row) for row in rows]
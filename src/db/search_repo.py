@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import Any, Dict, List, Sequence, Tuple
+
+from src.db.connection import query
+from src.db.transaction import commit
+
+FULL_TEXT_TABLES = ("content_blocks_fts", "domain_aliases_fts")
+DEFAULT_SEARCH_LIMIT = 50
+MIN_TRIGRAM_LENGTH = 3
+SNIPPET_TOKENS = 48
+SNIPPET_PREVIEW_CHARS = 160
+HIGHLIGHT = ("**", "**")
+
+
+def search_content_blocks(
+    conn: sqlite3.Connection,
+    text: str,
+    limit: int = DEFAULT_SEARCH_LIMIT,
+    pdf_id: str | None = None,
+) -> List[Dict[str, Any]]:
+    match, likes = _split_terms(text)
+    if not match and not likes:
+        return []
+    where, params = _like_filter("content_blocks.text", likes)
+    if pdf_id is not None:
+        where.append("content_blocks.pdf_id = ?")
+        params.append(pdf_id)
+    columns = """
+        content_blocks.block_id,
+        content_blocks.pdf_id,
+        pdfs.file_path,
+        content_blocks.section_path,
+        content_blocks.page_index,
+    """
+    if match:
+        sql = f"""
+            SELECT {columns}
+                   snippet(content_blocks_fts, 1, ?, ?, '…', {SNIPPET_TOKENS}) AS snippet,
+                   bm25(content_blocks_fts, 0.5, 1.0) AS score
+            FROM content_blocks_fts
+            JOIN content_blocks ON content_blocks.rowid = content_blocks_fts.rowid
+            JOIN pdfs ON pdfs.pdf_id = content_blocks.pdf_id
+            WHERE content_blocks_fts MATCH ? {''.join(f' AND {clause}' for clause in where)}
+            ORDER BY score
+            LIMIT ?;
+        """
+        rows = query(conn, sql, [*HIGHLIGHT, match, *params, limit]).fetchall()
+    else:
+        sql = f"""
+            SELECT {columns}
+                   substr(content_blocks.text, 1, {SNIPPET_PREVIEW_CHARS}) AS snippet,
+                   0.0 AS score
+            FROM content_blocks
+            JOIN pdfs ON pdfs.pdf_id = content_blocks.pdf_id
+            WHERE {' AND '.join(where)}
+            ORDER BY content_blocks.pdf_id, content_blocks.position_index
+            LIMIT ?;
+        """
+        rows = query(conn, sql, [*params, limit]).fetchall()
+    return [dict(row) for row in rows]
+
+
+def search_domain_aliases(
+    conn: sqlite3.Connection, text: str, limit: int = DEFAULT_SEARCH_LIMIT
+) -> List[Dict[str, Any]]:
+    match, likes = _split_terms(text)
+    if not match and not likes:
+        return []
+    where, params = _like_filter("domain_aliases.alias", likes)
+    columns = """
+        domain_aliases.domain_id,
+        domains.display_name,
+        domain_aliases.alias,
+        domain_aliases.source_pdf_id
+    """
+    if match:
+        sql = f"""
+            SELECT {columns}, bm25(domain_aliases_fts) AS score
+            FROM domain_aliases_fts
+            JOIN domain_aliases ON domain_aliases.rowid = domain_aliases_fts.rowid
+            JOIN domains ON domains.domain_id = domain_aliases.domain_id
+            WHERE domain_aliases_fts MATCH ? {''.join(f' AND {clause}' for clause in where)}
+            ORDER BY score
+            LIMIT ?;
+        """
+        rows = query(conn, sql, [match, *params, limit]).fetchall()
+    else:
+        sql = f"""
+            SELECT {columns}, 0.0 AS score
+            FROM domain_aliases
+            JOIN domains ON domains.domain_id = domain_aliases.domain_id
+            WHERE {' AND '.join(where)}
+            ORDER BY domain_aliases.domain_id, domain_aliases.alias
+            LIMIT ?;
+        """
+        rows = query(conn, sql, [*params, limit]).fetchall()
+    return [dict(row) for row in rows]
+
+
+def rebuild_search_index(conn: sqlite3.Connection) -> None:
+    for table in FULL_TEXT_TABLES:
+        conn.execute(f"INSERT INTO {table}({table}) VALUES('rebuild');")
+    commit(conn)
+
+
+def optimize_search_index(conn: sqlite3.Connection) -> None:
+    for table in FULL_TEXT_TABLES:
+        conn.execute(f"INSERT INTO {table}({table}) VALUES('optimize');")
+    commit(conn)
+
+
+def _split_terms(text: str) -> Tuple[str, List[str]]:
+    terms = text.split()
+    match = " ".join(
+        '"' + term.replace('"', '""') + '"'
+        for term in terms
+        if len(term) >= MIN_TRIGRAM_LENGTH
+    )
+    return match, [term for term in terms if len(term) < MIN_TRIGRAM_LENGTH]
+
+
+def _like_filter(column: str, terms: Sequence[str]) -> Tuple[List[str], List[Any]]:
+    clauses = [f"{column} LIKE ? ESCAPE '\\'" for _ in terms]
+    params: List[Any] = [
+        "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        for term in terms
+    ]
+    return clauses, params
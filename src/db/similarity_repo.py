@@ -1,7 +1,11 @@
 from __future__ import annotations
 
 import sqlite3
-from typing import Any, Dict, Iterable, List, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
+
+from src.db.connection import iter_in_chunks
+from src.db.pagination import DEFAULT_PAGE_SIZE, RowFactory, iter_keyset
+from src.db.transaction import commit
 
 
 def insert_similarity_pairs(
@@ -9,21 +13,45 @@ def insert_similarity_pairs(
 ) -> None:
     conn.executemany(
         """
-        INSERT INTO candidate_similarity(candidate_a_id, candidate_b_id, similarity, mode)
+        INSERT OR REPLACE INTO candidate_similarity(candidate_a_id, candidate_b_id, similarity, mode)
         VALUES(?, ?, ?, ?);
         """,
         list(pairs),
     )
-    conn.commit()
+    commit(conn)
+
+
+def iter_similarity_pairs(
+    conn: sqlite3.Connection,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    row_factory: RowFactory | None = None,
+) -> Iterator[Any]:
+    return iter_keyset(
+        conn,
+        "candidate_similarity",
+        ("candidate_a_id", "candidate_b_id", "similarity", "mode"),
+        ("candidate_a_id", "candidate_b_id", "mode"),
+        page_size=page_size,
+        row_factory=row_factory,
+    )
 
 
 def list_similarity_pairs(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
+    return list(iter_similarity_pairs(conn))
+
+
+def list_similarity_pairs_within(
+    conn: sqlite3.Connection, candidate_ids: Iterable[str]
+) -> List[Tuple[str, str, float, str]]:
+    members: Set[str] = set(candidate_ids)
+    rows = iter_in_chunks(
+        conn,
         """
         SELECT candidate_a_id, candidate_b_id, similarity, mode
         FROM candidate_similarity
-        ORDER BY candidate_a_id, candidate_b_id;
-        """
-    ).fetchall()
-    return [dict(row) for row in rows]
+        WHERE candidate_a_id IN ({placeholders})
+        ORDER BY candidate_a_id, candidate_b_id, mode;
+        """,
+        members,
+    )
+    return [tuple(row) for row in rows if row[1] in members]
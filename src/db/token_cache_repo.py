@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import sqlite3
-from typing import Any, Dict, Optional
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
 
+from src.db.connection import execute_in_chunks, iter_in_chunks, query
+from src.db.transaction import commit
 from src.pipeline.hash_utils import text_hash
 
 
@@ -16,20 +19,36 @@ def set_token_count_cache(
     conn.execute(
         """
         INSERT OR REPLACE INTO token_count_cache(
-            text_hash, model_name, token_count, tokenization_mode
+            text_hash, model_name, token_count, tokenization_mode, last_used_at
         )
-        VALUES(?, ?, ?, ?);
+        VALUES(?, ?, ?, ?, ?);
+        """,
+        (text_hash, model_name, token_count, tokenization_mode, _now()),
+    )
+    commit(conn)
+
+
+def set_token_count_cache_entries(
+    conn: sqlite3.Connection, entries: Iterable[Tuple[str, str, int, str]]
+) -> None:
+    used_at = _now()
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO token_count_cache(
+            text_hash, model_name, token_count, tokenization_mode, last_used_at
+        )
+        VALUES(?, ?, ?, ?, ?);
         """,
-        (text_hash, model_name, token_count, tokenization_mode),
+        ((*entry, used_at) for entry in entries),
     )
-    conn.commit()
+    commit(conn)
 
 
 def get_token_count_cache(
     conn: sqlite3.Connection, text_hash: str, model_name: str
 ) -> Optional[Dict[str, Any]]:
-    conn.row_factory = sqlite3.Row
-    row = conn.execute(
+    row = query(
+        conn,
         """
         SELECT text_hash, model_name, token_count, tokenization_mode
         FROM token_count_cache
@@ -40,6 +59,36 @@ def get_token_count_cache(
     return dict(row) if row else None
 
 
+def get_token_count_cache_entries(
+    conn: sqlite3.Connection, text_hashes: Iterable[str], model_name: str
+) -> Dict[str, Dict[str, Any]]:
+    return _fetch_entries(
+        conn,
+        """
+        SELECT text_hash, model_name, token_count, tokenization_mode
+        FROM token_count_cache
+        WHERE model_name = ? AND text_hash IN ({placeholders});
+        """,
+        (model_name,),
+        text_hashes,
+    )
+
+
+def touch_token_count_cache_entries(
+    conn: sqlite3.Connection, text_hashes: Iterable[str], model_name: str
+) -> None:
+    _touch_entries(
+        conn,
+        """
+        UPDATE token_count_cache
+        SET last_used_at = ?
+        WHERE model_name = ? AND text_hash IN ({placeholders});
+        """,
+        (model_name,),
+        text_hashes,
+    )
+
+
 def set_token_count_cache_for_text(
     conn: sqlite3.Connection,
     text: str,
@@ -67,26 +116,42 @@ def set_trunc_text_cache(
     text_hash: str,
     model_name: str,
     max_tokens: int,
-    truncated_text: str,
+    truncated_text: str | None,
     tokenization_mode: str,
 ) -> None:
     conn.execute(
         """
         INSERT OR REPLACE INTO trunc_text_cache(
-            text_hash, model_name, max_tokens, truncated_text, tokenization_mode
+            text_hash, model_name, max_tokens, truncated_text, tokenization_mode, last_used_at
         )
-        VALUES(?, ?, ?, ?, ?);
+        VALUES(?, ?, ?, ?, ?, ?);
         """,
-        (text_hash, model_name, max_tokens, truncated_text, tokenization_mode),
+        (text_hash, model_name, max_tokens, truncated_text, tokenization_mode, _now()),
     )
-    conn.commit()
+    commit(conn)
+
+
+def set_trunc_text_cache_entries(
+    conn: sqlite3.Connection, entries: Iterable[Tuple[str, str, int, str | None, str]]
+) -> None:
+    used_at = _now()
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO trunc_text_cache(
+            text_hash, model_name, max_tokens, truncated_text, tokenization_mode, last_used_at
+        )
+        VALUES(?, ?, ?, ?, ?, ?);
+        """,
+        ((*entry, used_at) for entry in entries),
+    )
+    commit(conn)
 
 
 def get_trunc_text_cache(
     conn: sqlite3.Connection, text_hash: str, model_name: str, max_tokens: int
 ) -> Optional[Dict[str, Any]]:
-    conn.row_factory = sqlite3.Row
-    row = conn.execute(
+    row = query(
+        conn,
         """
         SELECT text_hash, model_name, max_tokens, truncated_text, tokenization_mode
         FROM trunc_text_cache
@@ -97,6 +162,36 @@ def get_trunc_text_cache(
     return dict(row) if row else None
 
 
+def get_trunc_text_cache_entries(
+    conn: sqlite3.Connection, text_hashes: Iterable[str], model_name: str, max_tokens: int
+) -> Dict[str, Dict[str, Any]]:
+    return _fetch_entries(
+        conn,
+        """
+        SELECT text_hash, model_name, max_tokens, truncated_text, tokenization_mode
+        FROM trunc_text_cache
+        WHERE model_name = ? AND max_tokens = ? AND text_hash IN ({placeholders});
+        """,
+        (model_name, max_tokens),
+        text_hashes,
+    )
+
+
+def touch_trunc_text_cache_entries(
+    conn: sqlite3.Connection, text_hashes: Iterable[str], model_name: str, max_tokens: int
+) -> None:
+    _touch_entries(
+        conn,
+        """
+        UPDATE trunc_text_cache
+        SET last_used_at = ?
+        WHERE model_name = ? AND max_tokens = ? AND text_hash IN ({placeholders});
+        """,
+        (model_name, max_tokens),
+        text_hashes,
+    )
+
+
 def set_trunc_text_cache_for_text(
     conn: sqlite3.Connection,
     text: str,
@@ -110,7 +205,7 @@ def set_trunc_text_cache_for_text(
         text_hash=text_hash(text),
         model_name=model_name,
         max_tokens=max_tokens,
-        truncated_text=truncated_text,
+        truncated_text=None if truncated_text == text else truncated_text,
         tokenization_mode=tokenization_mode,
     )
 
@@ -118,6 +213,33 @@ def set_trunc_text_cache_for_text(
 def get_trunc_text_cache_for_text(
     conn: sqlite3.Connection, text: str, model_name: str, max_tokens: int
 ) -> Optional[Dict[str, Any]]:
-    return get_trunc_text_cache(
+    row = get_trunc_text_cache(
         conn, text_hash=text_hash(text), model_name=model_name, max_tokens=max_tokens
     )
+    if row and row["truncated_text"] is None:
+        row["truncated_text"] = text
+    return row
+
+
+def _fetch_entries(
+    conn: sqlite3.Connection,
+    sql: str,
+    params: Tuple[Any, ...],
+    text_hashes: Iterable[str],
+) -> Dict[str, Dict[str, Any]]:
+    rows = iter_in_chunks(conn, sql, text_hashes, params)
+    return {row["text_hash"]: dict(row) for row in rows}
+
+
+def _touch_entries(
+    conn: sqlite3.Connection,
+    sql: str,
+    params: Tuple[Any, ...],
+    text_hashes: Iterable[str],
+) -> None:
+    execute_in_chunks(conn, sql, text_hashes, (_now(), *params))
+    commit(conn)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
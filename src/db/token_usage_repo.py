@@ -1,14 +1,17 @@
 from __future__ import annotations
 
 import sqlite3
-from dataclasses import dataclass
-from typing import Dict
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
+
+from src.db.connection import query
 
 
 @dataclass(frozen=True)
 class TokenUsageSummary:
     run_id: str
     tokens_by_model: Dict[str, int]
+    cache_by_model: Dict[str, Tuple[int, int]] = field(default_factory=dict)
 
 
 def insert_token_usage(
@@ -17,21 +20,23 @@ def insert_token_usage(
     model_name: str,
     total_tokens: int,
     created_at: str,
+    cache_hits: int = 0,
+    cache_misses: int = 0,
 ) -> None:
     conn.execute(
         """
         INSERT OR REPLACE INTO token_usage(
-            run_id, model_name, total_tokens, created_at
+            run_id, model_name, total_tokens, created_at, cache_hits, cache_misses
         )
-        VALUES(?, ?, ?, ?);
+        VALUES(?, ?, ?, ?, ?, ?);
         """,
-        (run_id, model_name, total_tokens, created_at),
+        (run_id, model_name, total_tokens, created_at, cache_hits, cache_misses),
     )
 
 
 def get_latest_run_usage(conn: sqlite3.Connection) -> TokenUsageSummary | None:
-    conn.row_factory = sqlite3.Row
-    row = conn.execute(
+    row = query(
+        conn,
         """
         SELECT run_id
         FROM token_usage
@@ -42,9 +47,10 @@ def get_latest_run_usage(conn: sqlite3.Connection) -> TokenUsageSummary | None:
     if not row:
         return None
     run_id = row["run_id"]
-    rows = conn.execute(
+    rows = query(
+        conn,
         """
-        SELECT model_name, total_tokens
+        SELECT model_name, total_tokens, cache_hits, cache_misses
         FROM token_usage
         WHERE run_id = ?
         ORDER BY model_name;
@@ -52,12 +58,17 @@ def get_latest_run_usage(conn: sqlite3.Connection) -> TokenUsageSummary | None:
         (run_id,),
     ).fetchall()
     tokens_by_model = {item["model_name"]: item["total_tokens"] for item in rows}
-    return TokenUsageSummary(run_id=run_id, tokens_by_model=tokens_by_model)
+    cache_by_model = {
+        item["model_name"]: (item["cache_hits"], item["cache_misses"]) for item in rows
+    }
+    return TokenUsageSummary(
+        run_id=run_id, tokens_by_model=tokens_by_model, cache_by_model=cache_by_model
+    )
 
 
 def get_total_usage(conn: sqlite3.Connection) -> Dict[str, int]:
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
+    rows = query(
+        conn,
         """
         SELECT model_name, SUM(total_tokens) AS total_tokens
         FROM token_usage
@@ -66,3 +77,23 @@ def get_total_usage(conn: sqlite3.Connection) -> Dict[str, int]:
         """
     ).fetchall()
     return {row["model_name"]: row["total_tokens"] for row in rows}
+
+
+def get_total_cache_usage(conn: sqlite3.Connection) -> Dict[str, Tuple[int, int]]:
+    rows = query(
+        conn,
+        """
+        SELECT model_name, SUM(cache_hits) AS cache_hits, SUM(cache_misses) AS cache_misses
+        FROM token_usage
+        GROUP BY model_name
+        ORDER BY model_name;
+        """
+    ).fetchall()
+    return {row["model_name"]: (row["cache_hits"], row["cache_misses"]) for row in rows}
+
+
+def cache_hit_rate(cache_hits: int, cache_misses: int) -> float | None:
+    lookups = cache_hits + cache_misses
+    if not lookups:
+        return None
+    return cache_hits / lookups
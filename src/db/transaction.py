@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import sqlite3
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+_DEPTHS: Dict[int, int] = {}
+
+
+@contextmanager
+def unit_of_work(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    key = id(conn)
+    depth = _DEPTHS.get(key, 0)
+    _DEPTHS[key] = depth + 1
+    try:
+        yield conn
+    except BaseException:
+        _restore_depth(key, depth)
+        if depth == 0:
+            conn.rollback()
+        raise
+    _restore_depth(key, depth)
+    if depth == 0:
+        conn.commit()
+
+
+def in_unit_of_work(conn: sqlite3.Connection) -> bool:
+    return id(conn) in _DEPTHS
+
+
+def commit(conn: sqlite3.Connection) -> None:
+    if not in_unit_of_work(conn):
+        conn.commit()
+
+
+def _restore_depth(key: int, depth: int) -> None:
+    if depth == 0:
+        _DEPTHS.pop(key, None)
+    else:
+        _DEPTHS[key] = depth
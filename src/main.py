@@ -21,7 +21,10 @@ def run_ui() -> int:
 
 
 def rag() -> int:
-    return run_ui()
+    args = sys.argv[1:]
+    if not args or args[0] == "ui":
+        return run_ui()
+    return run_cli(args)
 
 
 def main() -> int:
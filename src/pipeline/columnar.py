@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from src.db.candidate_repo import CANDIDATE_COLUMNS, iter_candidates
+from src.db.connection import connect, insert_missing_rows
+from src.db.content_repo import CONTENT_BLOCK_COLUMNS, iter_content_block_rows
+from src.db.domain_repo import (
+    iter_block_domain_map,
+    iter_domain_aliases,
+    iter_domain_sources,
+    iter_domains,
+)
+from src.db.embedding_repo import (
+    DEFAULT_VECTOR_DTYPE,
+    VECTOR_DTYPES,
+    insert_candidate_embeddings,
+    insert_domain_embeddings,
+    iter_candidate_embeddings,
+    iter_domain_embeddings,
+)
+from src.db.repo import PDF_COLUMNS, iter_pdfs
+from src.db.transaction import unit_of_work
+
+EXPORT_FORMATS = ("parquet",)
+DEFAULT_CHUNK_ROWS = 65536
+_INTEGER_COLUMNS = {"heading_level", "page_index", "position_index", "token_count"}
+_TABLE_ERRORS = (sqlite3.Error, OSError, ValueError, KeyError)
+
+
+@dataclass(frozen=True)
+class _Table:
+    name: str
+    columns: Tuple[str, ...]
+    iterate: Callable[..., Iterator[Any]]
+    insert_vectors: Callable[..., Any] | None = None
+
+    @property
+    def vectors(self) -> bool:
+        return self.insert_vectors is not None
+
+
+TABLES: Tuple[_Table, ...] = (
+    _Table("pdfs", PDF_COLUMNS, iter_pdfs),
+    _Table("content_blocks", CONTENT_BLOCK_COLUMNS, iter_content_block_rows),
+    _Table("domain_candidates", CANDIDATE_COLUMNS, iter_candidates),
+    _Table(
+        "candidate_embeddings",
+        ("candidate_id", "model_name", "vector", "token_count", "tokenization_mode"),
+        iter_candidate_embeddings,
+        insert_candidate_embeddings,
+    ),
+    _Table("domains", ("domain_id", "display_name", "created_at"), iter_domains),
+    _Table(
+        "domain_aliases",
+        ("domain_id", "alias", "source_pdf_id", "heading_level"),
+        iter_domain_aliases,
+    ),
+    _Table("domain_sources", ("domain_id", "pdf_id"), iter_domain_sources),
+    _Table("block_domain_map", ("block_id", "domain_id"), iter_block_domain_map),
+    _Table(
+        "domain_embeddings",
+        ("domain_id", "model_name", "vector", "token_count", "tokenization_mode"),
+        iter_domain_embeddings,
+        insert_domain_embeddings,
+    ),
+)
+TABLE_NAMES = tuple(table.name for table in TABLES)
+
+
+def export_tables(
+    db_path: str,
+    output_dir: Path,
+    tables: Sequence[str] | None = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    workers: int | None = None,
+) -> Dict[str, int]:
+    pa, pq = _require_pyarrow()
+    if chunk_rows <= 0:
+        raise ValueError("chunk_rows must be positive")
+    selected = _select_tables(tables)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=workers or len(selected)) as pool:
+        futures = {
+            table.name: pool.submit(
+                _export_table, pa, pq, db_path, table, output_dir, chunk_rows
+            )
+            for table in selected
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+
+def import_tables(
+    conn: sqlite3.Connection,
+    input_dir: Path,
+    tables: Sequence[str] | None = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    dtype: str = DEFAULT_VECTOR_DTYPE,
+) -> Dict[str, int]:
+    pa, pq = _require_pyarrow()
+    counts: Dict[str, int] = {}
+    with unit_of_work(conn):
+        for table in _select_tables(tables):
+            path = input_dir / f"{table.name}.parquet"
+            if not path.exists():
+                continue
+            try:
+                counts[table.name] = _import_table(pq, conn, table, path, chunk_rows, dtype)
+            except (*_TABLE_ERRORS, pa.ArrowException) as exc:
+                raise RuntimeError(f"Failed to import {table.name}: {exc}") from exc
+    return counts
+
+
+def load_embedding_matrix(path: Path) -> Tuple[List[str], np.ndarray]:
+    _, pq = _require_pyarrow()
+    table = pq.read_table(path)
+    vectors = table.column("vector").combine_chunks()
+    matrix = vectors.flatten().to_numpy().reshape(len(vectors), vectors.type.list_size)
+    return table.column(0).to_pylist(), matrix
+
+
+def _import_table(
+    pq: Any,
+    conn: sqlite3.Connection,
+    table: _Table,
+    path: Path,
+    chunk_rows: int,
+    dtype: str,
+) -> int:
+    count = 0
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+        if table.insert_vectors is not None:
+            table.insert_vectors(conn, _embedding_rows(batch), dtype=dtype)
+        else:
+            columns = [batch.column(name).to_pylist() for name in table.columns]
+            insert_missing_rows(conn, table.name, table.columns, zip(*columns))
+        count += batch.num_rows
+    return count
+
+
+def _export_table(
+    pa: Any,
+    pq: Any,
+    db_path: str,
+    table: _Table,
+    output_dir: Path,
+    chunk_rows: int,
+) -> int:
+    try:
+        return _write_table(pa, pq, db_path, table, output_dir, chunk_rows)
+    except (*_TABLE_ERRORS, pa.ArrowException) as exc:
+        raise RuntimeError(f"Failed to export {table.name}: {exc}") from exc
+
+
+def _write_table(
+    pa: Any,
+    pq: Any,
+    db_path: str,
+    table: _Table,
+    output_dir: Path,
+    chunk_rows: int,
+) -> int:
+    path = output_dir / f"{table.name}.parquet"
+    partial = path.with_name(f"{path.name}.partial")
+    conn = connect(db_path, read_only=True)
+    writer = None
+    count = 0
+    try:
+        rows = table.iterate(conn, page_size=chunk_rows, row_factory=tuple)
+        while chunk := list(islice(rows, chunk_rows)):
+            batch = _to_arrow(pa, table, chunk)
+            if writer is None:
+                writer = pq.ParquetWriter(partial, batch.schema)
+            elif batch.schema != writer.schema:
+                raise ValueError("mixed vector layouts; export one model at a time")
+            writer.write_table(batch)
+            count += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+        conn.close()
+    if writer is None:
+        path.unlink(missing_ok=True)
+    else:
+        partial.replace(path)
+    return count
+
+
+def _to_arrow(pa: Any, table: _Table, rows: List[Tuple[Any, ...]]) -> Any:
+    if table.vectors:
+        return _embeddings_to_arrow(pa, table, rows)
+    values = list(zip(*rows))
+    return pa.table(
+        {
+            column: pa.array(
+                column_values,
+                type=pa.int32() if column in _INTEGER_COLUMNS else pa.string(),
+            )
+            for column, column_values in zip(table.columns, values)
+        }
+    )
+
+
+def _embeddings_to_arrow(pa: Any, table: _Table, rows: List[Tuple[Any, ...]]) -> Any:
+    layouts = {(row[3], row[4]) for row in rows}
+    if len(layouts) != 1:
+        raise ValueError("mixed vector layouts; export one model at a time")
+    dim, dtype = layouts.pop()
+    flat = np.frombuffer(b"".join(row[2] for row in rows), dtype=VECTOR_DTYPES[dtype])
+    key, model_name, vector, token_count, tokenization_mode = table.columns
+    return pa.table(
+        {
+            key: pa.array([row[0] for row in rows], type=pa.string()),
+            model_name: pa.array([row[1] for row in rows], type=pa.string()),
+            vector: pa.FixedSizeListArray.from_arrays(
+                pa.array(flat.astype(np.float32, copy=False)), dim
+            ),
+            token_count: pa.array([row[5] for row in rows], type=pa.int32()),
+            tokenization_mode: pa.array([row[6] for row in rows], type=pa.string()),
+        }
+    )
+
+
+def _embedding_rows(batch: Any) -> Iterator[Tuple[str, str, np.ndarray, int, str]]:
+    vectors = batch.column(2)
+    matrix = vectors.flatten().to_numpy().reshape(len(vectors), vectors.type.list_size)
+    return zip(
+        batch.column(0).to_pylist(),
+        batch.column(1).to_pylist(),
+        matrix,
+        batch.column(3).to_pylist(),
+        batch.column(4).to_pylist(),
+    )
+
+
+def _select_tables(names: Sequence[str] | None) -> List[_Table]:
+    if names is None:
+        return list(TABLES)
+    unknown = sorted(set(names) - set(TABLE_NAMES))
+    if unknown:
+        raise ValueError(f"unknown tables: {', '.join(unknown)}")
+    return [table for table in TABLES if table.name in names]
+
+
+def _require_pyarrow() -> Tuple[Any, Any]:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError(
+            "Parquet export needs pyarrow; install the 'parquet' extra."
+        ) from exc
+    return pa, pq
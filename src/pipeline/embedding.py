@@ -1,19 +1,30 @@
 ﻿from __future__ import annotations
 
-import json
-from dataclasses import dataclass
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from os import getenv
-from typing import List, Sequence
+from typing import Any, Deque, Dict, Iterator, List, Sequence, Tuple
 
 from openai import AzureOpenAI
 
+from src.db.embedding_cache_repo import (
+    get_cached_embeddings,
+    set_cached_embeddings,
+    touch_cached_embeddings,
+)
 from src.db.token_cache_repo import (
-    get_token_count_cache_for_text,
-    get_trunc_text_cache_for_text,
-    set_token_count_cache_for_text,
-    set_trunc_text_cache_for_text,
+    get_token_count_cache_entries,
+    get_trunc_text_cache_entries,
+    set_token_count_cache_entries,
+    set_trunc_text_cache_entries,
+    touch_token_count_cache_entries,
+    touch_trunc_text_cache_entries,
 )
-from src.pipeline.tokenization import count_tokens_with_mode, truncate_text_with_mode
+from src.db.transaction import unit_of_work
+from src.pipeline.hash_utils import text_hash
+from src.pipeline.tokenization import tokenize_texts
 
 
 @dataclass(frozen=True)
@@ -23,6 +34,18 @@ class EmbeddingResult:
     tokenization_mode: str
     truncated_texts: List[str]
     total_tokens: int
+    cache_hits: int = 0
+    cache_misses: int = 0
+    request_tokens: List[int] = field(default_factory=list)
+
+    @property
+    def request_count(self) -> int:
+        return len(self.request_tokens)
+
+
+BatchRange = Tuple[int, int]
+DEFAULT_BATCH_MAX_INPUTS = 256
+DEFAULT_BATCH_MAX_TOKENS = 32768
 
 
 class AzureOpenAIEmbedder:
@@ -32,10 +55,22 @@ class AzureOpenAIEmbedder:
         max_tokens: int,
         approx_enabled: bool,
         client: AzureOpenAI | None = None,
+        dimensions: int = 0,
+        concurrency: int = 1,
+        batch_max_inputs: int = DEFAULT_BATCH_MAX_INPUTS,
+        batch_max_tokens: int = DEFAULT_BATCH_MAX_TOKENS,
     ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if batch_max_inputs < 1 or batch_max_tokens < 1:
+            raise ValueError("batch limits must be at least 1")
         self.model_name = model_name
         self.max_tokens = max_tokens
         self.approx_enabled = approx_enabled
+        self.dimensions = dimensions
+        self.concurrency = concurrency
+        self.batch_max_inputs = batch_max_inputs
+        self.batch_max_tokens = batch_max_tokens
         self.client = client or AzureOpenAI(
             api_key=getenv("AZURE_OPENAI_API_KEY"),
             azure_endpoint=getenv("AZURE_OPENAI_ENDPOINT"),
@@ -43,7 +78,10 @@ class AzureOpenAIEmbedder:
         )
 
     def embed_texts(
-        self, conn, texts: Sequence[str], batch_size: int = 16
+        self,
+        conn,
+        texts: Sequence[str],
+        batch_size: int | None = None,
     ) -> EmbeddingResult:
         truncated_texts, token_counts, mode = _prepare_texts(
             conn,
@@ -52,71 +90,180 @@ class AzureOpenAIEmbedder:
             self.max_tokens,
             self.approx_enabled,
         )
-        vectors: List[List[float]] = []
+        hashes = [text_hash(text) for text in truncated_texts]
+        cached = get_cached_embeddings(conn, hashes, self.model_name, self.dimensions)
+        touch_cached_embeddings(
+            conn,
+            cached,
+            self.model_name,
+            self.dimensions,
+            datetime.now(timezone.utc).isoformat(),
+        )
+        pending: Dict[str, int] = {}
+        for idx, digest in enumerate(hashes):
+            if digest not in cached:
+                pending.setdefault(digest, idx)
+        miss_hashes = list(pending)
+        miss_indices = list(pending.values())
+        miss_texts = [truncated_texts[idx] for idx in miss_indices]
+        miss_token_counts = [token_counts[idx] for idx in miss_indices]
+        batches = plan_batches(
+            miss_token_counts,
+            batch_size or self.batch_max_inputs,
+            self.batch_max_tokens,
+        )
         total_tokens = 0
-        for i in range(0, len(truncated_texts), batch_size):
-            batch = truncated_texts[i : i + batch_size]
-            response = self.client.embeddings.create(
-                model=self.model_name,
-                input=batch,
+        request_tokens: List[int] = []
+        for (start, end), batch_vectors, batch_tokens in self._iter_batches(
+            miss_texts, batches
+        ):
+            request_tokens.append(sum(miss_token_counts[start:end]))
+            if batch_tokens is None:
+                batch_tokens = request_tokens[-1]
+            batch_keys = miss_hashes[start:end]
+            set_cached_embeddings(
+                conn,
+                zip(batch_keys, batch_vectors, strict=False),
+                self.model_name,
+                self.dimensions,
+                datetime.now(timezone.utc).isoformat(),
             )
-            vectors.extend([item.embedding for item in response.data])
-            usage = getattr(response, "usage", None)
-            if usage and getattr(usage, "total_tokens", None) is not None:
-                total_tokens += int(usage.total_tokens)
-            else:
-                total_tokens += sum(token_counts[i : i + batch_size])
+            cached.update(zip(batch_keys, batch_vectors, strict=False))
+            total_tokens += batch_tokens
+        vectors = [cached[digest] for digest in hashes]
         return EmbeddingResult(
             vectors=vectors,
             token_counts=token_counts,
             tokenization_mode=mode,
             truncated_texts=truncated_texts,
             total_tokens=total_tokens,
+            cache_hits=len(hashes) - len(miss_hashes),
+            cache_misses=len(miss_hashes),
+            request_tokens=request_tokens,
+        )
+
+    def _iter_batches(
+        self,
+        texts: Sequence[str],
+        batches: Sequence[BatchRange],
+    ) -> Iterator[Tuple[BatchRange, List[List[float]], int | None]]:
+        in_flight: Deque[Tuple[BatchRange, Future]] = deque()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            try:
+                for start, end in batches:
+                    if len(in_flight) >= self.concurrency:
+                        done_range, future = in_flight.popleft()
+                        yield (done_range, *future.result())
+                    in_flight.append(
+                        ((start, end), pool.submit(self._request, texts[start:end]))
+                    )
+                while in_flight:
+                    done_range, future = in_flight.popleft()
+                    yield (done_range, *future.result())
+            finally:
+                for _, future in in_flight:
+                    future.cancel()
+
+    def _request(self, batch: Sequence[str]) -> Tuple[List[List[float]], int | None]:
+        response = self.client.embeddings.create(model=self.model_name, input=list(batch))
+        usage = getattr(response, "usage", None)
+        total_tokens = getattr(usage, "total_tokens", None) if usage else None
+        return (
+            [item.embedding for item in response.data],
+            int(total_tokens) if total_tokens is not None else None,
         )
 
 
 def _prepare_texts(conn, texts, model_name, max_tokens, approx_enabled):
-    truncated_texts: List[str] = []
-    token_counts: List[int] = []
-    tokenization_mode = "exact"
-    for text in texts:
-        trunc_cache = get_trunc_text_cache_for_text(conn, text, model_name, max_tokens)
-        if trunc_cache:
-            truncated = trunc_cache["truncated_text"]
-            if trunc_cache["tokenization_mode"] == "approx":
-                tokenization_mode = "approx"
-        else:
-            truncated, tokenization_mode = truncate_text_with_mode(
-                text, model_name=model_name, max_tokens=max_tokens, approx_enabled=approx_enabled
+    with unit_of_work(conn):
+        hashes = [text_hash(text) for text in texts]
+        trunc_cache = get_trunc_text_cache_entries(conn, hashes, model_name, max_tokens)
+        trunc_hits = list(trunc_cache)
+        misses = {
+            digest: text
+            for text, digest in zip(texts, hashes, strict=False)
+            if digest not in trunc_cache
+        }
+        tokenized = tokenize_texts(list(misses.values()), model_name, max_tokens, approx_enabled)
+        count_hashes: Dict[str, str] = {}
+        count_cache: Dict[str, Dict[str, Any]] = {}
+        new_trunc_entries: List[Tuple[str, str, int, str | None, str]] = []
+        new_count_entries: List[Tuple[str, str, int, str]] = []
+        for (digest, text), result in zip(misses.items(), tokenized, strict=False):
+            truncated = None if result.text == text else result.text
+            count_hash = digest if truncated is None else text_hash(truncated)
+            trunc_cache[digest] = {
+                "truncated_text": truncated,
+                "tokenization_mode": result.tokenization_mode,
+            }
+            count_hashes[digest] = count_hash
+            count_cache[count_hash] = {
+                "token_count": result.token_count,
+                "tokenization_mode": result.tokenization_mode,
+            }
+            new_trunc_entries.append(
+                (digest, model_name, max_tokens, truncated, result.tokenization_mode)
             )
-            set_trunc_text_cache_for_text(
-                conn,
-                text=text,
-                model_name=model_name,
-                max_tokens=max_tokens,
-                truncated_text=truncated,
-                tokenization_mode=tokenization_mode,
+            new_count_entries.append(
+                (count_hash, model_name, result.token_count, result.tokenization_mode)
+            )
+
+        for digest, cached in trunc_cache.items():
+            if digest not in count_hashes:
+                truncated = cached["truncated_text"]
+                count_hashes[digest] = digest if truncated is None else text_hash(truncated)
+        count_hits = get_token_count_cache_entries(
+            conn, (count_hashes[digest] for digest in trunc_hits), model_name
+        )
+        count_cache.update(count_hits)
+        uncounted: Dict[str, str] = {}
+        for text, digest in zip(texts, hashes, strict=False):
+            count_hash = count_hashes[digest]
+            if count_hash not in count_cache:
+                truncated = trunc_cache[digest]["truncated_text"]
+                uncounted.setdefault(count_hash, text if truncated is None else truncated)
+        recounted = tokenize_texts(list(uncounted.values()), model_name, None, approx_enabled)
+        for count_hash, result in zip(uncounted, recounted, strict=False):
+            count_cache[count_hash] = {
+                "token_count": result.token_count,
+                "tokenization_mode": result.tokenization_mode,
+            }
+            new_count_entries.append(
+                (count_hash, model_name, result.token_count, result.tokenization_mode)
             )
-        count_cache = get_token_count_cache_for_text(conn, truncated, model_name)
-        if count_cache:
-            token_count = count_cache["token_count"]
-        else:
-            token_count, mode = count_tokens_with_mode(
-                truncated, model_name=model_name, approx_enabled=approx_enabled
+
+        truncated_texts: List[str] = []
+        token_counts: List[int] = []
+        tokenization_mode = "exact"
+        for text, digest in zip(texts, hashes, strict=False):
+            cached = trunc_cache[digest]
+            counted = count_cache[count_hashes[digest]]
+            truncated_texts.append(
+                text if cached["truncated_text"] is None else cached["truncated_text"]
             )
-            if mode == "approx":
+            token_counts.append(counted["token_count"])
+            if "approx" in (cached["tokenization_mode"], counted["tokenization_mode"]):
                 tokenization_mode = "approx"
-            set_token_count_cache_for_text(
-                conn,
-                text=truncated,
-                model_name=model_name,
-                token_count=token_count,
-                tokenization_mode=tokenization_mode,
-            )
-        truncated_texts.append(truncated)
-        token_counts.append(token_count)
-    return truncated_texts, token_counts, tokenization_mode
 
+        touch_trunc_text_cache_entries(conn, trunc_hits, model_name, max_tokens)
+        touch_token_count_cache_entries(conn, count_hits, model_name)
+        set_trunc_text_cache_entries(conn, new_trunc_entries)
+        set_token_count_cache_entries(conn, new_count_entries)
+        return truncated_texts, token_counts, tokenization_mode
+
+
+def plan_batches(
+    token_counts: Sequence[int], max_inputs: int, max_tokens: int
+) -> List[BatchRange]:
+    batches: List[BatchRange] = []
+    start = 0
+    tokens = 0
+    for idx, count in enumerate(token_counts):
+        if idx > start and (idx - start >= max_inputs or tokens + count > max_tokens):
+            batches.append((start, idx))
+            start, tokens = idx, 0
+        tokens += count
+    if start < len(token_counts):
+        batches.append((start, len(token_counts)))
+    return batches
 
-def serialize_vector(vector: Sequence[float]) -> str:
-    return json.dumps(list(vector))
@@ -1,10 +1,18 @@
 ﻿from __future__ import annotations
 
+import threading
+import time
 from dataclasses import dataclass
+from importlib import metadata
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
-from raganything.parser import DoclingParser, MineruParser
+_PARSERS: Dict[str, Any] = {}
+_PENDING_WARMUP_SECONDS: Dict[str, float] = {}
+_PARSERS_LOCK = threading.Lock()
+_BACKEND_PACKAGES = {"mineru": "mineru", "docling": "docling"}
+_PAGE_RANGE_PARSERS = {"mineru"}
+_MINERU_LANG = "ch"
 
 
 @dataclass(frozen=True)
@@ -20,18 +28,14 @@ def parse_document(
     output_dir: str,
     parser_name: str,
     parse_method: str,
+    page_range: Tuple[int, int] | None = None,
 ) -> ParsedDocument:
-    parser = _get_parser(parser_name)
-    content_list = parser.parse_document(
-        file_path=file_path, method=parse_method, output_dir=output_dir
+    backend = load_parser(parser_name)
+    if page_range is not None and not supports_page_ranges(parser_name):
+        raise ValueError(f"Parser does not support page ranges: {parser_name}")
+    content_list, markdown = backend.parse(
+        Path(file_path), Path(output_dir), parse_method, page_range
     )
-    markdown = ""
-    if hasattr(parser, "_read_output_files"):
-        file_stem = Path(file_path).stem
-        base_output_dir = Path(output_dir)
-        content_list, markdown = parser._read_output_files(
-            base_output_dir, file_stem, parse_method
-        )
     return ParsedDocument(
         content_list=content_list,
         markdown=markdown,
@@ -40,10 +44,120 @@ def parse_document(
     )
 
 
+def supports_page_ranges(parser_name: str) -> bool:
+    return parser_name.lower() in _PAGE_RANGE_PARSERS
+
+
+def count_pdf_pages(file_path: str) -> int | None:
+    try:
+        import pypdfium2
+
+        document = pypdfium2.PdfDocument(file_path)
+        try:
+            return len(document)
+        finally:
+            document.close()
+    except ImportError:
+        pass
+    except Exception:
+        return None
+    try:
+        from pypdf import PdfReader
+
+        return len(PdfReader(file_path).pages)
+    except Exception:
+        return None
+
+
+def load_parser(parser_name: str):
+    name = parser_name.lower()
+    with _PARSERS_LOCK:
+        backend = _PARSERS.get(name)
+        if backend is not None:
+            return backend
+        started = time.perf_counter()
+        backend = _get_parser(name)
+        _PARSERS[name] = backend
+        _PENDING_WARMUP_SECONDS[name] = time.perf_counter() - started
+        return backend
+
+
+def take_warmup_seconds(parser_name: str) -> float:
+    with _PARSERS_LOCK:
+        return _PENDING_WARMUP_SECONDS.pop(parser_name.lower(), 0.0)
+
+
+def parser_version(parser_name: str) -> str:
+    packages = ["raganything", _BACKEND_PACKAGES.get(parser_name.lower(), parser_name.lower())]
+    versions = []
+    for package in packages:
+        try:
+            versions.append(f"{package}={metadata.version(package)}")
+        except metadata.PackageNotFoundError:
+            versions.append(f"{package}=unknown")
+    return ";".join(versions)
+
+
+class _MineruBackend:
+    def __init__(self) -> None:
+        from mineru.backend.pipeline.pipeline_analyze import ModelSingleton
+        from mineru.cli.common import do_parse
+        from raganything.parser import MineruParser
+
+        self._do_parse = do_parse
+        self._reader = MineruParser()
+        ModelSingleton().get_model(lang=None, formula_enable=True, table_enable=True)
+
+    def parse(
+        self,
+        file_path: Path,
+        output_dir: Path,
+        parse_method: str,
+        page_range: Tuple[int, int] | None,
+    ) -> Tuple[List[Dict[str, Any]], str]:
+        start_page, end_page = page_range if page_range is not None else (0, None)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self._do_parse(
+            str(output_dir),
+            [file_path.stem],
+            [file_path.read_bytes()],
+            [_MINERU_LANG],
+            parse_method=parse_method,
+            start_page_id=start_page,
+            end_page_id=end_page,
+        )
+        return self._reader._read_output_files(output_dir, file_path.stem, method=parse_method)
+
+
+class _DoclingBackend:
+    def __init__(self) -> None:
+        from docling.datamodel.base_models import InputFormat
+        from docling.document_converter import DocumentConverter
+        from raganything.parser import DoclingParser
+
+        self._reader = DoclingParser()
+        self._converter = DocumentConverter()
+        self._converter.initialize_pipeline(InputFormat.PDF)
+
+    def parse(
+        self,
+        file_path: Path,
+        output_dir: Path,
+        parse_method: str,
+        page_range: Tuple[int, int] | None,
+    ) -> Tuple[List[Dict[str, Any]], str]:
+        document_dir = output_dir / file_path.stem / "docling"
+        document_dir.mkdir(parents=True, exist_ok=True)
+        document = self._converter.convert(file_path).document
+        document.save_as_json(document_dir / f"{file_path.stem}.json")
+        document.save_as_markdown(document_dir / f"{file_path.stem}.md")
+        return self._reader._read_output_files(output_dir, file_path.stem)
+
+
 def _get_parser(parser_name: str):
     name = parser_name.lower()
     if name == "docling":
-        return DoclingParser()
+        return _DoclingBackend()
     if name == "mineru":
-        return MineruParser()
+        return _MineruBackend()
     raise ValueError(f"Unsupported parser: {parser_name}")
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from src.config import AppConfig
+from src.db.connection import connect
+from src.db.job_repo import (
+    append_job_log,
+    create_job,
+    fail_stale_jobs,
+    finish_job,
+    get_job,
+    heartbeat_job,
+    is_job_cancel_requested,
+    list_recent_jobs,
+    start_job,
+    update_job_progress,
+)
+from src.pipeline.run import run_pipeline
+from src.pipeline.run_lock import LOCK_STALE_SECONDS, lock_owner, pipeline_lock
+
+PIPELINE_JOB_KIND = "pipeline"
+JOB_HEARTBEAT_SECONDS = 5.0
+JOB_STALE_SECONDS = LOCK_STALE_SECONDS
+RESUMABLE_JOB_STATUSES = ("cancelled", "failed")
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def submit_pipeline_job(
+    config: AppConfig,
+    params: Dict[str, Any] | None = None,
+    resume: bool | None = None,
+) -> str | None:
+    job_id = f"job_{uuid.uuid4().hex}"
+    conn = connect(config.db_path)
+    try:
+        fail_stale_jobs(conn, datetime.now(timezone.utc), JOB_STALE_SECONDS)
+        if resume is None:
+            last = list_recent_jobs(conn, PIPELINE_JOB_KIND, limit=1)
+            resume = bool(last) and last[0]["status"] in RESUMABLE_JOB_STATUSES
+        if not create_job(conn, job_id, PIPELINE_JOB_KIND, _now(), params):
+            return None
+    finally:
+        conn.close()
+    threading.Thread(
+        target=run_pipeline_job,
+        args=(config, job_id),
+        kwargs={"resume": resume},
+        name=f"pipeline-{job_id}",
+        daemon=True,
+    ).start()
+    return job_id
+
+
+def run_pipeline_job(
+    config: AppConfig,
+    job_id: str,
+    resume: bool = False,
+    heartbeat_seconds: float = JOB_HEARTBEAT_SECONDS,
+) -> str:
+    logger = logging.getLogger(__name__)
+    conn = connect(config.db_path)
+    try:
+        if not start_job(conn, job_id, lock_owner(), _now()):
+            job = get_job(conn, job_id)
+            if job is None:
+                raise ValueError(f"unknown job: {job_id}")
+            if job["status"] == "queued":
+                finish_job(conn, job_id, "cancelled", _now())
+                return "cancelled"
+            return job["status"]
+
+        log = _JobLog(threading.get_ident())
+        source_logger = logging.getLogger("src")
+        source_level = source_logger.level
+        if not source_logger.isEnabledFor(logging.INFO):
+            source_logger.setLevel(logging.INFO)
+        source_logger.addHandler(log)
+        stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=_heartbeat,
+            args=(config.db_path, job_id, log, heartbeat_seconds, stop),
+            daemon=True,
+        )
+        heartbeat.start()
+
+        def report(message: str, pct: float) -> None:
+            log.add(message)
+            log.flush_to(conn, job_id)
+            update_job_progress(conn, job_id, message, pct, _now())
+            if is_job_cancel_requested(conn, job_id):
+                raise JobCancelled(job_id)
+
+        error = None
+        try:
+            with pipeline_lock(config.db_path) as acquired:
+                if acquired:
+                    success = run_pipeline(config, progress_cb=report, resume=resume)
+                    status = "completed" if success else "skipped"
+                else:
+                    logger.warning("Another pipeline run is in progress; job %s not run.", job_id)
+                    status = "busy"
+        except JobCancelled:
+            status = "cancelled"
+        except Exception as exc:
+            logger.exception("Pipeline job %s failed.", job_id)
+            status = "failed"
+            error = str(exc) or repr(exc)
+        finally:
+            source_logger.removeHandler(log)
+            source_logger.setLevel(source_level)
+            stop.set()
+            heartbeat.join()
+        log.flush_to(conn, job_id)
+        finish_job(conn, job_id, status, _now(), error=error)
+        return status
+    finally:
+        conn.close()
+
+
+class _JobLog(logging.Handler):
+    def __init__(self, thread_id: int) -> None:
+        super().__init__(logging.INFO)
+        self.setFormatter(logging.Formatter("%(levelname)s %(name)s: %(message)s"))
+        self.addFilter(lambda record: record.thread == thread_id)
+        self._lines: List[str] = []
+        self._guard = threading.Lock()
+        self._flushing = threading.Lock()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.add(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+    def add(self, line: str) -> None:
+        with self._guard:
+            self._lines.append(line)
+
+    def flush_to(self, conn: sqlite3.Connection, job_id: str) -> None:
+        with self._flushing:
+            with self._guard:
+                lines, self._lines = self._lines, []
+            if lines:
+                append_job_log(conn, job_id, lines)
+
+
+def _heartbeat(
+    db_path: str, job_id: str, log: _JobLog, interval: float, stop: threading.Event
+) -> None:
+    while not stop.wait(interval):
+        conn = connect(db_path)
+        try:
+            log.flush_to(conn, job_id)
+            heartbeat_job(conn, job_id, _now())
+        except sqlite3.Error:
+            logging.getLogger(__name__).exception("Failed to refresh job %s.", job_id)
+        finally:
+            conn.close()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
@@ -1,7 +1,11 @@
 ﻿from __future__ import annotations
 
+import re
 from dataclasses import dataclass
-from typing import Iterable, List
+from typing import Iterable, Iterator, List
+
+
+_LINE_BREAK = re.compile("\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
 
 
 @dataclass(frozen=True)
@@ -13,33 +17,34 @@ class MarkdownBlock:
 
 
 def parse_markdown(markdown: str) -> List[MarkdownBlock]:
-    lines = markdown.splitlines()
-    blocks: List[MarkdownBlock] = []
+    return list(iter_markdown_blocks(markdown))
+
+
+def iter_markdown_blocks(markdown: str | Iterable[str]) -> Iterator[MarkdownBlock]:
+    lines = _iter_lines(markdown) if isinstance(markdown, str) else markdown
     heading_stack: List[str] = []
     heading_levels: List[int] = []
     paragraph_lines: List[str] = []
 
-    def flush_paragraph() -> None:
+    def flush_paragraph() -> Iterator[MarkdownBlock]:
         if paragraph_lines:
             text = " ".join(line.strip() for line in paragraph_lines).strip()
+            paragraph_lines.clear()
             if text:
-                blocks.append(
-                    MarkdownBlock(
-                        block_type="paragraph",
-                        text=text,
-                        heading_level=heading_levels[-1] if heading_levels else 0,
-                        section_path=" > ".join(heading_stack),
-                    )
+                yield MarkdownBlock(
+                    block_type="paragraph",
+                    text=text,
+                    heading_level=heading_levels[-1] if heading_levels else 0,
+                    section_path=" > ".join(heading_stack),
                 )
-            paragraph_lines.clear()
 
     for raw in lines:
         line = raw.rstrip()
         if not line.strip():
-            flush_paragraph()
+            yield from flush_paragraph()
             continue
         if line.startswith("#"):
-            flush_paragraph()
+            yield from flush_paragraph()
             level = len(line) - len(line.lstrip("#"))
             heading_text = line.lstrip("#").strip()
             if not heading_text:
@@ -49,16 +54,22 @@ def parse_markdown(markdown: str) -> List[MarkdownBlock]:
                 heading_stack.pop()
             heading_levels.append(level)
             heading_stack.append(heading_text)
-            blocks.append(
-                MarkdownBlock(
-                    block_type="heading",
-                    text=heading_text,
-                    heading_level=level,
-                    section_path=" > ".join(heading_stack),
-                )
+            yield MarkdownBlock(
+                block_type="heading",
+                text=heading_text,
+                heading_level=level,
+                section_path=" > ".join(heading_stack),
             )
             continue
         paragraph_lines.append(line)
 
-    flush_paragraph()
-    return blocks
+    yield from flush_paragraph()
+
+
+def _iter_lines(text: str) -> Iterator[str]:
+    start = 0
+    for match in _LINE_BREAK.finditer(text):
+        yield text[start : match.start()]
+        start = match.end()
+    if start < len(text):
+        yield text[start:]
@@ -60,7 +60,7 @@ def merge_candidates(
         if mode not in thresholds_by_mode:
             raise ValueError(f"Missing thresholds for mode: {mode}")
         merge_threshold, review_threshold = thresholds_by_mode[mode]
-        if (a, b) in rejected_pairs or (b, a) in rejected_pairs:
+        if ((a, b) if a <= b else (b, a)) in rejected_pairs:
             continue
 
         if score >= review_threshold:
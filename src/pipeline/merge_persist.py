@@ -4,12 +4,14 @@ import sqlite3
 from typing import Dict, Iterable, List, Set, Tuple
 
 from src.db.domain_repo import (
-    insert_block_domain_map,
-    insert_domain,
-    insert_domain_alias,
-    insert_domain_source,
+    insert_block_domain_maps,
+    insert_domain_aliases,
+    insert_domain_sources,
+    insert_domains,
+    next_domain_number,
 )
-from src.db.review_repo import has_review_pair, insert_review_item
+from src.db.review_repo import canonical_pair, insert_review_items, list_review_pairs
+from src.db.transaction import unit_of_work
 from src.pipeline.hash_utils import text_hash
 from src.db.similarity_repo import insert_similarity_pairs
 from src.pipeline.candidates import DomainCandidate
@@ -26,9 +28,10 @@ def persist_merge_results(
     preferred_display_language: str,
     min_review_threshold: float,
 ) -> None:
-    _persist_domains(conn, clusters, candidates, created_at, preferred_display_language)
-    _persist_review_queue(conn, review_items, created_at)
-    _persist_similarity(conn, persist_pairs, min_review_threshold)
+    with unit_of_work(conn):
+        _persist_domains(conn, clusters, candidates, created_at, preferred_display_language)
+        _persist_review_queue(conn, review_items, created_at)
+        _persist_similarity(conn, persist_pairs, min_review_threshold)
 
 
 def _persist_domains(
@@ -41,7 +44,11 @@ def _persist_domains(
     sorted_clusters = sorted(
         (sorted(cluster) for cluster in clusters), key=lambda c: c[0]
     )
-    for idx, cluster in enumerate(sorted_clusters, start=1):
+    domains: List[Tuple[str, str, str]] = []
+    aliases: List[Tuple[str, str, str, int]] = []
+    mappings: List[Tuple[str, str]] = []
+    sources: List[Tuple[str, str]] = []
+    for idx, cluster in enumerate(sorted_clusters, start=next_domain_number(conn)):
         domain_id = f"domain_{idx:03d}"
         alias_infos = [
             AliasInfo(
@@ -55,33 +62,38 @@ def _persist_domains(
         display_name = select_display_name(
             alias_infos, preferred_language=preferred_display_language
         )
-        insert_domain(conn, domain_id=domain_id, display_name=display_name, created_at=created_at)
-        _persist_domain_mappings(conn, domain_id, cluster, candidates)
+        domains.append((domain_id, display_name, created_at))
+        _collect_domain_mappings(domain_id, cluster, candidates, aliases, mappings, sources)
+    insert_domains(conn, domains)
+    insert_domain_aliases(conn, aliases)
+    insert_block_domain_maps(conn, mappings)
+    insert_domain_sources(conn, sources)
 
 
-def _persist_domain_mappings(
-    conn: sqlite3.Connection,
+def _collect_domain_mappings(
     domain_id: str,
     cluster: List[str],
     candidates: Dict[str, DomainCandidate],
+    aliases: List[Tuple[str, str, str, int]],
+    mappings: List[Tuple[str, str]],
+    sources: List[Tuple[str, str]],
 ) -> None:
     seen_sources: set[str] = set()
     for cid in cluster:
         if cid not in candidates:
             continue
         candidate = candidates[cid]
-        insert_domain_alias(
-            conn,
-            domain_id=domain_id,
-            alias=candidate.candidate_name,
-            source_pdf_id=candidate.source_pdf_id,
-            heading_level=candidate.heading_level,
-        )
-        insert_block_domain_map(
-            conn, block_id=candidate.source_block_id, domain_id=domain_id
+        aliases.append(
+            (
+                domain_id,
+                candidate.candidate_name,
+                candidate.source_pdf_id,
+                candidate.heading_level,
+            )
         )
+        mappings.append((candidate.source_block_id, domain_id))
         if candidate.source_pdf_id not in seen_sources:
-            insert_domain_source(conn, domain_id=domain_id, pdf_id=candidate.source_pdf_id)
+            sources.append((domain_id, candidate.source_pdf_id))
             seen_sources.add(candidate.source_pdf_id)
 
 
@@ -90,21 +102,17 @@ def _persist_review_queue(
     review_items: Iterable[Tuple[str, str, float, str]],
     created_at: str,
 ) -> None:
+    existing = list_review_pairs(conn)
+    rows = []
     for a, b, similarity, reason in review_items:
-        if has_review_pair(conn, a, b):
+        a, b = canonical_pair(a, b)
+        if (a, b) in existing:
             continue
+        existing.add((a, b))
         digest = text_hash(f"{a}|{b}")[:10]
         review_id = f"review_{digest}"
-        insert_review_item(
-            conn,
-            review_id=review_id,
-            candidate_a_id=a,
-            candidate_b_id=b,
-            similarity=similarity,
-            reason=reason,
-            status="pending",
-            created_at=created_at,
-        )
+        rows.append((review_id, a, b, similarity, reason, "pending", created_at))
+    insert_review_items(conn, rows)
 
 
 def _persist_similarity(
@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import logging
+import time
+from concurrent.futures import as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from itertools import chain
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+from src.pipeline.ingest import (
+    ParsedDocument,
+    count_pdf_pages,
+    load_parser,
+    parse_document,
+    supports_page_ranges,
+    take_warmup_seconds,
+)
+from src.pipeline.markdown_parser import iter_markdown_blocks
+from src.pipeline.parser_workers import discard_parser_pool, get_parser_pool
+
+_PAGE_MATCH_LOOKAHEAD = 64
+_PAGE_MATCH_PREFIX = 48
+_PAGE_MATCH_MIN_PREFIX = 8
+
+
+@dataclass(frozen=True)
+class ParseOutcome:
+    pdf_id: str
+    file_path: str
+    parsed: ParsedDocument | None
+    error: str | None = None
+    warmup_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    shard_count: int = 1
+
+
+@dataclass(frozen=True)
+class _ParseJob:
+    pdf_id: str
+    file_path: str
+    output_dir: str
+    parser_name: str
+    parse_method: str
+    page_range: Tuple[int, int] | None
+
+
+def parse_pdfs(
+    pdfs: Sequence[Dict[str, str]],
+    output_dir: str,
+    parser_name: str,
+    parse_method: str,
+    workers: int,
+    shard_pages: int = 0,
+) -> Iterator[ParseOutcome]:
+    jobs: List[_ParseJob] = []
+    shard_counts: Dict[str, int] = {}
+    for pdf in pdfs:
+        base_dir = pdf_output_dir(output_dir, pdf["checksum"])
+        page_ranges = _page_ranges_for(pdf["file_path"], parser_name, shard_pages)
+        shard_counts[pdf["pdf_id"]] = len(page_ranges)
+        for page_range in page_ranges:
+            shard_dir = base_dir
+            if page_range is not None:
+                shard_dir = str(Path(base_dir) / f"pages_{page_range[0]:05d}_{page_range[1]:05d}")
+            jobs.append(
+                _ParseJob(
+                    pdf_id=pdf["pdf_id"],
+                    file_path=pdf["file_path"],
+                    output_dir=shard_dir,
+                    parser_name=parser_name,
+                    parse_method=parse_method,
+                    page_range=page_range,
+                )
+            )
+
+    pending: Dict[str, List[Tuple[_ParseJob, ParseOutcome]]] = {}
+    for job, outcome in _run_jobs(jobs, parser_name, workers):
+        if shard_counts[job.pdf_id] == 1:
+            yield outcome
+            continue
+        shards = pending.setdefault(job.pdf_id, [])
+        shards.append((job, outcome))
+        if len(shards) == shard_counts[job.pdf_id]:
+            yield _stitch_shards(pending.pop(job.pdf_id))
+
+
+def pdf_output_dir(output_dir: str, checksum: str) -> str:
+    return str(Path(output_dir) / checksum[:16])
+
+
+def plan_page_shards(page_count: int, shard_pages: int) -> List[Tuple[int, int]]:
+    if shard_pages <= 0 or page_count <= shard_pages:
+        return [(0, max(page_count - 1, 0))]
+    return [
+        (start, min(start + shard_pages, page_count) - 1)
+        for start in range(0, page_count, shard_pages)
+    ]
+
+
+def merge_parsed_shards(
+    shards: Sequence[Tuple[int, ParsedDocument]],
+) -> ParsedDocument:
+    ordered = sorted(shards, key=lambda shard: shard[0])
+    content_list: List[Dict[str, Any]] = []
+    for start_page, parsed in ordered:
+        for item in parsed.content_list:
+            if isinstance(item, dict):
+                item = dict(item)
+                item["page_idx"] = int(item.get("page_idx", 0)) + start_page
+            content_list.append(item)
+    markdown = "\n\n".join(
+        parsed.markdown.strip("\n") for _, parsed in ordered if parsed.markdown.strip()
+    )
+    first = ordered[0][1]
+    return ParsedDocument(
+        content_list=content_list,
+        markdown=markdown,
+        parser_name=first.parser_name,
+        parse_method=first.parse_method,
+    )
+
+
+def _page_ranges_for(
+    file_path: str, parser_name: str, shard_pages: int
+) -> List[Tuple[int, int] | None]:
+    if shard_pages <= 0 or not supports_page_ranges(parser_name):
+        return [None]
+    page_count = count_pdf_pages(file_path)
+    if page_count is None or page_count <= shard_pages:
+        return [None]
+    return list(plan_page_shards(page_count, shard_pages))
+
+
+def _run_jobs(
+    jobs: List[_ParseJob], parser_name: str, workers: int
+) -> Iterator[Tuple[_ParseJob, ParseOutcome]]:
+    logger = logging.getLogger(__name__)
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield job, _parse_one(job)
+        return
+
+    pool = get_parser_pool(parser_name, workers)
+    futures = {pool.submit(_parse_one, job): job for job in jobs}
+    for future in as_completed(futures):
+        job = futures[future]
+        try:
+            yield job, future.result()
+        except Exception as exc:
+            logger.exception("Parser worker crashed: %s", job.file_path)
+            if isinstance(exc, BrokenProcessPool):
+                discard_parser_pool(parser_name)
+            yield job, ParseOutcome(
+                pdf_id=job.pdf_id, file_path=job.file_path, parsed=None, error=repr(exc)
+            )
+
+
+def _stitch_shards(shards: List[Tuple[_ParseJob, ParseOutcome]]) -> ParseOutcome:
+    first_job, _ = shards[0]
+    warmup_seconds = sum(outcome.warmup_seconds for _, outcome in shards)
+    parse_seconds = sum(outcome.parse_seconds for _, outcome in shards)
+    errors = [
+        f"pages {job.page_range[0]}-{job.page_range[1]}: {outcome.error}"
+        for job, outcome in sorted(shards, key=lambda shard: shard[0].page_range)
+        if outcome.error or outcome.parsed is None
+    ]
+    parsed = None
+    if not errors:
+        parsed = merge_parsed_shards(
+            [(job.page_range[0], outcome.parsed) for job, outcome in shards]
+        )
+    return ParseOutcome(
+        pdf_id=first_job.pdf_id,
+        file_path=first_job.file_path,
+        parsed=parsed,
+        error="; ".join(errors) or None,
+        warmup_seconds=warmup_seconds,
+        parse_seconds=parse_seconds,
+        shard_count=len(shards),
+    )
+
+
+def _parse_one(job: _ParseJob) -> ParseOutcome:
+    warmup_seconds = 0.0
+    started = time.perf_counter()
+    try:
+        load_parser(job.parser_name)
+        warmup_seconds = take_warmup_seconds(job.parser_name)
+        started = time.perf_counter()
+        parsed = parse_document(
+            file_path=job.file_path,
+            output_dir=job.output_dir,
+            parser_name=job.parser_name,
+            parse_method=job.parse_method,
+            page_range=job.page_range,
+        )
+    except Exception as exc:
+        logging.getLogger(__name__).exception("Failed to parse PDF: %s", job.file_path)
+        return ParseOutcome(
+            pdf_id=job.pdf_id,
+            file_path=job.file_path,
+            parsed=None,
+            error=repr(exc),
+            warmup_seconds=warmup_seconds,
+            parse_seconds=time.perf_counter() - started,
+        )
+    return ParseOutcome(
+        pdf_id=job.pdf_id,
+        file_path=job.file_path,
+        parsed=parsed,
+        warmup_seconds=warmup_seconds,
+        parse_seconds=time.perf_counter() - started,
+    )
+
+
+def build_content_blocks(parsed: ParsedDocument, pdf_id: str) -> List[Dict[str, object]]:
+    return list(iter_content_blocks(parsed, pdf_id))
+
+
+def iter_content_blocks(parsed: ParsedDocument, pdf_id: str) -> Iterator[Dict[str, object]]:
+    markdown_blocks = iter_markdown_blocks(parsed.markdown) if parsed.markdown else iter(())
+    first = next(markdown_blocks, None)
+    if first is not None:
+        locator = _PageLocator(parsed.content_list)
+        for idx, block in enumerate(chain([first], markdown_blocks)):
+            yield {
+                "block_id": f"{pdf_id}_b{idx:05d}",
+                "pdf_id": pdf_id,
+                "section_path": block.section_path,
+                "heading_level": block.heading_level,
+                "block_type": block.block_type,
+                "text": block.text,
+                "page_index": locator.locate(block.text),
+                "position_index": idx,
+            }
+        return
+
+    position = 0
+    for item in parsed.content_list:
+        if not isinstance(item, dict):
+            continue
+        if item.get("type") != "text":
+            continue
+        text = item.get("text", "").strip()
+        if not text:
+            continue
+        yield {
+            "block_id": f"{pdf_id}_b{position:05d}",
+            "pdf_id": pdf_id,
+            "section_path": "",
+            "heading_level": 0,
+            "block_type": "paragraph",
+            "text": text,
+            "page_index": int(item.get("page_idx", 0)),
+            "position_index": position,
+        }
+        position += 1
+
+
+class _PageLocator:
+    def __init__(self, content_list: Sequence[Any]) -> None:
+        self._items: List[Tuple[int, str]] = [
+            (int(item.get("page_idx", 0)), _match_key(str(item.get("text", ""))))
+            for item in content_list
+            if isinstance(item, dict) and item.get("text")
+        ]
+        self._cursor = 0
+        self._page = self._items[0][0] if self._items else 0
+
+    def locate(self, text: str) -> int:
+        key = _match_key(text)
+        if not key:
+            return self._page
+        end = min(self._cursor + _PAGE_MATCH_LOOKAHEAD, len(self._items))
+        for idx in range(self._cursor, end):
+            page, item_key = self._items[idx]
+            if _keys_match(key, item_key):
+                self._cursor = idx + 1
+                self._page = page
+                break
+        return self._page
+
+
+def _keys_match(key: str, item_key: str) -> bool:
+    if key == item_key:
+        return True
+    if min(len(key), len(item_key)) < _PAGE_MATCH_MIN_PREFIX:
+        return False
+    return item_key.startswith(key) or key.startswith(item_key)
+
+
+def _match_key(text: str) -> str:
+    return " ".join(text.lstrip("#").split()).lower()[:_PAGE_MATCH_PREFIX]
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Tuple
+
+from src.pipeline.ingest import load_parser
+
+_POOLS: Dict[str, Tuple[int, ProcessPoolExecutor]] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_parser_pool(parser_name: str, workers: int) -> ProcessPoolExecutor:
+    name = parser_name.lower()
+    with _POOLS_LOCK:
+        entry = _POOLS.get(name)
+        if entry is not None:
+            size, pool = entry
+            if size == workers and not getattr(pool, "_broken", False):
+                return pool
+            pool.shutdown(wait=False, cancel_futures=True)
+        logging.getLogger(__name__).info(
+            "Starting %d warm %s parser worker(s).", workers, name
+        )
+        pool = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(name,)
+        )
+        _POOLS[name] = (workers, pool)
+        return pool
+
+
+def discard_parser_pool(parser_name: str) -> None:
+    with _POOLS_LOCK:
+        entry = _POOLS.pop(parser_name.lower(), None)
+    if entry is not None:
+        entry[1].shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_parser_pools() -> None:
+    with _POOLS_LOCK:
+        pools = [pool for _, pool in _POOLS.values()]
+        _POOLS.clear()
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _init_worker(parser_name: str) -> None:
+    try:
+        load_parser(parser_name)
+    except Exception:
+        logging.getLogger(__name__).exception(
+            "Failed to warm %s parser; it will be retried per document.", parser_name
+        )
+
+
+atexit.register(shutdown_parser_pools)
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Sequence, Tuple
+
+from src.db.repo import get_pdfs_by_checksums, insert_pdfs
+
+HASH_CHUNK_SIZE = 1024 * 1024
+DEFAULT_HASH_WORKERS = min(8, os.cpu_count() or 1)
+
+
+@dataclass(frozen=True)
+class RegistrationResult:
+    registered: List[str]
+    duplicates: List[str]
+    pdf_ids: List[str]
+
+
+def safe_filename(name: str) -> str:
+    cleaned = []
+    for ch in name:
+        if ch.isascii() and (ch.isalnum() or ch in {".", "_", "-"}):
+            cleaned.append(ch)
+        else:
+            cleaned.append("_")
+    return "".join(cleaned).strip("._") or "upload.pdf"
+
+
+def stored_pdf_name(checksum: str, original_name: str) -> str:
+    return f"{checksum}_{safe_filename(original_name)}"
+
+
+def hash_stream(stream: BinaryIO, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(chunk_size), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_checksum(path: Path, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    with path.open("rb") as handle:
+        return hash_stream(handle, chunk_size)
+
+
+def checksum_files(paths: Sequence[Path], workers: int = DEFAULT_HASH_WORKERS) -> List[str]:
+    if workers <= 1 or len(paths) <= 1:
+        return [file_checksum(path) for path in paths]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(file_checksum, paths))
+
+
+def store_pdf_streams(
+    conn: sqlite3.Connection,
+    uploads: Sequence[Tuple[BinaryIO, str]],
+    storage_dir: Path,
+    workers: int = DEFAULT_HASH_WORKERS,
+) -> List[str]:
+    streams = [stream for stream, _ in uploads]
+    if workers <= 1 or len(streams) <= 1:
+        checksums = [_rewound_checksum(stream) for stream in streams]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            checksums = list(executor.map(_rewound_checksum, streams))
+    placed: Dict[str, str] = {
+        checksum: pdf["file_path"]
+        for checksum, pdf in get_pdfs_by_checksums(conn, checksums).items()
+    }
+
+    storage_dir.mkdir(parents=True, exist_ok=True)
+    new_files: Dict[str, Tuple[BinaryIO, Path]] = {}
+    for (stream, name), checksum in zip(uploads, checksums, strict=True):
+        if checksum not in placed and checksum not in new_files:
+            new_files[checksum] = (stream, storage_dir / stored_pdf_name(checksum, name))
+    try:
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            list(executor.map(lambda job: _write_stream(*job), new_files.values()))
+    except BaseException:
+        for _, target in new_files.values():
+            target.unlink(missing_ok=True)
+        raise
+
+    ingested_at = datetime.now(timezone.utc).isoformat()
+    rows = [
+        {
+            "pdf_id": f"pdf_{checksum}",
+            "file_path": str(target),
+            "checksum": checksum,
+            "ingested_at": ingested_at,
+        }
+        for checksum, (_, target) in new_files.items()
+    ]
+    if rows:
+        insert_pdfs(conn, rows)
+    placed.update((row["checksum"], row["file_path"]) for row in rows)
+    return [placed[checksum] for checksum in checksums]
+
+
+def find_pdf_files(directory: Path) -> List[Path]:
+    return sorted(
+        path
+        for path in directory.rglob("*")
+        if path.is_file() and path.suffix.lower() == ".pdf"
+    )
+
+
+def register_pdf_directory(
+    conn: sqlite3.Connection,
+    directory: Path,
+    storage_dir: Path,
+    link: bool = False,
+    workers: int = DEFAULT_HASH_WORKERS,
+) -> RegistrationResult:
+    return register_pdf_files(
+        conn, find_pdf_files(directory), storage_dir, link=link, workers=workers
+    )
+
+
+def register_pdf_files(
+    conn: sqlite3.Connection,
+    paths: Sequence[Path],
+    storage_dir: Path,
+    link: bool = False,
+    workers: int = DEFAULT_HASH_WORKERS,
+) -> RegistrationResult:
+    checksums = checksum_files(paths, workers)
+    existing = get_pdfs_by_checksums(conn, checksums)
+
+    new_files: Dict[str, Path] = {}
+    duplicates: List[str] = []
+    for path, checksum in zip(paths, checksums, strict=True):
+        if checksum in existing or checksum in new_files:
+            duplicates.append(str(path))
+            continue
+        new_files[checksum] = path
+
+    storage_dir.mkdir(parents=True, exist_ok=True)
+    storage_root = storage_dir.resolve()
+    jobs = [
+        (
+            source,
+            source
+            if source.resolve().parent == storage_root
+            else storage_dir / stored_pdf_name(checksum, source.name),
+        )
+        for checksum, source in new_files.items()
+    ]
+    place = _link_or_copy if link else _copy
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        list(executor.map(lambda job: place(*job), jobs))
+
+    ingested_at = datetime.now(timezone.utc).isoformat()
+    rows = [
+        {
+            "pdf_id": f"pdf_{checksum}",
+            "file_path": str(target),
+            "checksum": checksum,
+            "ingested_at": ingested_at,
+        }
+        for checksum, (_, target) in zip(new_files, jobs, strict=True)
+    ]
+    if rows:
+        insert_pdfs(conn, rows)
+    return RegistrationResult(
+        registered=[row["file_path"] for row in rows],
+        duplicates=duplicates,
+        pdf_ids=[row["pdf_id"] for row in rows],
+    )
+
+
+def _copy(source: Path, target: Path) -> None:
+    if not target.exists():
+        shutil.copyfile(source, target)
+
+
+def _link_or_copy(source: Path, target: Path) -> None:
+    if target.exists():
+        return
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+def _rewound_checksum(stream: BinaryIO) -> str:
+    checksum = hash_stream(stream)
+    stream.seek(0)
+    return checksum
+
+
+def _write_stream(stream: BinaryIO, target: Path) -> None:
+    with tempfile.NamedTemporaryFile(
+        dir=target.parent, prefix=".upload_", suffix=".part", delete=False
+    ) as handle:
+        temp_path = Path(handle.name)
+        try:
+            shutil.copyfileobj(stream, handle, HASH_CHUNK_SIZE)
+        except BaseException:
+            handle.close()
+            temp_path.unlink(missing_ok=True)
+            raise
+    os.replace(temp_path, target)
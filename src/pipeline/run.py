@@ -4,83 +4,192 @@ import logging
 import sqlite3
 import uuid
 from datetime import datetime, timezone
+from itertools import chain
 from pathlib import Path
-from typing import Callable, Dict, List
+from typing import Any, Callable, Collection, Dict, List, Sequence, Set, Tuple
 
 import numpy as np
 
 from src.config import AppConfig
-from src.db.candidate_repo import insert_candidate
+from src.db.candidate_repo import (
+    has_candidates_for_pdf,
+    insert_candidates,
+    iter_candidates,
+    list_unassigned_candidate_ids,
+)
+from src.db.connection import connect, query
 from src.db.content_repo import (
     has_content_blocks_for_pdf,
     insert_content_blocks,
-    list_content_blocks_by_pdf,
+    iter_content_block_rows,
+)
+from src.db.domain_repo import (
+    delete_domains,
+    get_domain_ids_for_blocks,
+    iter_block_domain_map,
+    iter_domain_aliases,
+    iter_domain_sources,
+    list_domains,
 )
-from src.db.domain_repo import list_domain_aliases, list_domain_sources, list_domains
 from src.db.embedding_repo import (
-    insert_candidate_embedding,
-    insert_domain_embedding,
+    insert_candidate_embeddings,
+    insert_domain_embeddings,
+    load_domain_embedding_matrix,
 )
-from src.db.token_usage_repo import insert_token_usage
+from src.db.parse_cache_repo import (
+    get_parse_cache,
+    record_parse_cache_lookup,
+    set_parse_cache,
+)
+from src.db.repo import invalidate_pdfs
 from src.db.review_repo import list_rejected_pairs
-from src.db.repo import clear_derived_tables
-from src.db.schema import create_schema
+from src.db.run_repo import (
+    create_pipeline_run,
+    get_resumable_run,
+    list_stage_checkpoints,
+    set_stage_checkpoint,
+    set_stage_checkpoints,
+    update_pipeline_run,
+)
+from src.db.similarity_repo import list_similarity_pairs_within
+from src.db.token_usage_repo import insert_token_usage
+from src.db.transaction import unit_of_work
 from src.pipeline.artifact import write_artifact_bundle
 from src.pipeline.artifact_versioning import next_bundle_dir
 from src.pipeline.candidates import ContentBlock, DomainCandidate, extract_candidates
-from src.pipeline.embedding import AzureOpenAIEmbedder, serialize_vector
-from src.pipeline.ingest import parse_document
+from src.pipeline.embedding import AzureOpenAIEmbedder, EmbeddingResult
+from src.pipeline.ingest import ParsedDocument, parser_version
 from src.pipeline.label_index import build_label_index
-from src.pipeline.markdown_parser import parse_markdown
 from src.pipeline.merge import merge_candidates
 from src.pipeline.merge_persist import persist_merge_results
+from src.pipeline.parse_stage import iter_content_blocks, parse_pdfs
 from src.pipeline.representation import BlockScore, select_top_k_blocks
+from src.pipeline.run_lock import pipeline_lock
 from src.pipeline.similarity import generate_candidate_pairs, similarity_pairs_for_mode
 
 
 def run_pipeline(
     config: AppConfig,
     progress_cb: Callable[[str, float], None] | None = None,
+    resume: bool = False,
+    pdf_ids: Collection[str] | None = None,
 ) -> bool:
     logger = logging.getLogger(__name__)
     if not logger.handlers:
         logging.basicConfig(level=logging.INFO)
-    conn = sqlite3.connect(config.db_path)
+    with pipeline_lock(config.db_path) as acquired:
+        if not acquired:
+            logger.warning("Another pipeline run is in progress; skipping this run.")
+            return False
+        return _run_pipeline_locked(config, progress_cb, resume, pdf_ids)
+
+
+def parse_registered_pdfs(config: AppConfig, pdf_ids: Collection[str]) -> bool:
+    logger = logging.getLogger(__name__)
+    with pipeline_lock(config.db_path) as acquired:
+        if not acquired:
+            logger.warning("Another pipeline run is in progress; deferring parse.")
+            return False
+        conn = connect(config.db_path)
+        try:
+            Path(config.rag_output_dir).mkdir(parents=True, exist_ok=True)
+            pdfs = [
+                pdf
+                for pdf in _list_pdfs(conn)
+                if pdf["pdf_id"] in pdf_ids
+                and not has_content_blocks_for_pdf(conn, pdf["pdf_id"])
+            ]
+            _parse_pdfs_into_db(conn, pdfs, config, run_id=None)
+            return True
+        finally:
+            conn.close()
+
+
+def _run_pipeline_locked(
+    config: AppConfig,
+    progress_cb: Callable[[str, float], None] | None,
+    resume: bool,
+    pdf_ids: Collection[str] | None,
+) -> bool:
+    logger = logging.getLogger(__name__)
+    conn = connect(config.db_path)
     run_id = f"run_{uuid.uuid4().hex}"
     run_created_at = datetime.now(timezone.utc).isoformat()
+    run_started = False
     tokens_by_model: Dict[str, int] = {}
+    cache_by_model: Dict[str, tuple[int, int]] = {}
     try:
-        create_schema(conn)
         pdfs = _list_pdfs(conn)
         if not pdfs:
             logger.info("No PDFs found to process.")
             return False
-        pdfs_to_process = _select_pdfs_to_process(conn, pdfs, config.skip_processed_pdfs)
-        if not pdfs_to_process:
-            logger.info("No unprocessed PDFs to process.")
+        resumed = get_resumable_run(conn) if resume else None
+        parse_status: Dict[str, str] = {}
+        if resumed:
+            run_id = resumed["run_id"]
+            run_created_at = resumed["started_at"]
+            parse_status = {
+                row["unit_id"]: row["status"]
+                for row in list_stage_checkpoints(conn, run_id, "parse")
+            }
+            pdfs_to_process = [pdf for pdf in pdfs if pdf["pdf_id"] in parse_status]
+            logger.info(
+                "Resuming run %s (%d/%d PDF(s) parsed).",
+                run_id,
+                sum(status == "parsed" for status in parse_status.values()),
+                len(pdfs_to_process),
+            )
+            update_pipeline_run(conn, run_id, "running", _now())
+        else:
+            if resume:
+                logger.info("No interrupted run to resume; starting a new run.")
+            if pdf_ids is not None:
+                pdfs_to_process = [pdf for pdf in pdfs if pdf["pdf_id"] in pdf_ids]
+            else:
+                pdfs_to_process = _select_pdfs_to_process(
+                    conn, pdfs, config.skip_processed_pdfs
+                )
+            if not pdfs_to_process and not list_unassigned_candidate_ids(conn):
+                logger.info("No unprocessed PDFs to process.")
+                return False
+            create_pipeline_run(conn, run_id, run_created_at)
+            set_stage_checkpoints(
+                conn,
+                run_id,
+                "parse",
+                [pdf["pdf_id"] for pdf in pdfs_to_process],
+                "pending",
+                run_created_at,
+            )
+        run_started = True
+        if resumed and not pdfs_to_process:
+            logger.info("Resumed run has no PDFs left to process.")
+            _finish_run(conn, run_id, "skipped")
             return False
         _report(progress_cb, "Preparing pipeline", 0.05)
-        clear_derived_tables(conn)
+        changed_pdf_ids = {pdf["pdf_id"] for pdf in pdfs_to_process}
+        invalidate_pdfs(conn, changed_pdf_ids)
 
         Path(config.rag_output_dir).mkdir(parents=True, exist_ok=True)
+        pdfs_to_parse = []
         for pdf in pdfs_to_process:
-            logger.info("Parsing PDF: %s", pdf["file_path"])
-            if not has_content_blocks_for_pdf(conn, pdf["pdf_id"]):
-                blocks = _parse_pdf_to_blocks(
-                    pdf_path=pdf["file_path"],
-                    pdf_id=pdf["pdf_id"],
-                    output_dir=config.rag_output_dir,
-                    parser_name=config.rag_parser,
-                    parse_method=config.rag_parse_method,
-                )
-                insert_content_blocks(conn, blocks)
+            if parse_status.get(pdf["pdf_id"]) == "parsed":
+                continue
+            if has_content_blocks_for_pdf(conn, pdf["pdf_id"]):
+                set_stage_checkpoint(conn, run_id, "parse", pdf["pdf_id"], "parsed", _now())
+                continue
+            pdfs_to_parse.append(pdf)
+        _parse_pdfs_into_db(conn, pdfs_to_parse, config, run_id)
         _report(progress_cb, "Extracting candidates", 0.25)
 
-        candidates = _extract_and_store_candidates(
-            conn, pdf_ids={pdf["pdf_id"] for pdf in pdfs_to_process}
-        )
+        _extract_and_store_candidates(conn, pdf_ids=changed_pdf_ids)
+        candidates = {
+            candidate.candidate_id: candidate
+            for candidate in iter_candidates(conn, row_factory=_candidate_from_row)
+        }
         if not candidates:
             logger.info("No candidates extracted.")
+            _finish_run(conn, run_id, "skipped")
             return False
 
         embedding_model = config.embedding_model
@@ -89,44 +198,75 @@ def run_pipeline(
             model_name=embedding_model,
             max_tokens=config.max_tokens_per_embed,
             approx_enabled=config.tokenization_fallback_approx_enabled,
+            dimensions=embedding_dim,
+            concurrency=config.embedding_concurrency,
+            batch_max_inputs=config.embedding_batch_max_inputs,
+            batch_max_tokens=config.embedding_batch_max_tokens,
         )
 
         _report(progress_cb, "Embedding candidates", 0.4)
-        name_only_texts = [c.candidate_name for c in candidates]
+        pending_ids = set(list_unassigned_candidate_ids(conn))
+        normalized = {cid: c.normalized_name for cid, c in candidates.items()}
+        pairs = [
+            (a, b)
+            for a, b in generate_candidate_pairs(sorted(candidates), normalized)
+            if a in pending_ids or b in pending_ids
+        ]
+        embedded = [
+            candidates[cid] for cid in sorted(pending_ids.union(chain.from_iterable(pairs)))
+        ]
+        logger.info(
+            "Clustering %d new or orphaned candidate(s) against %d existing one(s).",
+            len(pending_ids),
+            len(embedded) - len(pending_ids),
+        )
+        name_only_texts = [c.candidate_name for c in embedded]
         name_plus_texts = [
-            f"{c.candidate_name}\n{c.representative_text}" for c in candidates
+            f"{c.candidate_name}\n{c.representative_text}" for c in embedded
         ]
-        name_only_embeddings = embedder.embed_texts(conn, name_only_texts)
-        name_plus_embeddings = embedder.embed_texts(conn, name_plus_texts)
-        tokens_by_model[embedding_model] = tokens_by_model.get(
-            embedding_model, 0
-        ) + name_only_embeddings.total_tokens + name_plus_embeddings.total_tokens
+        name_only_embeddings = _embed_texts(
+            conn, embedder, name_only_texts, "candidates_name_only"
+        )
+        name_plus_embeddings = _embed_texts(
+            conn, embedder, name_plus_texts, "candidates_name_plus_summary"
+        )
+        _add_usage(
+            tokens_by_model,
+            cache_by_model,
+            embedding_model,
+            name_only_embeddings,
+            name_plus_embeddings,
+        )
 
-        candidate_ids = [c.candidate_id for c in candidates]
+        embedded_ids = [c.candidate_id for c in embedded]
         embeddings_by_id_name = dict(
-            zip(candidate_ids, name_only_embeddings.vectors, strict=False)
+            zip(embedded_ids, name_only_embeddings.vectors, strict=False)
         )
         embeddings_by_id_plus = dict(
-            zip(candidate_ids, name_plus_embeddings.vectors, strict=False)
+            zip(embedded_ids, name_plus_embeddings.vectors, strict=False)
         )
 
-        for candidate, vector, token_count in zip(
-            candidates,
-            name_plus_embeddings.vectors,
-            name_plus_embeddings.token_counts,
-            strict=False,
-        ):
-            insert_candidate_embedding(
-                conn,
-                candidate_id=candidate.candidate_id,
-                model_name=embedding_model,
-                vector=serialize_vector(vector),
-                token_count=token_count,
-                tokenization_mode=name_plus_embeddings.tokenization_mode,
-            )
+        insert_candidate_embeddings(
+            conn,
+            (
+                (
+                    candidate_id,
+                    embedding_model,
+                    vector,
+                    token_count,
+                    name_plus_embeddings.tokenization_mode,
+                )
+                for candidate_id, vector, token_count in zip(
+                    embedded_ids,
+                    name_plus_embeddings.vectors,
+                    name_plus_embeddings.token_counts,
+                    strict=False,
+                )
+                if candidate_id in pending_ids
+            ),
+            dtype=config.embedding_storage_dtype,
+        )
 
-        normalized = {c.candidate_id: c.normalized_name for c in candidates}
-        pairs = generate_candidate_pairs(candidate_ids, normalized)
         similarities = []
         similarities += similarity_pairs_for_mode(
             pairs, embeddings_by_id_name, "name_only"
@@ -147,11 +287,20 @@ def run_pipeline(
             ),
         }
         _report(progress_cb, "Merging candidates", 0.6)
+        partners = _merge_partners(similarities, thresholds_by_mode, rejected_pairs)
+        delete_domains(
+            conn,
+            get_domain_ids_for_blocks(
+                conn,
+                (candidates[cid].source_block_id for cid in partners - pending_ids),
+            ),
+        )
+        recluster_ids = set(list_unassigned_candidate_ids(conn))
         merge_result = merge_candidates(
-            similarities=similarities,
+            similarities=list_similarity_pairs_within(conn, recluster_ids) + similarities,
             thresholds_by_mode=thresholds_by_mode,
             rejected_pairs=rejected_pairs,
-            items=candidate_ids,
+            items=recluster_ids,
         )
 
         now = datetime.now(timezone.utc).isoformat()
@@ -165,8 +314,10 @@ def run_pipeline(
         )
         persist_merge_results(
             conn=conn,
-            clusters=merge_result.clusters,
-            candidates={c.candidate_id: c for c in candidates},
+            clusters=[
+                cluster for cluster in merge_result.clusters if cluster <= recluster_ids
+            ],
+            candidates=candidates,
             review_items=review_items,
             persist_pairs=merge_result.persist_pairs,
             created_at=now,
@@ -176,15 +327,25 @@ def run_pipeline(
 
         domains = _build_domains_payload(conn)
         _report(progress_cb, "Embedding domains", 0.8)
-        domain_embeddings, domain_tokens = _build_domain_embeddings(
+        stored_ids, stored_matrix = load_domain_embedding_matrix(conn, embedding_model)
+        stored_embeddings = {
+            domain_id: vector.tolist()
+            for domain_id, vector in zip(stored_ids, stored_matrix, strict=False)
+        }
+        new_embeddings, domain_result = _build_domain_embeddings(
             conn,
-            domains=domains,
-            candidates={c.candidate_id: c for c in candidates},
+            domains=[d for d in domains if d["domain_id"] not in stored_embeddings],
+            candidates=candidates,
             embedder=embedder,
+            storage_dtype=config.embedding_storage_dtype,
         )
-        tokens_by_model[embedding_model] = tokens_by_model.get(
-            embedding_model, 0
-        ) + domain_tokens
+        stored_embeddings.update(new_embeddings)
+        domain_embeddings = {
+            domain["domain_id"]: stored_embeddings[domain["domain_id"]]
+            for domain in domains
+            if domain["domain_id"] in stored_embeddings
+        }
+        _add_usage(tokens_by_model, cache_by_model, embedding_model, domain_result)
         label_index = build_label_index(
             embedding_model=embedding_model,
             embedding_dimension=embedding_dim,
@@ -218,18 +379,29 @@ def run_pipeline(
                 for domain_id, text in domain_embeddings.items()
             ],
         )
+        _finish_run(conn, run_id, "completed")
         _report(progress_cb, "Artifact bundle written", 1.0)
         return True
+    except BaseException as exc:
+        if run_started:
+            try:
+                update_pipeline_run(conn, run_id, "failed", _now(), error=repr(exc))
+            except Exception:
+                logger.exception("Failed to record pipeline run failure.")
+        raise
     finally:
         try:
             if tokens_by_model:
                 for model_name, total_tokens in tokens_by_model.items():
+                    cache_hits, cache_misses = cache_by_model.get(model_name, (0, 0))
                     insert_token_usage(
                         conn,
                         run_id=run_id,
                         model_name=model_name,
                         total_tokens=total_tokens,
                         created_at=run_created_at,
+                        cache_hits=cache_hits,
+                        cache_misses=cache_misses,
                     )
         except Exception:
             logger.exception("Failed to persist token usage metrics.")
@@ -237,8 +409,8 @@ def run_pipeline(
 
 
 def _list_pdfs(conn: sqlite3.Connection) -> List[Dict[str, str]]:
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
+    rows = query(
+        conn,
         "SELECT pdf_id, file_path, checksum, ingested_at FROM pdfs ORDER BY pdf_id;"
     ).fetchall()
     return [dict(row) for row in rows]
@@ -251,7 +423,79 @@ def _select_pdfs_to_process(
 ) -> List[Dict[str, str]]:
     if not skip_processed:
         return pdfs
-    return [pdf for pdf in pdfs if not has_content_blocks_for_pdf(conn, pdf["pdf_id"])]
+    return [
+        pdf
+        for pdf in pdfs
+        if not has_content_blocks_for_pdf(conn, pdf["pdf_id"])
+        or _missing_candidates(conn, pdf["pdf_id"])
+    ]
+
+
+def _missing_candidates(conn: sqlite3.Connection, pdf_id: str) -> bool:
+    if has_candidates_for_pdf(conn, pdf_id):
+        return False
+    blocks = iter_content_block_rows(conn, pdf_id, row_factory=_content_block_from_row)
+    return bool(extract_candidates(blocks))
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _mark_parse(
+    conn: sqlite3.Connection,
+    run_id: str | None,
+    pdf_ids: List[str],
+    status: str,
+    detail: str | None = None,
+) -> None:
+    if run_id is None:
+        return
+    if detail is None:
+        set_stage_checkpoints(conn, run_id, "parse", pdf_ids, status, _now())
+        return
+    for pdf_id in pdf_ids:
+        set_stage_checkpoint(conn, run_id, "parse", pdf_id, status, _now(), detail=detail)
+
+
+def _finish_run(conn: sqlite3.Connection, run_id: str, status: str) -> None:
+    update_pipeline_run(conn, run_id, status, _now())
+
+
+def _embed_texts(
+    conn: sqlite3.Connection,
+    embedder: AzureOpenAIEmbedder,
+    texts: List[str],
+    purpose: str,
+) -> EmbeddingResult:
+    result = embedder.embed_texts(conn, texts)
+    if result.request_tokens:
+        ordered = sorted(result.request_tokens)
+        logging.getLogger(__name__).info(
+            "Embedded %s in %d request(s); tokens per request min/median/max %d/%d/%d.",
+            purpose,
+            result.request_count,
+            ordered[0],
+            ordered[len(ordered) // 2],
+            ordered[-1],
+        )
+    return result
+
+
+def _add_usage(
+    tokens_by_model: Dict[str, int],
+    cache_by_model: Dict[str, tuple[int, int]],
+    model_name: str,
+    *results: EmbeddingResult,
+) -> None:
+    hits, misses = cache_by_model.get(model_name, (0, 0))
+    tokens_by_model[model_name] = tokens_by_model.get(model_name, 0) + sum(
+        result.total_tokens for result in results
+    )
+    cache_by_model[model_name] = (
+        hits + sum(result.cache_hits for result in results),
+        misses + sum(result.cache_misses for result in results),
+    )
 
 
 def _report(progress_cb: Callable[[str, float], None] | None, message: str, pct: float) -> None:
@@ -259,107 +503,182 @@ def _report(progress_cb: Callable[[str, float], None] | None, message: str, pct:
         progress_cb(message, pct)
 
 
-def _parse_pdf_to_blocks(
-    pdf_path: str,
-    pdf_id: str,
-    output_dir: str,
-    parser_name: str,
-    parse_method: str,
-) -> List[Dict[str, object]]:
-    parsed = parse_document(
-        file_path=pdf_path,
-        output_dir=output_dir,
-        parser_name=parser_name,
-        parse_method=parse_method,
+def _parse_pdfs_into_db(
+    conn: sqlite3.Connection,
+    pdfs: List[Dict[str, str]],
+    config: AppConfig,
+    run_id: str | None,
+) -> None:
+    logger = logging.getLogger(__name__)
+    version = parser_version(config.rag_parser)
+    created_at = datetime.now(timezone.utc).isoformat()
+    pdfs_to_parse: List[Dict[str, str]] = []
+    for pdf in pdfs:
+        cached = get_parse_cache(
+            conn, pdf["checksum"], config.rag_parser, config.rag_parse_method, version
+        )
+        record_parse_cache_lookup(
+            conn,
+            pdf["checksum"],
+            config.rag_parser,
+            config.rag_parse_method,
+            version,
+            hit=cached is not None,
+        )
+        if cached is None:
+            pdfs_to_parse.append(pdf)
+            continue
+        parsed = ParsedDocument(
+            content_list=cached["content_list"],
+            markdown=cached["markdown"],
+            parser_name=config.rag_parser,
+            parse_method=config.rag_parse_method,
+        )
+        count = insert_content_blocks(conn, iter_content_blocks(parsed, pdf["pdf_id"]))
+        _mark_parse(conn, run_id, [pdf["pdf_id"]], "parsed")
+        logger.info("Restored PDF from parse cache: %s (%d blocks)", pdf["file_path"], count)
+    if pdfs:
+        logger.info(
+            "Parse cache: %d hit(s), %d miss(es).",
+            len(pdfs) - len(pdfs_to_parse),
+            len(pdfs_to_parse),
+        )
+    if not pdfs_to_parse:
+        return
+
+    checksums = {pdf["pdf_id"]: pdf["checksum"] for pdf in pdfs_to_parse}
+    logger.info(
+        "Parsing %d PDF(s) with %d worker(s).", len(pdfs_to_parse), config.parse_workers
     )
-    blocks: List[Dict[str, object]] = []
-    markdown_blocks = parse_markdown(parsed.markdown) if parsed.markdown else []
-    if markdown_blocks:
-        for idx, block in enumerate(markdown_blocks):
-            blocks.append(
-                {
-                    "block_id": f"{pdf_id}_b{idx:05d}",
-                    "pdf_id": pdf_id,
-                    "section_path": block.section_path,
-                    "heading_level": block.heading_level,
-                    "block_type": block.block_type,
-                    "text": block.text,
-                    "page_index": 0,
-                    "position_index": idx,
-                }
+    _mark_parse(conn, run_id, [pdf["pdf_id"] for pdf in pdfs_to_parse], "parsing")
+    warmup_seconds = 0.0
+    parse_seconds = 0.0
+    for outcome in parse_pdfs(
+        pdfs_to_parse,
+        output_dir=config.rag_output_dir,
+        parser_name=config.rag_parser,
+        parse_method=config.rag_parse_method,
+        workers=config.parse_workers,
+        shard_pages=config.parse_shard_pages,
+    ):
+        warmup_seconds += outcome.warmup_seconds
+        parse_seconds += outcome.parse_seconds
+        if outcome.error or outcome.parsed is None:
+            logger.error("Skipping PDF %s: %s", outcome.file_path, outcome.error)
+            _mark_parse(
+                conn,
+                run_id,
+                [outcome.pdf_id],
+                "failed",
+                detail=outcome.error or "parser returned no output",
             )
-        return blocks
-
-    position = 0
-    for item in parsed.content_list:
-        if not isinstance(item, dict):
             continue
-        if item.get("type") != "text":
-            continue
-        text = item.get("text", "").strip()
-        if not text:
-            continue
-        blocks.append(
-            {
-                "block_id": f"{pdf_id}_b{position:05d}",
-                "pdf_id": pdf_id,
-                "section_path": "",
-                "heading_level": 0,
-                "block_type": "paragraph",
-                "text": text,
-                "page_index": int(item.get("page_idx", 0)),
-                "position_index": position,
-            }
+        set_parse_cache(
+            conn,
+            checksum=checksums[outcome.pdf_id],
+            parser_name=config.rag_parser,
+            parse_method=config.rag_parse_method,
+            parser_version=version,
+            content_list=outcome.parsed.content_list,
+            markdown=outcome.parsed.markdown,
+            created_at=created_at,
+        )
+        count = insert_content_blocks(
+            conn, iter_content_blocks(outcome.parsed, outcome.pdf_id)
+        )
+        _mark_parse(conn, run_id, [outcome.pdf_id], "parsed")
+        logger.info(
+            "Parsed PDF: %s (%d blocks, %d shard(s), warm-up %.1fs, parse %.1fs)",
+            outcome.file_path,
+            count,
+            outcome.shard_count,
+            outcome.warmup_seconds,
+            outcome.parse_seconds,
         )
-        position += 1
-    return blocks
+    logger.info(
+        "Parser warm-up %.1fs, parse %.1fs (summed across workers).",
+        warmup_seconds,
+        parse_seconds,
+    )
 
 
 def _extract_and_store_candidates(
     conn: sqlite3.Connection, pdf_ids: set[str]
 ) -> List[DomainCandidate]:
-    rows: List[Dict[str, object]] = []
-    for pdf_id in sorted(pdf_ids):
-        rows.extend(list_content_blocks_by_pdf(conn, pdf_id))
-    blocks = [
-        ContentBlock(
-            block_id=row["block_id"],
-            pdf_id=row["pdf_id"],
-            section_path=row.get("section_path") or "",
-            heading_level=row.get("heading_level") or 0,
-            block_type=row.get("block_type") or "paragraph",
-            text=row.get("text") or "",
-            page_index=row.get("page_index") or 0,
-            position_index=row.get("position_index") or 0,
-        )
-        for row in rows
-    ]
+    blocks = chain.from_iterable(
+        iter_content_block_rows(conn, pdf_id, row_factory=_content_block_from_row)
+        for pdf_id in sorted(pdf_ids)
+    )
     candidates = extract_candidates(blocks)
-    conn.execute("DELETE FROM domain_candidates;")
-    for candidate in candidates:
-        insert_candidate(
+    with unit_of_work(conn):
+        insert_candidates(
             conn,
-            candidate_id=candidate.candidate_id,
-            candidate_name=candidate.candidate_name,
-            normalized_name=candidate.normalized_name,
-            source_pdf_id=candidate.source_pdf_id,
-            source_block_id=candidate.source_block_id,
-            heading_level=candidate.heading_level,
-            representative_text=candidate.representative_text,
+            (
+                {
+                    "candidate_id": candidate.candidate_id,
+                    "candidate_name": candidate.candidate_name,
+                    "normalized_name": candidate.normalized_name,
+                    "source_pdf_id": candidate.source_pdf_id,
+                    "source_block_id": candidate.source_block_id,
+                    "heading_level": candidate.heading_level,
+                    "representative_text": candidate.representative_text,
+                }
+                for candidate in candidates
+            ),
         )
     return candidates
 
 
+def _merge_partners(
+    similarities: Sequence[Tuple[str, str, float, str]],
+    thresholds_by_mode: Dict[str, Tuple[float, float]],
+    rejected_pairs: Set[Tuple[str, str]],
+) -> Set[str]:
+    partners: Set[str] = set()
+    for a, b, score, mode in similarities:
+        if score < thresholds_by_mode[mode][0]:
+            continue
+        if ((a, b) if a <= b else (b, a)) in rejected_pairs:
+            continue
+        partners.update((a, b))
+    return partners
+
+
+def _candidate_from_row(row: Tuple[Any, ...]) -> DomainCandidate:
+    candidate_id, name, normalized, pdf_id, block_id, heading_level, text = row
+    return DomainCandidate(
+        candidate_id=candidate_id,
+        candidate_name=name,
+        normalized_name=normalized,
+        source_pdf_id=pdf_id,
+        source_block_id=block_id,
+        heading_level=heading_level or 0,
+        representative_text=text,
+    )
+
+
+def _content_block_from_row(row: Tuple[Any, ...]) -> ContentBlock:
+    block_id, pdf_id, section_path, heading_level, block_type, text, page, position = row
+    return ContentBlock(
+        block_id=block_id,
+        pdf_id=pdf_id,
+        section_path=section_path or "",
+        heading_level=heading_level or 0,
+        block_type=block_type or "paragraph",
+        text=text or "",
+        page_index=page or 0,
+        position_index=position or 0,
+    )
+
+
 def _build_domains_payload(conn: sqlite3.Connection) -> List[Dict[str, object]]:
     domains = list_domains(conn)
-    aliases = list_domain_aliases(conn)
-    sources = list_domain_sources(conn)
     aliases_by_domain: Dict[str, List[str]] = {}
-    for alias in aliases:
-        aliases_by_domain.setdefault(alias["domain_id"], []).append(alias["alias"])
+    for domain_id, alias in iter_domain_aliases(conn, row_factory=lambda row: row[:2]):
+        aliases_by_domain.setdefault(domain_id, []).append(alias)
     sources_by_domain: Dict[str, List[str]] = {}
-    for source in sources:
-        sources_by_domain.setdefault(source["domain_id"], []).append(source["pdf_id"])
+    for domain_id, pdf_id in iter_domain_sources(conn, row_factory=tuple):
+        sources_by_domain.setdefault(domain_id, []).append(pdf_id)
     payload = []
     for domain in domains:
         payload.append(
@@ -378,14 +697,11 @@ def _build_domain_embeddings(
     domains: List[Dict[str, object]],
     candidates: Dict[str, DomainCandidate],
     embedder: AzureOpenAIEmbedder,
-) -> tuple[Dict[str, List[float]], int]:
-    conn.row_factory = sqlite3.Row
-    block_map = conn.execute(
-        "SELECT block_id, domain_id FROM block_domain_map ORDER BY block_id;"
-    ).fetchall()
+    storage_dtype: str,
+) -> tuple[Dict[str, List[float]], EmbeddingResult]:
     block_by_domain: Dict[str, List[str]] = {}
-    for row in block_map:
-        block_by_domain.setdefault(row["domain_id"], []).append(row["block_id"])
+    for block_id, domain_id in iter_block_domain_map(conn, row_factory=tuple):
+        block_by_domain.setdefault(domain_id, []).append(block_id)
 
     domain_texts: List[str] = []
     domain_ids: List[str] = []
@@ -408,21 +724,25 @@ def _build_domain_embeddings(
         domain_ids.append(domain_id)
         domain_texts.append(text or domain["display_name"])
 
-    embedded = embedder.embed_texts(conn, domain_texts)
-    embeddings: Dict[str, List[float]] = {}
-    for domain_id, vector, token_count in zip(
-        domain_ids, embedded.vectors, embedded.token_counts, strict=False
-    ):
-        embeddings[domain_id] = vector
-        insert_domain_embedding(
-            conn,
-            domain_id=domain_id,
-            model_name=embedder.model_name,
-            vector=serialize_vector(vector),
-            token_count=token_count,
-            tokenization_mode=embedded.tokenization_mode,
-        )
-    return embeddings, embedded.total_tokens
+    embedded = _embed_texts(conn, embedder, domain_texts, "domains")
+    embeddings = dict(zip(domain_ids, embedded.vectors, strict=False))
+    insert_domain_embeddings(
+        conn,
+        (
+            (
+                domain_id,
+                embedder.model_name,
+                vector,
+                token_count,
+                embedded.tokenization_mode,
+            )
+            for domain_id, vector, token_count in zip(
+                domain_ids, embedded.vectors, embedded.token_counts, strict=False
+            )
+        ),
+        dtype=storage_dtype,
+    )
+    return embeddings, embedded
 
 
 def _build_label_vec(
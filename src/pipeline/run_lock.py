@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Tuple
+
+from src.db.connection import connect
+from src.db.lock_repo import acquire_lock, refresh_lock, release_lock
+
+PIPELINE_LOCK_NAME = "pipeline"
+LOCK_STALE_SECONDS = 300.0
+LOCK_HEARTBEAT_SECONDS = 30.0
+
+_HELD: Dict[Tuple[str, str, str], int] = {}
+_HELD_LOCK = threading.Lock()
+
+
+@contextmanager
+def pipeline_lock(
+    db_path: str,
+    name: str = PIPELINE_LOCK_NAME,
+    stale_after_seconds: float = LOCK_STALE_SECONDS,
+    heartbeat_seconds: float = LOCK_HEARTBEAT_SECONDS,
+) -> Iterator[bool]:
+    owner = lock_owner()
+    key = (db_path, name, owner)
+    with _HELD_LOCK:
+        reentrant = key in _HELD
+        if reentrant:
+            _HELD[key] += 1
+    if reentrant:
+        try:
+            yield True
+        finally:
+            with _HELD_LOCK:
+                _HELD[key] -= 1
+        return
+
+    conn = connect(db_path)
+    try:
+        if not acquire_lock(conn, name, owner, _now(), stale_after_seconds):
+            yield False
+            return
+        stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=_heartbeat,
+            args=(db_path, name, owner, heartbeat_seconds, stop),
+            daemon=True,
+        )
+        heartbeat.start()
+        with _HELD_LOCK:
+            _HELD[key] = 1
+        try:
+            yield True
+        finally:
+            with _HELD_LOCK:
+                _HELD.pop(key, None)
+            stop.set()
+            heartbeat.join()
+            release_lock(conn, name, owner)
+    finally:
+        conn.close()
+
+
+def lock_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def _heartbeat(
+    db_path: str, name: str, owner: str, interval: float, stop: threading.Event
+) -> None:
+    while not stop.wait(interval):
+        conn = connect(db_path)
+        try:
+            if not refresh_lock(conn, name, owner, _now()):
+                logging.getLogger(__name__).warning(
+                    "Lost pipeline lock %s held by %s.", name, owner
+                )
+                return
+        except sqlite3.Error:
+            logging.getLogger(__name__).exception("Failed to refresh pipeline lock.")
+        finally:
+            conn.close()
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
@@ -1,7 +1,12 @@
 from __future__ import annotations
 
 import math
-from typing import Protocol
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Protocol, Sequence
+
+DEFAULT_ENCODE_THREADS = min(8, os.cpu_count() or 1)
 
 
 class Encoding(Protocol):
@@ -9,6 +14,14 @@ class Encoding(Protocol):
     def decode(self, tokens: list[int]) -> str: ...
 
 
+@dataclass(frozen=True)
+class TokenizedText:
+    text: str
+    token_count: int
+    tokenization_mode: str
+
+
+@lru_cache(maxsize=None)
 def _get_tiktoken_encoding(model_name: str) -> Encoding:
     import tiktoken
 
@@ -25,60 +38,66 @@ def _approx_token_count(text: str) -> int:
     return int(math.ceil(approx))
 
 
-def count_tokens(text: str, model_name: str, approx_enabled: bool) -> int:
+def tokenize_texts(
+    texts: Sequence[str],
+    model_name: str,
+    max_tokens: int | None,
+    approx_enabled: bool,
+    num_threads: int = DEFAULT_ENCODE_THREADS,
+) -> list[TokenizedText]:
     try:
         encoding = _get_tiktoken_encoding(model_name)
     except Exception:
         if not approx_enabled:
             raise
-        return _approx_token_count(text)
+        approx: list[TokenizedText] = []
+        for text in texts:
+            if max_tokens is not None:
+                text = _approx_truncate(text, max_tokens)
+            approx.append(TokenizedText(text, _approx_token_count(text), "approx"))
+        return approx
+
+    encode_batch = getattr(encoding, "encode_batch", None)
+    if encode_batch is not None and len(texts) > 1:
+        token_lists = encode_batch(list(texts), num_threads=num_threads)
+    else:
+        token_lists = [encoding.encode(text) for text in texts]
+    tokenized: list[TokenizedText] = []
+    for text, tokens in zip(texts, token_lists, strict=False):
+        if max_tokens is None or len(tokens) <= max_tokens:
+            tokenized.append(TokenizedText(text, len(tokens), "exact"))
+        else:
+            truncated = encoding.decode(tokens[:max_tokens])
+            tokenized.append(TokenizedText(truncated, max_tokens, "exact"))
+    return tokenized
+
+
+def tokenize_text(
+    text: str, model_name: str, max_tokens: int | None, approx_enabled: bool
+) -> TokenizedText:
+    return tokenize_texts([text], model_name, max_tokens, approx_enabled)[0]
+
 
-    return len(encoding.encode(text))
+def count_tokens(text: str, model_name: str, approx_enabled: bool) -> int:
+    return tokenize_text(text, model_name, None, approx_enabled).token_count
 
 
 def count_tokens_with_mode(
     text: str, model_name: str, approx_enabled: bool
 ) -> tuple[int, str]:
-    try:
-        encoding = _get_tiktoken_encoding(model_name)
-    except Exception:
-        if not approx_enabled:
-            raise
-        return _approx_token_count(text), "approx"
-
-    return len(encoding.encode(text)), "exact"
+    tokenized = tokenize_text(text, model_name, None, approx_enabled)
+    return tokenized.token_count, tokenized.tokenization_mode
 
 
 def truncate_text(text: str, model_name: str, max_tokens: int, approx_enabled: bool) -> str:
-    try:
-        encoding = _get_tiktoken_encoding(model_name)
-    except Exception:
-        if not approx_enabled:
-            raise
-        return _approx_truncate(text, max_tokens)
-
-    tokens = encoding.encode(text)
-    if len(tokens) <= max_tokens:
-        return text
-    truncated_tokens = tokens[:max_tokens]
-    return encoding.decode(truncated_tokens)
+    return tokenize_text(text, model_name, max_tokens, approx_enabled).text
 
 
 def truncate_text_with_mode(
     text: str, model_name: str, max_tokens: int, approx_enabled: bool
 ) -> tuple[str, str]:
-    try:
-        encoding = _get_tiktoken_encoding(model_name)
-    except Exception:
-        if not approx_enabled:
-            raise
-        return _approx_truncate(text, max_tokens), "approx"
-
-    tokens = encoding.encode(text)
-    if len(tokens) <= max_tokens:
-        return text, "exact"
-    truncated_tokens = tokens[:max_tokens]
-    return encoding.decode(truncated_tokens), "exact"
+    tokenized = tokenize_text(text, model_name, max_tokens, approx_enabled)
+    return tokenized.text, tokenized.tokenization_mode
 
 
 def _approx_truncate(text: str, max_tokens: int) -> str:
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Set, Tuple
+
+from src.config import AppConfig
+from src.db.connection import connect
+from src.pipeline.pdf_registry import find_pdf_files, register_pdf_files
+from src.pipeline.run import parse_registered_pdfs, run_pipeline
+from src.pipeline.run_lock import pipeline_lock
+
+FileSignature = Tuple[int, int]
+
+
+class ArrivalQueue:
+    def __init__(self, debounce_seconds: float) -> None:
+        self.debounce_seconds = debounce_seconds
+        self._pending: Dict[Path, Tuple[FileSignature, float]] = {}
+        self._handled: Dict[Path, FileSignature] = {}
+
+    def observe(self, snapshot: Dict[Path, FileSignature], now: float) -> None:
+        for path, signature in snapshot.items():
+            if self._handled.get(path) == signature:
+                continue
+            pending = self._pending.get(path)
+            if pending is None or pending[0] != signature:
+                self._pending[path] = (signature, now)
+        for path in list(self._pending):
+            if path not in snapshot:
+                del self._pending[path]
+        for path in list(self._handled):
+            if path not in snapshot:
+                del self._handled[path]
+
+    def take_ready(self, now: float) -> List[Path]:
+        return sorted(
+            path
+            for path, (_, changed_at) in self._pending.items()
+            if now - changed_at >= self.debounce_seconds
+        )
+
+    def mark_handled(self, paths: List[Path]) -> None:
+        for path in paths:
+            signature, _ = self._pending.pop(path)
+            self._handled[path] = signature
+
+    def is_drained(self) -> bool:
+        return not self._pending
+
+
+def snapshot_pdf_files(directory: Path) -> Dict[Path, FileSignature]:
+    snapshot: Dict[Path, FileSignature] = {}
+    for path in find_pdf_files(directory):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+    return snapshot
+
+
+def watch_directory(
+    config: AppConfig,
+    watch_dir: Path,
+    debounce_seconds: float,
+    poll_seconds: float,
+    stop: threading.Event | None = None,
+    on_pass: Callable[[bool], None] | None = None,
+) -> None:
+    logger = logging.getLogger(__name__)
+    stop = stop or threading.Event()
+    watch_dir.mkdir(parents=True, exist_ok=True)
+    queue = ArrivalQueue(debounce_seconds)
+    queued_pdf_ids: Set[str] = set()
+    logger.info("Watching %s (debounce %.1fs).", watch_dir, debounce_seconds)
+    while not stop.is_set():
+        try:
+            _watch_pass(config, watch_dir, queue, queued_pdf_ids, on_pass)
+        except Exception:
+            logger.exception("Watch pass failed; retrying on the next poll.")
+        stop.wait(poll_seconds)
+
+
+def _watch_pass(
+    config: AppConfig,
+    watch_dir: Path,
+    queue: ArrivalQueue,
+    queued_pdf_ids: Set[str],
+    on_pass: Callable[[bool], None] | None,
+) -> None:
+    logger = logging.getLogger(__name__)
+    now = time.monotonic()
+    queue.observe(snapshot_pdf_files(watch_dir), now)
+    ready = queue.take_ready(now)
+    if ready:
+        pdf_ids = _register(config, ready)
+        queue.mark_handled(ready)
+        if pdf_ids:
+            logger.info("Registered %d new PDF(s).", len(pdf_ids))
+            queued_pdf_ids.update(pdf_ids)
+            parse_registered_pdfs(config, pdf_ids)
+    if queued_pdf_ids and queue.is_drained():
+        with pipeline_lock(config.db_path) as acquired:
+            if acquired:
+                logger.info(
+                    "Queue drained; running pipeline for %d PDF(s).", len(queued_pdf_ids)
+                )
+                success = run_pipeline(config, pdf_ids=set(queued_pdf_ids))
+                queued_pdf_ids.clear()
+                if on_pass:
+                    on_pass(success)
+            else:
+                logger.info("Pipeline busy; will retry the queued PDFs.")
+
+
+def _register(config: AppConfig, paths: List[Path]) -> List[str]:
+    conn = connect(config.db_path)
+    try:
+        result = register_pdf_files(conn, paths, Path(config.pdf_storage_dir))
+    finally:
+        conn.close()
+    return result.pdf_ids
+
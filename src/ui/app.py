@@ -1,7 +1,5 @@
 from __future__ import annotations
 
-import hashlib
-import sqlite3
 from dataclasses import replace
 from datetime import datetime, timezone
 from os import getenv
@@ -11,21 +9,39 @@ import streamlit as st
 
 from src.config import load_config
 from src.db.candidate_repo import get_candidate
-from src.db.content_repo import delete_content_blocks_for_pdf
-from src.db.repo import (
-    clear_derived_tables,
-    delete_pdf,
-    get_pdf_by_checksum,
-    get_pdf_by_path,
-    insert_pdf,
-    list_pdfs,
+from src.db.connection import get_connection
+from src.db.job_repo import (
+    ACTIVE_JOB_STATUSES,
+    fail_stale_jobs,
+    get_active_job,
+    get_job,
+    list_recent_jobs,
+    request_job_cancel,
 )
+from src.db.repo import delete_pdf, get_pdf_by_path, list_pdfs
 from src.db.review_repo import list_pending_reviews, resolve_review
-from src.db.schema import create_schema
-from src.db.token_usage_repo import get_latest_run_usage, get_total_usage
-from src.pipeline.run import run_pipeline
+from src.db.search_repo import search_content_blocks, search_domain_aliases
+from src.db.token_usage_repo import (
+    cache_hit_rate,
+    get_latest_run_usage,
+    get_total_cache_usage,
+    get_total_usage,
+)
+from src.pipeline.jobs import JOB_STALE_SECONDS, PIPELINE_JOB_KIND, submit_pipeline_job
+from src.pipeline.pdf_registry import store_pdf_streams
+from src.pipeline.run_lock import pipeline_lock
 from src.ui.state import load_domain_list, load_pdf_lists
 
+JOB_POLL_SECONDS = 2.0
+_RUN_PARAMETERS = (
+    "embedding_model",
+    "merge_threshold_name_only",
+    "review_threshold_name_only",
+    "merge_threshold_name_plus_summary",
+    "review_threshold_name_plus_summary",
+    "preferred_display_language",
+)
+
 
 def render_upload_section() -> None:
     st.subheader("Upload PDFs")
@@ -59,42 +75,40 @@ def render_pdf_lists() -> None:
 
 def render_delete_pdf(config) -> None:
     st.subheader("Delete PDFs (Hard Delete)")
-    conn = sqlite3.connect(config.db_path)
-    try:
-        create_schema(conn)
-        pdfs = list_pdfs(conn)
-        if not pdfs:
-            st.caption("No stored PDFs available.")
+    conn = get_connection(config.db_path)
+    pdfs = list_pdfs(conn)
+    if not pdfs:
+        st.caption("No stored PDFs available.")
+        return
+    options = {row["file_path"]: row["pdf_id"] for row in pdfs}
+    selection = st.selectbox(
+        "Select PDF to delete",
+        options=list(options.keys()),
+        key="delete_pdf_path",
+    )
+    confirm = st.checkbox(
+        "I understand this will delete the stored PDF and the domains built from it.",
+        key="delete_pdf_confirm",
+    )
+    if st.button("Delete PDF", type="secondary", disabled=not confirm):
+        pdf_id = options.get(selection)
+        if not pdf_id:
+            st.warning("Invalid PDF selection.")
             return
-        options = {row["file_path"]: row["pdf_id"] for row in pdfs}
-        selection = st.selectbox(
-            "Select PDF to delete",
-            options=list(options.keys()),
-            key="delete_pdf_path",
-        )
-        confirm = st.checkbox(
-            "I understand this will delete the stored PDF and reset derived data.",
-            key="delete_pdf_confirm",
-        )
-        if st.button("Delete PDF", type="secondary", disabled=not confirm):
-            pdf_id = options.get(selection)
-            if not pdf_id:
-                st.warning("Invalid PDF selection.")
+        existing = get_pdf_by_path(conn, selection)
+        if existing:
+            pdf_id = existing["pdf_id"]
+        with pipeline_lock(config.db_path) as acquired:
+            if not acquired:
+                st.warning("A pipeline run is in progress; try again later.")
                 return
-            existing = get_pdf_by_path(conn, selection)
-            if existing:
-                pdf_id = existing["pdf_id"]
-            delete_content_blocks_for_pdf(conn, pdf_id)
             delete_pdf(conn, pdf_id)
-            clear_derived_tables(conn)
             _remove_pdf_file(selection, config.pdf_storage_dir)
-            stored_pdfs, processed_pdfs = load_pdf_lists(config.db_path)
-            st.session_state["stored_pdfs"] = stored_pdfs
-            st.session_state["processed_pdfs"] = processed_pdfs
-            st.session_state["domain_list"] = load_domain_list(config.db_path)
-            st.success("PDF deleted. Derived data reset.")
-    finally:
-        conn.close()
+        stored_pdfs, processed_pdfs = load_pdf_lists(config.db_path)
+        st.session_state["stored_pdfs"] = stored_pdfs
+        st.session_state["processed_pdfs"] = processed_pdfs
+        st.session_state["domain_list"] = load_domain_list(config.db_path)
+        st.success("PDF deleted. Run the pipeline to re-cluster the affected domains.")
 
 
 def _remove_pdf_file(file_path: str, storage_dir: str) -> None:
@@ -106,44 +120,15 @@ def _remove_pdf_file(file_path: str, storage_dir: str) -> None:
     except Exception:
         pass
 
-def _safe_filename(name: str) -> str:
-    cleaned = []
-    for ch in name:
-        if ch.isascii() and (ch.isalnum() or ch in {".", "_", "-"}):
-            cleaned.append(ch)
-        else:
-            cleaned.append("_")
-    return "".join(cleaned).strip("._") or "upload.pdf"
-
-
 def _persist_uploads(db_path: str, storage_dir: str) -> list[str]:
     uploaded = st.session_state.get("uploaded_pdfs") or []
     if not uploaded:
         return []
 
-    Path(storage_dir).mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(db_path)
-    try:
-        create_schema(conn)
-        stored_paths = []
-        for file in uploaded:
-            data = file.getvalue()
-            checksum = hashlib.sha256(data).hexdigest()
-            existing = get_pdf_by_checksum(conn, checksum)
-            if existing:
-                stored_paths.append(existing["file_path"])
-                continue
-            safe_name = _safe_filename(file.name)
-            target = Path(storage_dir) / f"{checksum}_{safe_name}"
-            if not target.exists():
-                target.write_bytes(data)
-            pdf_id = f"pdf_{checksum}"
-            ingested_at = datetime.now(timezone.utc).isoformat()
-            insert_pdf(conn, pdf_id, str(target), checksum, ingested_at)
-            stored_paths.append(str(target))
-        return stored_paths
-    finally:
-        conn.close()
+    conn = get_connection(db_path)
+    return store_pdf_streams(
+        conn, [(file, file.name) for file in uploaded], Path(storage_dir)
+    )
 
 
 def render_parameters(config) -> None:
@@ -194,87 +179,81 @@ def render_parameters(config) -> None:
         key="preferred_display_language",
     )
 
-    run_in_progress = st.session_state.get("run_in_progress", False)
-    if st.button("Start RAG", type="primary", disabled=run_in_progress):
-        st.session_state["run_in_progress"] = True
-        try:
-            _persist_uploads(config.db_path, config.pdf_storage_dir)
-            stored_pdfs, processed_pdfs = load_pdf_lists(config.db_path)
-            if not stored_pdfs:
-                st.warning(
-                    "No PDFs available. Please upload at least one PDF to run the pipeline."
-                )
-                return
-            azure_endpoint = getenv("AZURE_OPENAI_ENDPOINT")
-            azure_api_key = getenv("AZURE_OPENAI_API_KEY")
-            azure_ad_token = getenv("AZURE_OPENAI_AD_TOKEN")
-            if not azure_endpoint or (not azure_api_key and not azure_ad_token):
-                st.error(
-                    "Missing Azure OpenAI credentials. Set AZURE_OPENAI_ENDPOINT and "
-                    "AZURE_OPENAI_API_KEY (or AZURE_OPENAI_AD_TOKEN) before running."
-                )
-                return
-            st.session_state["stored_pdfs"] = stored_pdfs
-            st.session_state["processed_pdfs"] = processed_pdfs
-            progress = st.progress(0)
-            status = st.empty()
-            log_area = st.empty()
-            log_lines: list[str] = []
-
-            def report(message: str, pct: float) -> None:
-                status.text(message)
-                progress.progress(min(max(pct, 0.0), 1.0))
-                log_lines.append(message)
-                log_area.text_area(
-                    "Pipeline log",
-                    value="\n".join(log_lines[-200:]),
-                    height=200,
-                )
+    conn = get_connection(config.db_path)
+    fail_stale_jobs(conn, datetime.now(timezone.utc), JOB_STALE_SECONDS)
+    active = get_active_job(conn, PIPELINE_JOB_KIND)
+    if st.button("Start RAG", type="primary", disabled=active is not None):
+        _persist_uploads(config.db_path, config.pdf_storage_dir)
+        stored_pdfs, processed_pdfs = load_pdf_lists(config.db_path)
+        if not stored_pdfs:
+            st.warning(
+                "No PDFs available. Please upload at least one PDF to run the pipeline."
+            )
+            return
+        azure_endpoint = getenv("AZURE_OPENAI_ENDPOINT")
+        azure_api_key = getenv("AZURE_OPENAI_API_KEY")
+        azure_ad_token = getenv("AZURE_OPENAI_AD_TOKEN")
+        if not azure_endpoint or (not azure_api_key and not azure_ad_token):
+            st.error(
+                "Missing Azure OpenAI credentials. Set AZURE_OPENAI_ENDPOINT and "
+                "AZURE_OPENAI_API_KEY (or AZURE_OPENAI_AD_TOKEN) before running."
+            )
+            return
+        st.session_state["stored_pdfs"] = stored_pdfs
+        st.session_state["processed_pdfs"] = processed_pdfs
+        params = {
+            field: st.session_state.get(field, getattr(config, field))
+            for field in _RUN_PARAMETERS
+        }
+        job_id = submit_pipeline_job(replace(config, **params), params=params)
+        if job_id is None:
+            st.warning("A pipeline run is already in progress.")
+        else:
+            st.session_state["watched_job_id"] = job_id
+    render_pipeline_job(config.db_path)
 
-            with st.spinner("Running pipeline..."):
-                updated_config = replace(
-                    config,
-                    embedding_model=st.session_state.get(
-                        "embedding_model", config.embedding_model
-                    ),
-                    merge_threshold_name_only=st.session_state.get(
-                        "merge_threshold_name_only",
-                        config.merge_threshold_name_only,
-                    ),
-                    review_threshold_name_only=st.session_state.get(
-                        "review_threshold_name_only",
-                        config.review_threshold_name_only,
-                    ),
-                    merge_threshold_name_plus_summary=st.session_state.get(
-                        "merge_threshold_name_plus_summary",
-                        config.merge_threshold_name_plus_summary,
-                    ),
-                    review_threshold_name_plus_summary=st.session_state.get(
-                        "review_threshold_name_plus_summary",
-                        config.review_threshold_name_plus_summary,
-                    ),
-                    preferred_display_language=st.session_state.get(
-                        "preferred_display_language",
-                        config.preferred_display_language,
-                    ),
-                )
-                try:
-                    success = run_pipeline(updated_config, progress_cb=report)
-                except Exception as exc:
-                    st.error("Pipeline failed. Fix the issue and try again.")
-                    st.text_area(
-                        "Error details",
-                        value=str(exc),
-                        height=140,
-                    )
-                    return
-            if success:
-                st.success("Pipeline run completed.")
-                st.session_state["domain_list"] = load_domain_list(config.db_path)
-            else:
-                st.warning("No unprocessed PDFs available or no candidates found.")
-        finally:
-            st.session_state["run_in_progress"] = False
+
+def render_pipeline_job(db_path: str) -> None:
+    conn = get_connection(db_path, read_only=True)
+    jobs = list_recent_jobs(conn, PIPELINE_JOB_KIND, limit=1)
+    if not jobs:
+        return
+    active = jobs[0]["status"] in ACTIVE_JOB_STATUSES
+    poll = st.fragment(run_every=JOB_POLL_SECONDS if active else None)
+    poll(_render_job_progress)(db_path, jobs[0]["job_id"])
+
+
+def _render_job_progress(db_path: str, job_id: str) -> None:
+    conn = get_connection(db_path, read_only=True)
+    job = get_job(conn, job_id)
+    if job is None:
+        return
+    status = job["status"]
+    if status in ACTIVE_JOB_STATUSES:
+        st.session_state["watched_job_id"] = job_id
+        st.progress(job["progress"], text=job["stage"] or "Queued")
+        if job["cancel_requested"]:
+            st.caption("Cancelling after the current stage...")
+        elif st.button("Cancel run", key=f"cancel_{job_id}"):
+            request_job_cancel(get_connection(db_path), job_id)
+            st.rerun(scope="fragment")
+    elif status == "completed":
+        st.success("Pipeline run completed.")
+    elif status == "skipped":
+        st.warning("No unprocessed PDFs available or no candidates found.")
+    elif status == "busy":
+        st.warning("Another pipeline run is in progress. Try again once it finishes.")
+    elif status == "cancelled":
+        st.info("Pipeline run cancelled. Start it again to resume.")
+    else:
+        st.error("Pipeline failed. Fix the issue and start it again to resume.")
+        st.text_area("Error details", value=job["error"] or "", height=140, disabled=True)
+    if job["log_tail"]:
+        st.text_area("Pipeline log", value=job["log_tail"], height=200, disabled=True)
+    if status not in ACTIVE_JOB_STATUSES and st.session_state.get("watched_job_id") == job_id:
+        del st.session_state["watched_job_id"]
+        st.session_state["domain_list"] = load_domain_list(db_path)
+        st.rerun()
 
 
 def render_domain_list() -> None:
@@ -288,6 +267,30 @@ def render_domain_list() -> None:
         st.markdown(f"- {domain}")
 
 
+def render_search(db_path: str) -> None:
+    st.subheader("Search")
+    text = st.text_input("Search parsed PDFs and domain aliases", key="search_text")
+    if not text.strip():
+        return
+    if not Path(db_path).exists():
+        st.caption("No parsed PDFs yet.")
+        return
+    conn = get_connection(db_path, read_only=True)
+    aliases = search_domain_aliases(conn, text, limit=10)
+    blocks = search_content_blocks(conn, text)
+    if not aliases and not blocks:
+        st.caption("No matches.")
+        return
+    for alias in aliases:
+        st.markdown(
+            f"- Domain **{alias['display_name']}** ({alias['domain_id']}) via alias "
+            f"\"{alias['alias']}\""
+        )
+    for block in blocks:
+        location = block["section_path"] or f"page {(block['page_index'] or 0) + 1}"
+        st.markdown(f"- `{Path(block['file_path']).name}` · {location}: {block['snippet']}")
+
+
 def render_artifact_path(artifact_dir: str) -> None:
     st.subheader("Artifact Bundle")
     st.text(f"Bundle output directory (planned): {artifact_dir}")
@@ -295,77 +298,80 @@ def render_artifact_path(artifact_dir: str) -> None:
 
 def render_review_queue(db_path: str) -> None:
     st.subheader("Review Queue")
-    conn = sqlite3.connect(db_path)
-    try:
-        create_schema(conn)
-        pending = list_pending_reviews(conn)
-        if not pending:
-            st.caption("No pending review items.")
-            return
-        for item in pending:
-            candidate_a = get_candidate(conn, item["candidate_a_id"])
-            candidate_b = get_candidate(conn, item["candidate_b_id"])
-            name_a = candidate_a["candidate_name"] if candidate_a else item["candidate_a_id"]
-            name_b = candidate_b["candidate_name"] if candidate_b else item["candidate_b_id"]
-            st.markdown(
-                f"- **{name_a}** <-> **{name_b}** | similarity={item['similarity']:.3f} | reason={item['reason']}"
-            )
-            col1, col2 = st.columns(2)
-            with col1:
-                if st.button(
-                    "Accept",
-                    key=f"accept_{item['review_id']}",
-                ):
-                    resolve_review(
-                        conn,
-                        review_id=item["review_id"],
-                        status="accepted",
-                        resolved_at=datetime.now(timezone.utc).isoformat(),
-                    )
-                    st.rerun()
-            with col2:
-                if st.button(
-                    "Reject",
-                    key=f"reject_{item['review_id']}",
-                ):
-                    resolve_review(
-                        conn,
-                        review_id=item["review_id"],
-                        status="rejected",
-                        resolved_at=datetime.now(timezone.utc).isoformat(),
-                    )
-                    st.rerun()
-    finally:
-        conn.close()
+    conn = get_connection(db_path)
+    pending = list_pending_reviews(conn)
+    if not pending:
+        st.caption("No pending review items.")
+        return
+    for item in pending:
+        candidate_a = get_candidate(conn, item["candidate_a_id"])
+        candidate_b = get_candidate(conn, item["candidate_b_id"])
+        name_a = candidate_a["candidate_name"] if candidate_a else item["candidate_a_id"]
+        name_b = candidate_b["candidate_name"] if candidate_b else item["candidate_b_id"]
+        st.markdown(
+            f"- **{name_a}** <-> **{name_b}** | similarity={item['similarity']:.3f} | reason={item['reason']}"
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button(
+                "Accept",
+                key=f"accept_{item['review_id']}",
+            ):
+                resolve_review(
+                    conn,
+                    review_id=item["review_id"],
+                    status="accepted",
+                    resolved_at=datetime.now(timezone.utc).isoformat(),
+                )
+                st.rerun()
+        with col2:
+            if st.button(
+                "Reject",
+                key=f"reject_{item['review_id']}",
+            ):
+                resolve_review(
+                    conn,
+                    review_id=item["review_id"],
+                    status="rejected",
+                    resolved_at=datetime.now(timezone.utc).isoformat(),
+                )
+                st.rerun()
 
 
 def render_token_usage(db_path: str) -> None:
     st.subheader("Token Usage")
-    conn = sqlite3.connect(db_path)
-    try:
-        create_schema(conn)
-        latest = get_latest_run_usage(conn)
-        totals = get_total_usage(conn)
-        if not latest and not totals:
-            st.caption("No token usage recorded yet.")
-            return
-        col1, col2 = st.columns(2)
-        with col1:
-            st.markdown("Latest run")
-            if latest and latest.tokens_by_model:
-                for model_name, total in latest.tokens_by_model.items():
-                    st.write(f"{model_name}: {total}")
-            else:
-                st.caption("No run usage available.")
-        with col2:
-            st.markdown("Cumulative total")
-            if totals:
-                for model_name, total in totals.items():
-                    st.write(f"{model_name}: {total}")
-            else:
-                st.caption("No totals available.")
-    finally:
-        conn.close()
+    conn = get_connection(db_path, read_only=True)
+    latest = get_latest_run_usage(conn)
+    totals = get_total_usage(conn)
+    total_cache = get_total_cache_usage(conn)
+    if not latest and not totals:
+        st.caption("No token usage recorded yet.")
+        return
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("Latest run")
+        if latest and latest.tokens_by_model:
+            for model_name, total in latest.tokens_by_model.items():
+                st.write(f"{model_name}: {total}")
+                _caption_cache_usage(*latest.cache_by_model.get(model_name, (0, 0)))
+        else:
+            st.caption("No run usage available.")
+    with col2:
+        st.markdown("Cumulative total")
+        if totals:
+            for model_name, total in totals.items():
+                st.write(f"{model_name}: {total}")
+                _caption_cache_usage(*total_cache.get(model_name, (0, 0)))
+        else:
+            st.caption("No totals available.")
+
+
+def _caption_cache_usage(cache_hits: int, cache_misses: int) -> None:
+    rate = cache_hit_rate(cache_hits, cache_misses)
+    if rate is not None:
+        st.caption(
+            f"Embedding cache: {cache_hits}/{cache_hits + cache_misses} hits ({rate:.0%})"
+        )
 
 
 def main() -> None:
@@ -382,6 +388,7 @@ def main() -> None:
     render_parameters(config)
     render_delete_pdf(config)
     render_domain_list()
+    render_search(config.db_path)
     render_review_queue(config.db_path)
     render_token_usage(config.db_path)
     render_artifact_path(config.artifact_dir)
@@ -1,12 +1,11 @@
 from __future__ import annotations
 
-import sqlite3
 from pathlib import Path
 from typing import List
 
-from src.db.domain_repo import list_domains
+from src.db.connection import get_connection
+from src.db.domain_repo import iter_domains
 from src.db.repo import list_pdfs, list_processed_pdfs
-from src.db.schema import create_schema
 
 
 def load_domain_list(db_path: str) -> List[str]:
@@ -14,13 +13,8 @@ def load_domain_list(db_path: str) -> List[str]:
     if not path.exists():
         return []
 
-    conn = sqlite3.connect(path)
-    try:
-        create_schema(conn)
-        domains = list_domains(conn)
-        return [f"{d['domain_id']}: {d['display_name']}" for d in domains]
-    finally:
-        conn.close()
+    conn = get_connection(db_path, read_only=True)
+    return list(iter_domains(conn, row_factory=lambda row: f"{row[0]}: {row[1]}"))
 
 
 def load_pdf_lists(db_path: str) -> tuple[List[str], List[str]]:
@@ -28,13 +22,9 @@ def load_pdf_lists(db_path: str) -> tuple[List[str], List[str]]:
     if not path.exists():
         return ([], [])
 
-    conn = sqlite3.connect(path)
-    try:
-        create_schema(conn)
-        stored = list_pdfs(conn)
-        processed = list_processed_pdfs(conn)
-        stored_list = [row["file_path"] for row in stored]
-        processed_list = [row["file_path"] for row in processed]
-        return (stored_list, processed_list)
-    finally:
-        conn.close()
+    conn = get_connection(db_path, read_only=True)
+    stored = list_pdfs(conn)
+    processed = list_processed_pdfs(conn)
+    stored_list = [row["file_path"] for row in stored]
+    processed_list = [row["file_path"] for row in processed]
+    return (stored_list, processed_list)
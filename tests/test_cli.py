@@ -0,0 +1,27 @@
+import pytest
+
+from src.cli.app import run_cli
+
+
+@pytest.mark.parametrize("workers", ["many", "0", "-2"])
+def test_ingest_rejects_invalid_worker_counts(tmp_path, capsys, workers) -> None:
+    assert run_cli(["ingest", str(tmp_path), "--workers", workers]) == 1
+    assert "Usage:" in capsys.readouterr().out
+
+
+def test_export_reports_invalid_chunk_rows(tmp_path, capsys) -> None:
+    assert run_cli(["export", str(tmp_path), "--chunk-rows", "lots"]) == 1
+    assert "Invalid --chunk-rows: lots" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize(
+    ("flag", "value"), [("--older-than-days", "week"), ("--max-cache-mb", "inf")]
+)
+def test_db_maintain_reports_invalid_numbers(capsys, flag, value) -> None:
+    assert run_cli(["db", "maintain", flag, value]) == 1
+    assert f"Invalid {flag}: {value}" in capsys.readouterr().out
+
+
+def test_run_rejects_unknown_flags(capsys) -> None:
+    assert run_cli(["run", "--resum"]) == 1
+    assert "Unexpected argument: --resum" in capsys.readouterr().out
@@ -0,0 +1,144 @@
+import numpy as np
+import pytest
+
+from src.db.candidate_repo import insert_candidates
+from src.db.connection import connect
+from src.db.content_repo import insert_content_blocks
+from src.db.domain_repo import (
+    insert_block_domain_maps,
+    insert_domain_aliases,
+    insert_domain_sources,
+    insert_domains,
+)
+from src.db.embedding_repo import (
+    insert_candidate_embeddings,
+    insert_domain_embeddings,
+    load_candidate_embedding_matrix,
+)
+from src.db.repo import insert_pdf
+
+pytest.importorskip("pyarrow")
+
+from src.pipeline.columnar import export_tables, import_tables, load_embedding_matrix
+
+
+def _seed(db_path: str) -> None:
+    conn = connect(db_path)
+    insert_pdf(conn, "pdf1", "a.pdf", "sum", "2024-01-01T00:00:00Z")
+    insert_content_blocks(
+        conn,
+        [
+            {
+                "block_id": f"b{idx}",
+                "pdf_id": "pdf1",
+                "section_path": "Intro",
+                "heading_level": 1,
+                "block_type": "heading",
+                "text": f"text {idx}",
+                "page_index": 0,
+                "position_index": idx,
+            }
+            for idx in range(5)
+        ],
+    )
+    insert_candidates(
+        conn,
+        [
+            {
+                "candidate_id": f"c{idx}",
+                "candidate_name": f"name {idx}",
+                "normalized_name": f"name {idx}",
+                "source_pdf_id": "pdf1",
+                "source_block_id": f"b{idx}",
+                "heading_level": 1,
+                "representative_text": "text",
+            }
+            for idx in range(5)
+        ],
+    )
+    insert_candidate_embeddings(
+        conn,
+        [(f"c{idx}", "model-a", [float(idx), 1.0, 2.0], 3, "exact") for idx in range(5)],
+        dtype="float16",
+    )
+    insert_domains(conn, [("domain_001", "Intro", "2024-01-01T00:00:00Z")])
+    insert_domain_aliases(conn, [("domain_001", "name 0", "pdf1", 1)])
+    insert_domain_sources(conn, [("domain_001", "pdf1")])
+    insert_block_domain_maps(conn, [(f"b{idx}", "domain_001") for idx in range(2)])
+    insert_domain_embeddings(conn, [("domain_001", "model-a", [1.0, 0.0, 0.0], 3, "exact")])
+    conn.close()
+
+
+def test_export_writes_chunked_parquet_with_fixed_size_vectors(tmp_path) -> None:
+    import pyarrow.parquet as pq
+
+    db_path = str(tmp_path / "app.db")
+    _seed(db_path)
+
+    counts = export_tables(db_path, tmp_path / "out", chunk_rows=2)
+
+    assert counts == {
+        "pdfs": 1,
+        "content_blocks": 5,
+        "domain_candidates": 5,
+        "candidate_embeddings": 5,
+        "domains": 1,
+        "domain_aliases": 1,
+        "domain_sources": 1,
+        "block_domain_map": 2,
+        "domain_embeddings": 1,
+    }
+    conn = connect(db_path)
+    conn.execute("DELETE FROM domains;")
+    conn.commit()
+    conn.close()
+    assert export_tables(db_path, tmp_path / "out", tables=["domains"]) == {"domains": 0}
+    assert not (tmp_path / "out" / "domains.parquet").exists()
+    assert pq.ParquetFile(tmp_path / "out" / "content_blocks.parquet").num_row_groups == 3
+    schema = pq.read_schema(tmp_path / "out" / "candidate_embeddings.parquet")
+    assert schema.field("vector").type.list_size == 3
+
+    ids, matrix = load_embedding_matrix(tmp_path / "out" / "candidate_embeddings.parquet")
+    assert ids == ["c0", "c1", "c2", "c3", "c4"]
+    assert matrix.dtype == np.float32
+    np.testing.assert_array_equal(matrix[:, 0], np.arange(5, dtype=np.float32))
+
+
+def test_import_round_trips_exported_tables_and_can_be_repeated(tmp_path) -> None:
+    source = str(tmp_path / "a.db")
+    _seed(source)
+    exported = export_tables(source, tmp_path / "out", chunk_rows=2)
+
+    conn = connect(str(tmp_path / "b.db"))
+    assert import_tables(conn, tmp_path / "out", chunk_rows=2) == exported
+    assert import_tables(conn, tmp_path / "out", chunk_rows=2) == exported
+
+    ids, matrix = load_candidate_embedding_matrix(conn)
+    assert ids == ["c0", "c1", "c2", "c3", "c4"]
+    np.testing.assert_array_equal(matrix[:, 0], np.arange(5, dtype=np.float32))
+    rows = conn.execute("SELECT block_id, position_index FROM content_blocks;").fetchall()
+    assert sorted(rows) == [(f"b{idx}", idx) for idx in range(5)]
+    for table, count in exported.items():
+        assert conn.execute(f"SELECT COUNT(*) FROM {table};").fetchone()[0] == count
+    assert conn.execute(
+        "SELECT COUNT(*) FROM content_blocks_fts WHERE content_blocks_fts MATCH 'text';"
+    ).fetchone()[0] == 5
+    conn.close()
+
+
+def test_import_names_the_failing_table_and_rolls_back(tmp_path) -> None:
+    source = str(tmp_path / "a.db")
+    _seed(source)
+    export_tables(source, tmp_path / "out")
+    (tmp_path / "out" / "domain_candidates.parquet").write_bytes(b"not parquet")
+
+    conn = connect(str(tmp_path / "b.db"))
+    with pytest.raises(RuntimeError, match="domain_candidates"):
+        import_tables(conn, tmp_path / "out")
+    assert conn.execute("SELECT COUNT(*) FROM pdfs;").fetchone()[0] == 0
+    conn.close()
+
+
+def test_export_rejects_unknown_tables(tmp_path) -> None:
+    with pytest.raises(ValueError):
+        export_tables(str(tmp_path / "app.db"), tmp_path / "out", tables=["review_queue"])
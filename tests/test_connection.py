@@ -0,0 +1,116 @@
+import sqlite3
+import threading
+
+import pytest
+
+from src.db.candidate_repo import insert_candidate
+from src.db.connection import (
+    IN_CLAUSE_CHUNK,
+    connect,
+    execute_in_chunks,
+    get_connection,
+    iter_in_chunks,
+    query,
+)
+from src.db.content_repo import insert_content_blocks
+from src.db.repo import clear_derived_tables, insert_pdf, list_pdfs
+from src.db.review_repo import insert_review_item
+from src.db.transaction import unit_of_work
+
+
+def test_connect_applies_tuning_and_reader_is_read_only(tmp_path) -> None:
+    db_path = str(tmp_path / "app.db")
+    writer = connect(db_path)
+    assert writer.execute("PRAGMA journal_mode;").fetchone()[0] == "wal"
+    assert writer.execute("PRAGMA synchronous;").fetchone()[0] == 1
+    assert writer.execute("PRAGMA foreign_keys;").fetchone()[0] == 1
+    insert_pdf(writer, "pdf1", "a.pdf", "abc", "t0")
+
+    reader = connect(db_path, read_only=True)
+    assert [row["pdf_id"] for row in list_pdfs(reader)] == ["pdf1"]
+    assert reader.row_factory is None
+    with pytest.raises(sqlite3.OperationalError):
+        insert_pdf(reader, "pdf2", "b.pdf", "def", "t0")
+
+
+def test_get_connection_pools_per_thread(tmp_path) -> None:
+    db_path = str(tmp_path / "app.db")
+    main = get_connection(db_path)
+    assert get_connection(db_path) is main
+    other = []
+    thread = threading.Thread(target=lambda: other.append(get_connection(db_path)))
+    thread.start()
+    thread.join()
+    assert other[0] is not main
+    assert query(main, "SELECT COUNT(*) AS n FROM pdfs;").fetchone()["n"] == 0
+
+
+def test_clear_derived_tables_with_foreign_keys_and_review_history(tmp_path) -> None:
+    conn = connect(str(tmp_path / "app.db"))
+    insert_pdf(conn, "pdf1", "a.pdf", "abc", "t0")
+    insert_content_blocks(
+        conn,
+        [
+            {
+                "block_id": "b1",
+                "pdf_id": "pdf1",
+                "section_path": "",
+                "heading_level": 1,
+                "block_type": "heading",
+                "text": "Billing",
+                "page_index": 0,
+                "position_index": 0,
+            }
+        ],
+    )
+    for candidate_id in ("c1", "c2"):
+        insert_candidate(conn, candidate_id, "Billing", "billing", "pdf1", "b1", 1, "text")
+    insert_review_item(conn, "r1", "c1", "c2", 0.9, "ambiguous", "rejected", "t0")
+
+    clear_derived_tables(conn)
+
+    assert conn.execute("SELECT COUNT(*) FROM domain_candidates;").fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM review_queue;").fetchone()[0] == 1
+    assert conn.execute("PRAGMA foreign_keys;").fetchone()[0] == 1
+
+
+def test_clear_derived_tables_refuses_to_commit_an_open_transaction(tmp_path) -> None:
+    conn = connect(str(tmp_path / "app.db"))
+
+    with pytest.raises(RuntimeError):
+        with unit_of_work(conn):
+            insert_pdf(conn, "pdf1", "a.pdf", "abc", "t0")
+            clear_derived_tables(conn)
+
+    assert list_pdfs(conn) == []
+    assert conn.execute("PRAGMA foreign_keys;").fetchone()[0] == 1
+
+
+def test_in_chunks_helpers_cover_keys_past_one_chunk(tmp_path) -> None:
+    conn = connect(str(tmp_path / "app.db"))
+    count = IN_CLAUSE_CHUNK * 2 + 1
+    conn.executemany(
+        "INSERT INTO pdfs(pdf_id, file_path, checksum, ingested_at) VALUES(?, ?, ?, ?);",
+        [(f"pdf{idx}", f"{idx}.pdf", f"sum{idx}", "t0") for idx in range(count)],
+    )
+    keys = [f"pdf{idx}" for idx in range(count)] + ["pdf0", "missing"]
+
+    rows = iter_in_chunks(
+        conn,
+        "SELECT pdf_id FROM pdfs WHERE file_path != ? AND pdf_id IN ({placeholders});",
+        keys,
+        ("1.pdf",),
+    )
+    assert sorted(row["pdf_id"] for row in rows) == sorted(
+        f"pdf{idx}" for idx in range(count) if idx != 1
+    )
+
+    deleted = execute_in_chunks(
+        conn,
+        "DELETE FROM pdfs WHERE pdf_id IN ({placeholders}) OR checksum IN ({placeholders});",
+        [f"pdf{idx}" for idx in range(count - 1)],
+        repeat=2,
+    )
+    assert deleted == count - 1
+    assert conn.execute("SELECT pdf_id FROM pdfs;").fetchall() == [(f"pdf{count - 1}",)]
+    conn.close()
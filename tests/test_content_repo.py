@@ -40,3 +40,25 @@ def test_content_block_round_trip() -> None:
     assert len(stored) == 2
     clear_content_blocks(conn)
     assert has_content_blocks_for_pdf(conn, "pdf1") is False
+
+
+def test_insert_content_blocks_streams_in_batches() -> None:
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+
+    def blocks():
+        for idx in range(5):
+            yield {
+                "block_id": f"b{idx}",
+                "pdf_id": "pdf1",
+                "section_path": "",
+                "heading_level": 0,
+                "block_type": "paragraph",
+                "text": f"Body {idx}",
+                "page_index": 0,
+                "position_index": idx,
+            }
+
+    assert insert_content_blocks(conn, blocks(), batch_size=2) == 5
+    stored = list_content_blocks_by_pdf(conn, "pdf1")
+    assert [row["position_index"] for row in stored] == [0, 1, 2, 3, 4]
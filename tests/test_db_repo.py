@@ -1,7 +1,13 @@
 import sqlite3
 from datetime import datetime, timezone
 
-from src.db.repo import get_pdf_by_checksum, insert_pdf, list_pdfs
+from src.db.repo import (
+    get_pdf_by_checksum,
+    get_pdfs_by_checksums,
+    insert_pdf,
+    insert_pdfs,
+    list_pdfs,
+)
 from src.db.schema import create_schema
 
 
@@ -28,3 +34,19 @@ def test_get_pdf_by_checksum() -> None:
     assert found is not None
     assert found["pdf_id"] == "pdf1"
     assert missing is None
+
+
+def test_insert_pdfs_and_bulk_checksum_lookup() -> None:
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+    now = datetime.now(timezone.utc).isoformat()
+    insert_pdfs(
+        conn,
+        [
+            {"pdf_id": "pdf1", "file_path": "a.pdf", "checksum": "abc", "ingested_at": now},
+            {"pdf_id": "pdf2", "file_path": "b.pdf", "checksum": "def", "ingested_at": now},
+        ],
+    )
+    found = get_pdfs_by_checksums(conn, ["abc", "def", "missing", "abc"])
+    assert sorted(found) == ["abc", "def"]
+    assert found["def"]["pdf_id"] == "pdf2"
@@ -1,9 +1,25 @@
 ﻿import sqlite3
 from datetime import datetime, timezone
 
+from src.db.candidate_repo import (
+    insert_candidate,
+    list_candidates,
+    list_unassigned_candidate_ids,
+)
+from src.db.connection import connect
 from src.db.content_repo import delete_content_blocks_for_pdf, insert_content_blocks
+from src.db.domain_repo import (
+    insert_block_domain_maps,
+    insert_domain_sources,
+    insert_domains,
+    list_domain_sources,
+    list_domains,
+)
+from src.db.embedding_repo import insert_domain_embedding, list_domain_embeddings
 from src.db.repo import clear_derived_tables, delete_pdf, insert_pdf, list_pdfs
+from src.db.review_repo import insert_review_item
 from src.db.schema import create_schema
+from src.db.similarity_repo import insert_similarity_pairs, list_similarity_pairs
 
 
 def test_delete_pdf_and_clear_blocks() -> None:
@@ -31,3 +47,62 @@ def test_delete_pdf_and_clear_blocks() -> None:
     clear_derived_tables(conn)
     rows = list_pdfs(conn)
     assert rows == []
+
+
+def test_delete_pdf_removes_only_domains_that_touch_it(tmp_path) -> None:
+    conn = connect(str(tmp_path / "app.db"))
+    for pdf_id in ("pdf1", "pdf2"):
+        insert_pdf(conn, pdf_id, f"{pdf_id}.pdf", pdf_id, "t0")
+    blocks = [("pdf1_b0", "pdf1"), ("pdf2_b0", "pdf2"), ("pdf2_b1", "pdf2")]
+    insert_content_blocks(
+        conn,
+        [
+            {
+                "block_id": block_id,
+                "pdf_id": pdf_id,
+                "section_path": "",
+                "heading_level": 1,
+                "block_type": "heading",
+                "text": block_id,
+                "page_index": 0,
+                "position_index": idx,
+            }
+            for idx, (block_id, pdf_id) in enumerate(blocks)
+        ],
+    )
+    for block_id, pdf_id in blocks:
+        insert_candidate(conn, block_id, block_id, block_id, pdf_id, block_id, 1, block_id)
+    insert_similarity_pairs(
+        conn,
+        [
+            ("pdf1_b0", "pdf2_b0", 0.95, "name_only"),
+            ("pdf1_b0", "pdf2_b0", 0.93, "name_plus_summary"),
+            ("pdf2_b0", "pdf2_b1", 0.88, "name_only"),
+        ],
+    )
+    insert_domains(conn, [("domain_001", "Shared", "t0"), ("domain_002", "Own", "t0")])
+    insert_domain_sources(
+        conn, [("domain_001", "pdf1"), ("domain_001", "pdf2"), ("domain_002", "pdf2")]
+    )
+    insert_block_domain_maps(
+        conn,
+        [("pdf1_b0", "domain_001"), ("pdf2_b0", "domain_001"), ("pdf2_b1", "domain_002")],
+    )
+    for domain_id in ("domain_001", "domain_002"):
+        insert_domain_embedding(conn, domain_id, "m1", [1.0, 0.0], 2, "exact")
+    insert_review_item(conn, "r1", "pdf2_b0", "pdf1_b0", 0.9, "band", "rejected", "t0")
+    insert_review_item(conn, "r2", "pdf1_b0", "pdf2_b1", 0.9, "band", "pending", "t0")
+
+    delete_pdf(conn, "pdf1")
+
+    assert [row["pdf_id"] for row in list_pdfs(conn)] == ["pdf2"]
+    assert [row["candidate_id"] for row in list_candidates(conn)] == ["pdf2_b0", "pdf2_b1"]
+    assert [(row["candidate_a_id"], row["mode"]) for row in list_similarity_pairs(conn)] == [
+        ("pdf2_b0", "name_only")
+    ]
+    assert [row["domain_id"] for row in list_domains(conn)] == ["domain_002"]
+    assert [row["domain_id"] for row in list_domain_embeddings(conn)] == ["domain_002"]
+    assert len(list_domain_sources(conn)) == 1
+    assert list_unassigned_candidate_ids(conn) == ["pdf2_b0"]
+    statuses = conn.execute("SELECT review_id, status FROM review_queue;").fetchall()
+    assert statuses == [("r1", "rejected")]
@@ -0,0 +1,154 @@
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.db.embedding_cache_repo import get_cached_embeddings, set_cached_embeddings
+from src.db.repo import clear_derived_tables
+from src.db.schema import create_schema
+from src.pipeline.embedding import AzureOpenAIEmbedder, plan_batches
+
+
+class _FakeEmbeddings:
+    def __init__(self) -> None:
+        self.inputs = []
+
+    def create(self, model, input):
+        self.inputs.append(list(input))
+        return SimpleNamespace(
+            data=[SimpleNamespace(embedding=[float(len(text)), 1.0]) for text in input],
+            usage=SimpleNamespace(total_tokens=len(input)),
+        )
+
+
+class _SlowEmbeddings(_FakeEmbeddings):
+    def __init__(self) -> None:
+        super().__init__()
+        self.active = 0
+        self.peak = 0
+        self._guard = threading.Lock()
+
+    def create(self, model, input):
+        with self._guard:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.02 if input[0] == "t0" else 0.005)
+        with self._guard:
+            self.active -= 1
+        return super().create(model, input)
+
+
+def _embedder(embeddings=None, **options) -> AzureOpenAIEmbedder:
+    client = SimpleNamespace(embeddings=embeddings or _FakeEmbeddings())
+    return AzureOpenAIEmbedder(
+        model_name="m1",
+        max_tokens=100,
+        approx_enabled=True,
+        client=client,
+        dimensions=2,
+        **options,
+    )
+
+
+def test_embedding_cache_is_keyed_by_model_and_dimensions() -> None:
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+
+    set_cached_embeddings(conn, [("h1", [0.5, 0.25])], "m1", 2, "t0")
+
+    assert get_cached_embeddings(conn, ["h1", "h2"], "m1", 2) == {"h1": [0.5, 0.25]}
+    assert get_cached_embeddings(conn, ["h1"], "m1", 3) == {}
+    assert get_cached_embeddings(conn, ["h1"], "m2", 2) == {}
+
+
+def test_embed_texts_only_requests_cache_misses() -> None:
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+    embedder = _embedder()
+
+    first = embedder.embed_texts(conn, ["alpha", "beta", "alpha"])
+    assert embedder.client.embeddings.inputs == [["alpha", "beta"]]
+    assert (first.cache_hits, first.cache_misses) == (1, 2)
+    assert first.total_tokens == 2
+
+    clear_derived_tables(conn)
+    second = embedder.embed_texts(conn, ["beta", "gamma", "alpha"])
+
+    assert embedder.client.embeddings.inputs == [["alpha", "beta"], ["gamma"]]
+    assert (second.cache_hits, second.cache_misses) == (2, 1)
+    assert second.total_tokens == 1
+    assert second.vectors == [
+        pytest.approx([4.0, 1.0]),
+        pytest.approx([5.0, 1.0]),
+        pytest.approx([5.0, 1.0]),
+    ]
+
+
+@pytest.mark.parametrize("concurrency", [1, 3])
+def test_embed_texts_bounds_in_flight_batches_and_keeps_order(concurrency) -> None:
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+    embeddings = _SlowEmbeddings()
+    embedder = _embedder(embeddings, concurrency=concurrency)
+    texts = [f"t{idx}" + "x" * idx for idx in range(10)]
+
+    result = embedder.embed_texts(conn, texts, batch_size=2)
+
+    assert embeddings.peak == concurrency
+    assert [vector[0] for vector in result.vectors] == [float(len(text)) for text in texts]
+    assert result.total_tokens == 10
+    assert result.request_count == 5
+
+
+def test_interrupted_embedding_resumes_from_the_cache() -> None:
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+    embeddings = _FakeEmbeddings()
+    create = embeddings.create
+
+    def fail_on_second_request(model, input):
+        if len(embeddings.inputs) == 1:
+            raise RuntimeError("rate limited")
+        return create(model, input)
+
+    embeddings.create = fail_on_second_request
+    texts = ["alpha", "beta", "gamma", "delta"]
+    with pytest.raises(RuntimeError):
+        _embedder(embeddings).embed_texts(conn, texts, batch_size=2)
+
+    embeddings.create = create
+    resumed = _embedder(embeddings).embed_texts(conn, texts, batch_size=2)
+
+    assert embeddings.inputs == [["alpha", "beta"], ["gamma", "delta"]]
+    assert (resumed.cache_hits, resumed.cache_misses) == (2, 2)
+    assert resumed.total_tokens == 2
+
+
+def test_plan_batches_packs_by_inputs_and_tokens_and_isolates_long_texts() -> None:
+    assert plan_batches([1, 1, 1, 1, 1], max_inputs=2, max_tokens=100) == [
+        (0, 2),
+        (2, 4),
+        (4, 5),
+    ]
+    assert plan_batches([40, 50, 20, 500, 10, 10], max_inputs=10, max_tokens=100) == [
+        (0, 2),
+        (2, 3),
+        (3, 4),
+        (4, 6),
+    ]
+    assert plan_batches([], max_inputs=4, max_tokens=100) == []
+
+
+def test_embed_texts_reports_requests_per_token_budget() -> None:
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+    embeddings = _FakeEmbeddings()
+    embedder = _embedder(embeddings, batch_max_tokens=1)
+
+    result = embedder.embed_texts(conn, ["alpha", "beta", "gamma"])
+
+    assert embeddings.inputs == [["alpha"], ["beta"], ["gamma"]]
+    assert result.request_count == 3
+    assert result.request_tokens == result.token_counts
@@ -1,14 +1,23 @@
+import json
 import sqlite3
 
+import numpy as np
+import pytest
+
 from src.db.embedding_repo import (
     insert_candidate_embedding,
+    insert_candidate_embeddings,
     insert_domain_embedding,
+    insert_domain_embeddings,
     insert_candidate_embedding_vector,
     insert_domain_embedding_vector,
     list_candidate_embeddings,
     list_domain_embeddings,
+    load_candidate_embedding_matrix,
+    load_domain_embedding_matrix,
     parse_vector,
 )
+from src.db.migrations import MIGRATIONS, SCHEMA_VERSION, migrate
 from src.db.schema import create_schema
 
 
@@ -46,7 +55,7 @@ def test_domain_embedding_roundtrip() -> None:
     assert rows[0]["domain_id"] == "d1"
 
 
-def test_embedding_vector_helpers_serialize_json() -> None:
+def test_embedding_vector_helpers_store_float32_blobs() -> None:
     conn = sqlite3.connect(":memory:")
     create_schema(conn)
 
@@ -59,7 +68,10 @@ def test_embedding_vector_helpers_serialize_json() -> None:
         tokenization_mode="exact",
     )
     rows = list_candidate_embeddings(conn)
-    assert parse_vector(rows[0]["vector"]) == [0.1, 0.2]
+    assert isinstance(rows[0]["vector"], bytes)
+    assert rows[0]["dim"] == 2
+    assert rows[0]["dtype"] == "float32"
+    assert parse_vector(rows[0]["vector"]) == pytest.approx([0.1, 0.2])
 
 
 def test_insert_embedding_rejects_non_json() -> None:
@@ -78,3 +90,54 @@ def test_insert_embedding_rejects_non_json() -> None:
         assert False, "Expected ValueError"
     except ValueError:
         assert True
+
+
+def test_load_embedding_matrix_stacks_vectors_in_key_order() -> None:
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+
+    insert_candidate_embeddings(
+        conn,
+        [
+            ("c2", "m1", [0.0, 1.0, 2.0], 3, "exact"),
+            ("c1", "m1", np.array([3.0, 4.0, 5.0]), 3, "exact"),
+            ("c3", "m2", [9.0, 9.0, 9.0], 3, "exact"),
+        ],
+    )
+    ids, matrix = load_candidate_embedding_matrix(conn, "m1")
+
+    assert ids == ["c1", "c2"]
+    assert matrix.dtype == np.float32
+    assert matrix.tolist() == [[3.0, 4.0, 5.0], [0.0, 1.0, 2.0]]
+
+
+def test_load_embedding_matrix_widens_float16_and_rejects_mixed_dims() -> None:
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+
+    insert_domain_embeddings(conn, [("d1", "m1", [0.5, 0.25], 2, "exact")], dtype="float16")
+    ids, matrix = load_domain_embedding_matrix(conn)
+    assert ids == ["d1"]
+    assert matrix.dtype == np.float32
+    assert matrix.tolist() == [[0.5, 0.25]]
+
+    insert_domain_embeddings(conn, [("d2", "m1", [0.5, 0.25, 1.0], 3, "exact")])
+    with pytest.raises(ValueError):
+        load_domain_embedding_matrix(conn)
+
+
+def test_migration_converts_json_vectors_to_blobs() -> None:
+    conn = sqlite3.connect(":memory:")
+    MIGRATIONS[0](conn)
+    conn.execute("PRAGMA user_version = 1;")
+    conn.execute(
+        "INSERT INTO candidate_embeddings VALUES('c1', 'm1', ?, 2, 'exact');",
+        (json.dumps([0.5, -1.5]),),
+    )
+    conn.commit()
+
+    assert migrate(conn) == SCHEMA_VERSION
+    ids, matrix = load_candidate_embedding_matrix(conn)
+
+    assert ids == ["c1"]
+    assert matrix.tolist() == [[0.5, -1.5]]
@@ -0,0 +1,101 @@
+import sys
+from types import ModuleType, SimpleNamespace
+
+from src.pipeline import ingest
+
+
+def _install(monkeypatch, name: str, **attrs) -> None:
+    parts = name.split(".")
+    for idx in range(1, len(parts)):
+        parent = ".".join(parts[:idx])
+        if parent not in sys.modules:
+            monkeypatch.setitem(sys.modules, parent, ModuleType(parent))
+    module = ModuleType(name)
+    for key, value in attrs.items():
+        setattr(module, key, value)
+    monkeypatch.setitem(sys.modules, name, module)
+
+
+class _Reader:
+    calls = []
+
+    def _read_output_files(self, output_dir, file_stem, **kwargs):
+        self.calls.append((output_dir, file_stem, kwargs))
+        return [{"type": "text", "text": file_stem}], f"# {file_stem}"
+
+
+def test_mineru_models_load_once_and_stay_resident(tmp_path, monkeypatch) -> None:
+    loaded = []
+    parsed = []
+
+    class ModelSingleton:
+        def get_model(self, lang=None, formula_enable=None, table_enable=None):
+            loaded.append((lang, formula_enable, table_enable))
+
+    def do_parse(output_dir, names, pdf_bytes, langs, **kwargs):
+        parsed.append((names, pdf_bytes, kwargs))
+
+    _install(
+        monkeypatch, "mineru.backend.pipeline.pipeline_analyze", ModelSingleton=ModelSingleton
+    )
+    _install(monkeypatch, "mineru.cli.common", do_parse=do_parse)
+    _install(monkeypatch, "raganything.parser", MineruParser=_Reader)
+    monkeypatch.setattr(ingest, "_PARSERS", {})
+    monkeypatch.setattr(ingest, "_PENDING_WARMUP_SECONDS", {})
+    pdf = tmp_path / "a.pdf"
+    pdf.write_bytes(b"%PDF")
+
+    backend = ingest.load_parser("MinerU")
+    assert ingest.load_parser("mineru") is backend
+    assert loaded == [(None, True, True)]
+    assert ingest.take_warmup_seconds("mineru") >= 0.0
+    assert ingest.take_warmup_seconds("mineru") == 0.0
+
+    for page_range in (None, (2, 3)):
+        parsed_document = ingest.parse_document(
+            str(pdf), str(tmp_path / "out"), "mineru", "auto", page_range
+        )
+
+    assert loaded == [(None, True, True)]
+    assert [(kwargs["start_page_id"], kwargs["end_page_id"]) for *_, kwargs in parsed] == [
+        (0, None),
+        (2, 3),
+    ]
+    assert parsed[0][:2] == (["a"], [b"%PDF"])
+    assert parsed_document.markdown == "# a"
+    assert _Reader.calls[-1] == (tmp_path / "out", "a", {"method": "auto"})
+
+
+def test_docling_converter_is_built_once_and_reused(tmp_path, monkeypatch) -> None:
+    converters = []
+
+    class DocumentConverter:
+        def __init__(self) -> None:
+            self.initialized = []
+            self.converted = []
+            converters.append(self)
+
+        def initialize_pipeline(self, input_format) -> None:
+            self.initialized.append(input_format)
+
+        def convert(self, path):
+            self.converted.append(path)
+            save = lambda target: target.write_text("{}")
+            return SimpleNamespace(
+                document=SimpleNamespace(save_as_json=save, save_as_markdown=save)
+            )
+
+    _install(monkeypatch, "docling.datamodel.base_models", InputFormat=SimpleNamespace(PDF="pdf"))
+    _install(monkeypatch, "docling.document_converter", DocumentConverter=DocumentConverter)
+    _install(monkeypatch, "raganything.parser", DoclingParser=_Reader)
+    monkeypatch.setattr(ingest, "_PARSERS", {})
+    monkeypatch.setattr(ingest, "_PENDING_WARMUP_SECONDS", {})
+
+    for name in ("a", "b"):
+        ingest.parse_document(str(tmp_path / f"{name}.pdf"), str(tmp_path), "docling", "auto")
+
+    assert len(converters) == 1
+    assert converters[0].initialized == ["pdf"]
+    assert converters[0].converted == [tmp_path / "a.pdf", tmp_path / "b.pdf"]
+    assert (tmp_path / "b" / "docling" / "b.json").exists()
+    assert _Reader.calls[-1] == (tmp_path, "b", {})
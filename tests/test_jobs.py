@@ -0,0 +1,143 @@
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from src.db.job_repo import (
+    append_job_log,
+    create_job,
+    fail_stale_jobs,
+    get_active_job,
+    get_job,
+    request_job_cancel,
+)
+from src.db.lock_repo import acquire_lock
+from src.db.schema import create_schema
+from src.pipeline import jobs
+from src.pipeline.jobs import PIPELINE_JOB_KIND, run_pipeline_job
+from src.pipeline.run_lock import PIPELINE_LOCK_NAME
+
+
+def _db(tmp_path) -> str:
+    db_path = str(tmp_path / "app.db")
+    conn = sqlite3.connect(db_path)
+    create_schema(conn)
+    conn.close()
+    return db_path
+
+
+def test_only_one_active_job_per_kind_and_stale_jobs_fail(tmp_path) -> None:
+    conn = sqlite3.connect(_db(tmp_path))
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    assert create_job(conn, "job1", "pipeline", now.isoformat(), {"embedding_model": "m"})
+    assert not create_job(conn, "job2", "pipeline", now.isoformat())
+    assert create_job(conn, "other", "export", now.isoformat())
+    assert get_job(conn, "job1")["params"] == {"embedding_model": "m"}
+
+    assert fail_stale_jobs(conn, now + timedelta(seconds=30), 60) == 0
+    assert fail_stale_jobs(conn, now + timedelta(seconds=90), 60) == 2
+    assert get_active_job(conn, "pipeline") is None
+    assert create_job(conn, "job2", "pipeline", now.isoformat())
+
+
+def test_job_log_keeps_only_the_tail(tmp_path) -> None:
+    conn = sqlite3.connect(_db(tmp_path))
+    create_job(conn, "job1", "pipeline", "2025-01-01T00:00:00+00:00")
+
+    append_job_log(conn, "job1", [f"line {idx}" for idx in range(5)], max_lines=3)
+    append_job_log(conn, "job1", ["line 5"], max_lines=3)
+
+    assert get_job(conn, "job1")["log_tail"] == "line 3\nline 4\nline 5"
+
+
+def test_run_pipeline_job_records_progress_and_logs(tmp_path, monkeypatch) -> None:
+    config = SimpleNamespace(db_path=_db(tmp_path))
+
+    def fake_run_pipeline(config, progress_cb=None, resume=False) -> bool:
+        logging.getLogger("src.pipeline.run").info("Parsing 2 PDF(s).")
+        progress_cb("Extracting candidates", 0.25)
+        return True
+
+    monkeypatch.setattr(jobs, "run_pipeline", fake_run_pipeline)
+    conn = sqlite3.connect(config.db_path)
+    create_job(conn, "job1", PIPELINE_JOB_KIND, "2025-01-01T00:00:00+00:00")
+
+    assert run_pipeline_job(config, "job1") == "completed"
+
+    job = get_job(conn, "job1")
+    assert job["status"] == "completed"
+    assert job["progress"] == 1.0
+    assert job["stage"] == "Extracting candidates"
+    assert job["log_tail"].splitlines() == [
+        "INFO src.pipeline.run: Parsing 2 PDF(s).",
+        "Extracting candidates",
+    ]
+
+
+def test_run_pipeline_job_stops_at_next_stage_after_cancel(tmp_path, monkeypatch) -> None:
+    config = SimpleNamespace(db_path=_db(tmp_path))
+    conn = sqlite3.connect(config.db_path)
+    stages = []
+
+    def fake_run_pipeline(config, progress_cb=None, resume=False) -> bool:
+        for stage in ("Preparing pipeline", "Extracting candidates"):
+            stages.append(stage)
+            request_job_cancel(conn, "job1")
+            progress_cb(stage, 0.1)
+        return True
+
+    monkeypatch.setattr(jobs, "run_pipeline", fake_run_pipeline)
+    create_job(conn, "job1", PIPELINE_JOB_KIND, "2025-01-01T00:00:00+00:00")
+
+    assert run_pipeline_job(config, "job1") == "cancelled"
+    assert stages == ["Preparing pipeline"]
+    assert get_job(conn, "job1")["status"] == "cancelled"
+
+    create_job(conn, "job2", PIPELINE_JOB_KIND, "2025-01-01T00:00:01+00:00")
+    request_job_cancel(conn, "job2")
+    assert run_pipeline_job(config, "job2") == "cancelled"
+    assert stages == ["Preparing pipeline"]
+
+
+def test_run_pipeline_job_reports_busy_when_the_lock_is_held(tmp_path, monkeypatch) -> None:
+    config = SimpleNamespace(db_path=_db(tmp_path))
+    calls = []
+    monkeypatch.setattr(jobs, "run_pipeline", lambda *args, **kwargs: calls.append(args))
+    conn = sqlite3.connect(config.db_path)
+    acquire_lock(conn, PIPELINE_LOCK_NAME, "cli", datetime.now(timezone.utc), 60)
+    create_job(conn, "job1", PIPELINE_JOB_KIND, "2025-01-01T00:00:00+00:00")
+
+    assert run_pipeline_job(config, "job1") == "busy"
+
+    assert calls == []
+    job = get_job(conn, "job1")
+    assert job["status"] == "busy"
+    assert "Another pipeline run is in progress" in job["log_tail"]
+
+
+
+def test_submit_resumes_after_a_cancelled_or_failed_job(tmp_path, monkeypatch) -> None:
+    config = SimpleNamespace(db_path=_db(tmp_path))
+    resumed = []
+    monkeypatch.setattr(
+        jobs,
+        "run_pipeline_job",
+        lambda config, job_id, resume=False: resumed.append(resume),
+    )
+    conn = sqlite3.connect(config.db_path)
+
+    def submit_and_finish(status: str, **kwargs) -> None:
+        job_id = jobs.submit_pipeline_job(config, **kwargs)
+        for thread in threading.enumerate():
+            if thread.name == f"pipeline-{job_id}":
+                thread.join()
+        jobs.finish_job(conn, job_id, status, datetime.now(timezone.utc).isoformat())
+
+    for status in ("completed", "cancelled", "failed", "cancelled"):
+        submit_and_finish(status)
+    submit_and_finish("completed", resume=False)
+    submit_and_finish("completed")
+
+    assert resumed == [False, False, True, True, False, False]
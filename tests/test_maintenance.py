@@ -0,0 +1,68 @@
+import sqlite3
+
+from src.db.connection import connect
+from src.db.embedding_cache_repo import get_cached_embeddings, set_cached_embeddings
+from src.db.maintenance import evict_cache_entries, maintain_database, table_sizes
+from src.db.schema import create_schema
+from src.db.token_cache_repo import (
+    get_token_count_cache_entries,
+    set_token_count_cache_entries,
+    touch_token_count_cache_entries,
+)
+
+
+def _set_last_used(conn: sqlite3.Connection, table: str, text_hash: str, used_at: str) -> None:
+    conn.execute(
+        f"UPDATE {table} SET last_used_at = ? WHERE text_hash = ?;", (used_at, text_hash)
+    )
+    conn.commit()
+
+
+def test_evict_cache_entries_by_age_spares_recently_used() -> None:
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+    set_token_count_cache_entries(conn, [("old", "m1", 3, "exact"), ("new", "m1", 4, "exact")])
+    _set_last_used(conn, "token_count_cache", "old", "2020-01-01T00:00:00+00:00")
+    _set_last_used(conn, "token_count_cache", "new", "2020-01-01T00:00:00+00:00")
+    touch_token_count_cache_entries(conn, ["new"], "m1")
+
+    evicted = evict_cache_entries(conn, older_than="2021-01-01T00:00:00+00:00")
+
+    assert evicted["token_count_cache"] == 1
+    assert list(get_token_count_cache_entries(conn, ["old", "new"], "m1")) == ["new"]
+
+
+def test_evict_cache_entries_to_size_budget_keeps_newest() -> None:
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+    for idx in range(4):
+        set_cached_embeddings(conn, [(f"h{idx}", [0.0] * 256)], "m1", 256, f"2025-01-0{idx + 1}")
+
+    evicted = evict_cache_entries(conn, max_bytes=2 * 1100)
+
+    assert evicted["embedding_cache"] == 2
+    assert sorted(get_cached_embeddings(conn, [f"h{idx}" for idx in range(4)], "m1", 256)) == [
+        "h2",
+        "h3",
+    ]
+
+
+def test_maintain_database_reclaims_pages_and_reports_sizes(tmp_path) -> None:
+    conn = connect(str(tmp_path / "app.db"))
+    assert conn.execute("PRAGMA auto_vacuum;").fetchone()[0] == 2
+    set_cached_embeddings(
+        conn, [(f"h{idx}", [0.5] * 1536) for idx in range(200)], "m1", 1536, "2020-01-01"
+    )
+    sizes = {size.name: size for size in table_sizes(conn)}
+    assert sizes["embedding_cache"].rows == 200
+    assert sizes["embedding_cache"].bytes > 200 * 1536 * 4
+
+    report = maintain_database(conn, older_than="2021-01-01")
+
+    assert report.evicted["embedding_cache"] == 200
+    assert report.freed_pages > 0
+    after = {size.name: size for size in report.sizes_after}
+    assert after["embedding_cache"].rows == 0
+    assert conn.execute(
+        "SELECT 1 FROM sqlite_schema WHERE name = 'sqlite_stat1';"
+    ).fetchone()
@@ -1,4 +1,4 @@
-﻿from src.pipeline.markdown_parser import parse_markdown
+﻿from src.pipeline.markdown_parser import _iter_lines, iter_markdown_blocks, parse_markdown
 
 
 def test_parse_markdown_creates_heading_and_paragraph_blocks() -> None:
@@ -12,3 +12,36 @@ def test_parse_markdown_creates_heading_and_paragraph_blocks() -> None:
     assert blocks[2].section_path == "Title > Section"
     assert blocks[3].block_type == "paragraph"
     assert blocks[3].section_path == "Title > Section"
+
+
+def test_iter_markdown_blocks_streams_from_line_iterator() -> None:
+    consumed = []
+
+    def lines():
+        for line in ["# Title", "", "Body one.", "", "## Section", "Body two."]:
+            consumed.append(line)
+            yield line
+
+    blocks = iter_markdown_blocks(lines())
+    first = next(blocks)
+    assert first.text == "Title"
+    assert len(consumed) < 6
+    rest = list(blocks)
+    assert [b.text for b in rest] == ["Body one.", "Section", "Body two."]
+    assert rest[-1].section_path == "Title > Section"
+
+
+def test_parse_markdown_splits_on_all_line_boundaries() -> None:
+    for text in (
+        "# A\rpara\r\r## B\rtext",
+        "# A\x0cpara\x0c\x0c## B\x0ctext",
+        "# A\r\npara\u2028\u2028## B\ntext\n",
+    ):
+        blocks = parse_markdown(text)
+        assert [(b.block_type, b.text) for b in blocks] == [
+            ("heading", "A"),
+            ("paragraph", "para"),
+            ("heading", "B"),
+            ("paragraph", "text"),
+        ]
+        assert list(_iter_lines(text)) == text.splitlines()
@@ -2,6 +2,7 @@ import sqlite3
 from datetime import datetime, timezone
 
 from src.db.domain_repo import (
+    insert_domains,
     list_block_domain_map,
     list_domain_aliases,
     list_domain_sources,
@@ -104,3 +105,31 @@ def test_persist_merge_results_creates_domains() -> None:
 
     mappings = list_block_domain_map(conn)
     assert len(mappings) == 2
+
+
+def test_persist_merge_results_numbers_new_domains_after_existing() -> None:
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+    insert_domains(conn, [("domain_002", "Existing", "t0")])
+    candidate = DomainCandidate(
+        candidate_id="c3",
+        candidate_name="Search",
+        normalized_name="search",
+        source_pdf_id="p3",
+        source_block_id="b3",
+        heading_level=1,
+        representative_text="Search",
+    )
+
+    persist_merge_results(
+        conn=conn,
+        clusters=[{"c3"}],
+        candidates={"c3": candidate},
+        review_items=[],
+        persist_pairs=[],
+        created_at="t1",
+        preferred_display_language="auto",
+        min_review_threshold=0.85,
+    )
+
+    assert [d["domain_id"] for d in list_domains(conn)] == ["domain_002", "domain_003"]
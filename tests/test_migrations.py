@@ -0,0 +1,98 @@
+import sqlite3
+
+import pytest
+
+from src.db.migrations import MIGRATIONS, SCHEMA_VERSION, migrate, schema_version
+from src.db.repo import insert_pdf, list_pdfs
+
+
+def test_migrate_sets_user_version_and_is_idempotent() -> None:
+    conn = sqlite3.connect(":memory:")
+    assert schema_version(conn) == 0
+
+    assert migrate(conn) == SCHEMA_VERSION
+    insert_pdf(conn, "pdf1", "a.pdf", "abc", "t0")
+    assert migrate(conn) == SCHEMA_VERSION
+
+    assert schema_version(conn) == SCHEMA_VERSION
+    assert len(list_pdfs(conn)) == 1
+
+
+def test_migrate_adopts_unversioned_database() -> None:
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        "CREATE TABLE pdfs(pdf_id TEXT PRIMARY KEY, file_path TEXT NOT NULL, "
+        "checksum TEXT NOT NULL, ingested_at TEXT NOT NULL);"
+    )
+    conn.execute("INSERT INTO pdfs VALUES('pdf1', 'a.pdf', 'abc', 't0');")
+    conn.commit()
+
+    migrate(conn)
+
+    assert schema_version(conn) == SCHEMA_VERSION
+    assert [row["pdf_id"] for row in list_pdfs(conn)] == ["pdf1"]
+
+
+def test_migrate_rejects_newer_database() -> None:
+    conn = sqlite3.connect(":memory:")
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1};")
+    with pytest.raises(ValueError):
+        migrate(conn)
+
+
+def test_migrate_adds_cascading_foreign_keys_and_keeps_foreign_keys_on() -> None:
+    conn = sqlite3.connect(":memory:")
+    conn.execute("PRAGMA foreign_keys = ON;")
+    for migration in MIGRATIONS[:7]:
+        migration(conn)
+    conn.execute("PRAGMA user_version = 7;")
+    conn.commit()
+
+    migrate(conn)
+
+    assert conn.execute("PRAGMA foreign_keys;").fetchone()[0] == 1
+    actions = {
+        (row[2], row[6])
+        for row in conn.execute("PRAGMA foreign_key_list(candidate_similarity);")
+    }
+    assert actions == {("domain_candidates", "CASCADE")}
+    primary_key = [
+        row[1]
+        for row in sorted(
+            conn.execute("PRAGMA table_info(candidate_similarity);"), key=lambda r: r[5]
+        )
+        if row[5]
+    ]
+    assert primary_key == ["candidate_a_id", "candidate_b_id", "mode"]
+    assert conn.execute("PRAGMA foreign_key_list(review_queue);").fetchall() == []
+
+
+def test_migrate_keys_similarity_pairs_by_mode() -> None:
+    conn = sqlite3.connect(":memory:")
+    for migration in MIGRATIONS[:11]:
+        migration(conn)
+    conn.execute("PRAGMA user_version = 11;")
+    insert_pdf(conn, "pdf1", "a.pdf", "abc", "t0")
+    conn.execute(
+        "INSERT INTO content_blocks(block_id, pdf_id, block_type, text) "
+        "VALUES('b1', 'pdf1', 'heading', 'x');"
+    )
+    conn.executemany(
+        "INSERT INTO domain_candidates VALUES(?, 'n', 'n', 'pdf1', 'b1', 1, 't');",
+        [("c1",), ("c2",)],
+    )
+    conn.execute("INSERT INTO candidate_similarity VALUES('c1', 'c2', 0.9, 'name_only');")
+    conn.commit()
+
+    migrate(conn)
+    conn.executemany(
+        "INSERT OR REPLACE INTO candidate_similarity VALUES('c1', 'c2', ?, ?);",
+        [(0.8, "name_plus_summary"), (0.95, "name_only")],
+    )
+
+    rows = conn.execute(
+        "SELECT mode, similarity FROM candidate_similarity ORDER BY mode;"
+    ).fetchall()
+    assert rows == [("name_only", 0.95), ("name_plus_summary", 0.8)]
+    indexes = {row[1] for row in conn.execute("PRAGMA index_list(candidate_similarity);")}
+    assert {"idx_candidate_similarity_mode", "idx_candidate_similarity_b"} <= indexes
@@ -0,0 +1,67 @@
+import sqlite3
+
+import pytest
+
+from src.db.candidate_repo import insert_candidates, iter_candidates
+from src.db.content_repo import insert_content_blocks, iter_content_block_rows
+from src.db.pagination import iter_keyset
+from src.db.schema import create_schema
+
+
+def _block(pdf_id: str, position: int) -> dict:
+    return {
+        "block_id": f"{pdf_id}_b{position:05d}",
+        "pdf_id": pdf_id,
+        "section_path": "",
+        "heading_level": 0,
+        "block_type": "paragraph",
+        "text": f"text {position}",
+        "page_index": 0,
+        "position_index": position,
+    }
+
+
+def test_iter_content_block_rows_pages_in_key_order() -> None:
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+    insert_content_blocks(
+        conn, [_block(pdf_id, idx) for pdf_id in ("pdf2", "pdf1") for idx in range(7)]
+    )
+
+    all_ids = [row["block_id"] for row in iter_content_block_rows(conn, page_size=3)]
+    assert all_ids == [f"{pdf}_b{idx:05d}" for pdf in ("pdf1", "pdf2") for idx in range(7)]
+
+    positions = list(
+        iter_content_block_rows(conn, "pdf2", page_size=2, row_factory=lambda row: row[-1])
+    )
+    assert positions == list(range(7))
+
+
+def test_iter_keyset_handles_exact_page_multiples_and_rejects_bad_page_size() -> None:
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+    insert_candidates(
+        conn,
+        [
+            {
+                "candidate_id": f"c{idx}",
+                "candidate_name": f"name {idx}",
+                "normalized_name": f"name {idx}",
+                "source_pdf_id": "pdf1",
+                "source_block_id": f"b{idx}",
+                "heading_level": 1,
+                "representative_text": "text",
+            }
+            for idx in range(4)
+        ],
+    )
+
+    ids = list(iter_candidates(conn, page_size=2, row_factory=lambda row: row[0]))
+    assert ids == ["c0", "c1", "c2", "c3"]
+
+    with pytest.raises(ValueError):
+        list(
+            iter_keyset(
+                conn, "domain_candidates", ("candidate_id",), ("candidate_id",), page_size=0
+            )
+        )
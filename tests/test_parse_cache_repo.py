@@ -0,0 +1,44 @@
+import sqlite3
+
+from src.db.parse_cache_repo import (
+    get_parse_cache,
+    get_parse_cache_stats,
+    record_parse_cache_lookup,
+    set_parse_cache,
+)
+from src.db.schema import create_schema
+
+
+def test_parse_cache_roundtrip_is_keyed_by_parser_version() -> None:
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+
+    content_list = [{"type": "text", "text": "Body", "page_idx": 0}]
+    set_parse_cache(
+        conn,
+        checksum="abc",
+        parser_name="mineru",
+        parse_method="auto",
+        parser_version="v1",
+        content_list=content_list,
+        markdown="# Title\n\nBody",
+        created_at="2025-01-01T00:00:00Z",
+    )
+
+    hit = get_parse_cache(conn, "abc", "mineru", "auto", "v1")
+    assert hit == {"content_list": content_list, "markdown": "# Title\n\nBody"}
+    assert get_parse_cache(conn, "abc", "mineru", "auto", "v2") is None
+    assert get_parse_cache(conn, "abc", "docling", "auto", "v1") is None
+
+
+def test_parse_cache_lookup_stats() -> None:
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+
+    record_parse_cache_lookup(conn, "abc", "mineru", "auto", "v1", hit=False)
+    record_parse_cache_lookup(conn, "abc", "mineru", "auto", "v1", hit=True)
+    record_parse_cache_lookup(conn, "def", "mineru", "auto", "v1", hit=True)
+
+    assert get_parse_cache_stats(conn) == [
+        {"parser_name": "mineru", "parse_method": "auto", "hits": 2, "misses": 1}
+    ]
@@ -0,0 +1,137 @@
+from src.pipeline import parse_stage
+from src.pipeline.ingest import ParsedDocument
+
+
+def _fake_parse_document(
+    file_path: str,
+    output_dir: str,
+    parser_name: str,
+    parse_method: str,
+    page_range=None,
+):
+    if file_path == "broken.pdf":
+        raise RuntimeError("parser exploded")
+    return ParsedDocument(
+        content_list=[],
+        markdown=f"# Title\n\nStored in {output_dir}.",
+        parser_name=parser_name,
+        parse_method=parse_method,
+    )
+
+
+def test_parse_pdfs_isolates_failures(monkeypatch) -> None:
+    monkeypatch.setattr(parse_stage, "parse_document", _fake_parse_document)
+    monkeypatch.setattr(parse_stage, "load_parser", lambda _: None)
+    pdfs = [
+        {"pdf_id": "p1", "file_path": "a.pdf", "checksum": "a" * 64},
+        {"pdf_id": "p2", "file_path": "broken.pdf", "checksum": "b" * 64},
+        {"pdf_id": "p3", "file_path": "c.pdf", "checksum": "c" * 64},
+    ]
+    outcomes = {
+        outcome.pdf_id: outcome
+        for outcome in parse_stage.parse_pdfs(
+            pdfs, output_dir="out", parser_name="mineru", parse_method="auto", workers=1
+        )
+    }
+    assert outcomes["p2"].error is not None
+    assert outcomes["p2"].parsed is None
+    blocks = parse_stage.build_content_blocks(outcomes["p1"].parsed, "p1")
+    assert [b["block_id"] for b in blocks] == ["p1_b00000", "p1_b00001"]
+    assert outcomes["p3"].parsed is not None
+
+
+def test_parse_pdfs_separates_output_by_checksum(monkeypatch) -> None:
+    monkeypatch.setattr(parse_stage, "parse_document", _fake_parse_document)
+    monkeypatch.setattr(parse_stage, "load_parser", lambda _: None)
+    pdfs = [
+        {"pdf_id": "p1", "file_path": "one/manual.pdf", "checksum": "1" * 64},
+        {"pdf_id": "p2", "file_path": "two/manual.pdf", "checksum": "2" * 64},
+    ]
+    markdowns = [
+        outcome.parsed.markdown
+        for outcome in parse_stage.parse_pdfs(
+            pdfs, output_dir="out", parser_name="mineru", parse_method="auto", workers=1
+        )
+    ]
+    assert markdowns[0] != markdowns[1]
+
+
+def test_build_content_blocks_falls_back_to_content_list() -> None:
+    parsed = ParsedDocument(
+        content_list=[
+            {"type": "text", "text": "First", "page_idx": 2},
+            {"type": "image", "img_path": "x.png"},
+            {"type": "text", "text": "  "},
+            {"type": "text", "text": "Second", "page_idx": 3},
+        ],
+        markdown="",
+        parser_name="mineru",
+        parse_method="auto",
+    )
+    blocks = parse_stage.build_content_blocks(parsed, "p1")
+    assert [b["text"] for b in blocks] == ["First", "Second"]
+    assert [b["position_index"] for b in blocks] == [0, 1]
+    assert [b["page_index"] for b in blocks] == [2, 3]
+
+
+def test_plan_page_shards_covers_every_page() -> None:
+    assert parse_stage.plan_page_shards(250, 100) == [(0, 99), (100, 199), (200, 249)]
+    assert parse_stage.plan_page_shards(80, 100) == [(0, 79)]
+
+
+def _document_pages():
+    return [
+        ("# Install", "Install"),
+        ("Run the installer.", "Run the installer."),
+        ("## Configure SSO", "Configure SSO"),
+        ("Open the identity provider settings.", "Open the identity provider settings."),
+    ]
+
+
+def _fake_sharded_parse(
+    file_path: str,
+    output_dir: str,
+    parser_name: str,
+    parse_method: str,
+    page_range=None,
+):
+    pages = _document_pages()
+    start, end = page_range if page_range is not None else (0, len(pages) - 1)
+    selected = pages[start : end + 1]
+    return ParsedDocument(
+        content_list=[
+            {"type": "text", "text": text, "page_idx": offset}
+            for offset, (_, text) in enumerate(selected)
+        ],
+        markdown="\n\n".join(markdown for markdown, _ in selected),
+        parser_name=parser_name,
+        parse_method=parse_method,
+    )
+
+
+def _blocks_for(monkeypatch, shard_pages: int):
+    monkeypatch.setattr(parse_stage, "parse_document", _fake_sharded_parse)
+    monkeypatch.setattr(parse_stage, "load_parser", lambda _: None)
+    monkeypatch.setattr(parse_stage, "count_pdf_pages", lambda _: 4)
+    [outcome] = list(
+        parse_stage.parse_pdfs(
+            [{"pdf_id": "p1", "file_path": "big.pdf", "checksum": "f" * 64}],
+            output_dir="out",
+            parser_name="mineru",
+            parse_method="auto",
+            workers=1,
+            shard_pages=shard_pages,
+        )
+    )
+    return outcome, parse_stage.build_content_blocks(outcome.parsed, "p1")
+
+
+def test_sharded_parse_matches_unsharded_blocks(monkeypatch) -> None:
+    whole, whole_blocks = _blocks_for(monkeypatch, shard_pages=0)
+    sharded, sharded_blocks = _blocks_for(monkeypatch, shard_pages=1)
+
+    assert whole.shard_count == 1
+    assert sharded.shard_count == 4
+    assert sharded_blocks == whole_blocks
+    assert [b["page_index"] for b in sharded_blocks] == [0, 1, 2, 3]
+    assert sharded_blocks[3]["section_path"] == "Install > Configure SSO"
@@ -0,0 +1,84 @@
+import hashlib
+import io
+import sqlite3
+
+from src.db.repo import insert_pdf, list_pdfs
+from src.db.schema import create_schema
+from src.pipeline.pdf_registry import (
+    file_checksum,
+    register_pdf_directory,
+    store_pdf_streams,
+)
+
+
+class _CountingStream(io.BytesIO):
+    def __init__(self, data: bytes) -> None:
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+def test_file_checksum_streams_in_chunks(tmp_path) -> None:
+    path = tmp_path / "a.pdf"
+    data = b"%PDF-" + bytes(range(256)) * 50
+    path.write_bytes(data)
+    assert file_checksum(path, chunk_size=7) == hashlib.sha256(data).hexdigest()
+
+
+def test_register_pdf_directory_dedupes_and_registers(tmp_path) -> None:
+    source = tmp_path / "incoming"
+    (source / "nested").mkdir(parents=True)
+    (source / "a.pdf").write_bytes(b"alpha")
+    (source / "nested" / "copy of a.PDF").write_bytes(b"alpha")
+    (source / "b.pdf").write_bytes(b"beta")
+    (source / "known.pdf").write_bytes(b"known")
+    (source / "notes.txt").write_bytes(b"ignored")
+    storage = tmp_path / "storage"
+
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+    known = hashlib.sha256(b"known").hexdigest()
+    insert_pdf(conn, f"pdf_{known}", "existing.pdf", known, "2024-01-01T00:00:00+00:00")
+
+    result = register_pdf_directory(conn, source, storage, link=True, workers=4)
+
+    assert len(result.registered) == 2
+    assert len(result.duplicates) == 2
+    rows = {row["checksum"]: row for row in list_pdfs(conn)}
+    beta = hashlib.sha256(b"beta").hexdigest()
+    assert rows[beta]["pdf_id"] == f"pdf_{beta}"
+    assert (storage / f"{beta}_b.pdf").read_bytes() == b"beta"
+    assert len(list(storage.iterdir())) == 2
+
+
+def test_uploads_are_hashed_before_only_new_ones_are_written(tmp_path) -> None:
+    storage = tmp_path / "storage"
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+    known = hashlib.sha256(b"known").hexdigest()
+    insert_pdf(conn, f"pdf_{known}", "existing.pdf", known, "2024-01-01T00:00:00+00:00")
+
+    fresh_data = b"fresh" * 1000
+    first = _CountingStream(fresh_data)
+    duplicate = _CountingStream(b"known")
+    again = _CountingStream(fresh_data)
+    stored = store_pdf_streams(
+        conn,
+        [(first, "new file.pdf"), (duplicate, "known.pdf"), (again, "again.pdf")],
+        storage,
+        workers=3,
+    )
+
+    fresh = hashlib.sha256(fresh_data).hexdigest()
+    target = storage / f"{fresh}_new_file.pdf"
+    assert stored == [str(target), "existing.pdf", str(target)]
+    assert [path.name for path in storage.iterdir()] == [target.name]
+    assert target.read_bytes() == fresh_data
+    assert len(list_pdfs(conn)) == 2
+    assert first.bytes_read == 2 * len(fresh_data)
+    assert duplicate.bytes_read == len(b"known")
+    assert again.bytes_read == len(fresh_data)
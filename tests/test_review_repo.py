@@ -1,11 +1,14 @@
 import sqlite3
 from datetime import datetime, timezone
 
+from src.db.migrations import MIGRATIONS, migrate
 from src.db.review_repo import (
     has_review_pair,
     insert_review_item,
+    insert_review_items,
     list_pending_reviews,
     list_rejected_pairs,
+    list_review_pairs,
     resolve_review,
 )
 from src.db.schema import create_schema
@@ -73,3 +76,43 @@ def test_review_queue_pair_helpers() -> None:
     assert has_review_pair(conn, "c2", "c1") is True
     rejected = list_rejected_pairs(conn)
     assert ("c1", "c2") in rejected
+
+
+def test_review_pairs_are_canonical_and_deduplicated() -> None:
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+    now = datetime.now(timezone.utc).isoformat()
+
+    insert_review_items(
+        conn,
+        [
+            ("r4", "c9", "c1", 0.88, "review_band", "rejected", now),
+            ("r5", "c1", "c9", 0.88, "review_band", "pending", now),
+        ],
+    )
+
+    assert list_review_pairs(conn) == {("c1", "c9")}
+    assert list_rejected_pairs(conn) == {("c1", "c9")}
+    assert list_pending_reviews(conn) == []
+
+
+def test_migration_canonicalizes_existing_review_pairs() -> None:
+    conn = sqlite3.connect(":memory:")
+    MIGRATIONS[0](conn)
+    conn.execute("PRAGMA user_version = 1;")
+    conn.executemany(
+        "INSERT INTO review_queue VALUES(?, ?, ?, 0.9, 'band', ?, ?, NULL);",
+        [
+            ("r1", "c2", "c1", "pending", "t0"),
+            ("r2", "c1", "c2", "rejected", "t1"),
+            ("r3", "c4", "c3", "pending", "t0"),
+        ],
+    )
+    conn.commit()
+
+    migrate(conn)
+
+    rows = conn.execute(
+        "SELECT review_id, candidate_a_id, candidate_b_id FROM review_queue ORDER BY review_id;"
+    ).fetchall()
+    assert rows == [("r2", "c1", "c2"), ("r3", "c3", "c4")]
@@ -0,0 +1,38 @@
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+
+from src.db.lock_repo import acquire_lock, get_lock
+from src.db.schema import create_schema
+from src.pipeline.run_lock import pipeline_lock
+
+
+def test_acquire_lock_respects_holder_until_stale(tmp_path) -> None:
+    conn = sqlite3.connect(tmp_path / "app.db")
+    create_schema(conn)
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    assert acquire_lock(conn, "pipeline", "cli", now, stale_after_seconds=60)
+    assert not acquire_lock(conn, "pipeline", "ui", now + timedelta(seconds=30), 60)
+    assert acquire_lock(conn, "pipeline", "ui", now + timedelta(seconds=90), 60)
+    assert get_lock(conn, "pipeline")["owner"] == "ui"
+
+
+def test_pipeline_lock_is_reentrant_but_exclusive_across_threads(tmp_path) -> None:
+    db_path = str(tmp_path / "app.db")
+    results = []
+
+    def contender() -> None:
+        with pipeline_lock(db_path) as acquired:
+            results.append(acquired)
+
+    with pipeline_lock(db_path) as outer:
+        with pipeline_lock(db_path) as inner:
+            thread = threading.Thread(target=contender)
+            thread.start()
+            thread.join()
+        assert outer and inner
+
+    assert results == [False]
+    conn = sqlite3.connect(db_path)
+    assert get_lock(conn, "pipeline") is None
@@ -0,0 +1,72 @@
+from dataclasses import replace
+
+import pytest
+
+from src.config import load_config
+from src.db.candidate_repo import list_candidates
+from src.db.connection import connect
+from src.db.content_repo import insert_content_blocks
+from src.db.repo import insert_pdf
+from src.pipeline import run
+
+
+class _Stop(Exception):
+    pass
+
+
+def _stop_at(stage: str):
+    def report(message: str, pct: float) -> None:
+        if message == stage:
+            raise _Stop(message)
+
+    return report
+
+
+def test_run_reprocesses_a_pdf_stopped_before_candidate_extraction(
+    tmp_path, monkeypatch
+) -> None:
+    config = replace(
+        load_config(),
+        db_path=str(tmp_path / "app.db"),
+        rag_output_dir=str(tmp_path / "rag"),
+        skip_processed_pdfs=True,
+    )
+    monkeypatch.setattr(run, "AzureOpenAIEmbedder", lambda **kwargs: object())
+    conn = connect(config.db_path)
+    insert_pdf(conn, "pdf1", "a.pdf", "sum1", "t0")
+    insert_pdf(conn, "pdf2", "b.pdf", "sum2", "t0")
+    insert_content_blocks(
+        conn,
+        [
+            {
+                "block_id": "pdf1_b0",
+                "pdf_id": "pdf1",
+                "block_type": "heading",
+                "heading_level": 1,
+                "text": "Payments",
+                "position_index": 0,
+            },
+            {
+                "block_id": "pdf2_b0",
+                "pdf_id": "pdf2",
+                "block_type": "paragraph",
+                "text": "No headings here.",
+                "position_index": 0,
+            },
+        ],
+    )
+
+    with pytest.raises(_Stop):
+        run.run_pipeline(
+            config, progress_cb=_stop_at("Extracting candidates"), pdf_ids={"pdf1"}
+        )
+    assert list_candidates(conn) == []
+    assert run._select_pdfs_to_process(conn, run._list_pdfs(conn), True) == [
+        {"pdf_id": "pdf1", "file_path": "a.pdf", "checksum": "sum1", "ingested_at": "t0"}
+    ]
+
+    with pytest.raises(_Stop):
+        run.run_pipeline(config, progress_cb=_stop_at("Embedding candidates"))
+    assert [row["candidate_id"] for row in list_candidates(conn)] == ["pdf1_b0"]
+    assert run._select_pdfs_to_process(conn, run._list_pdfs(conn), True) == []
+    conn.close()
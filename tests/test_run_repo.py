@@ -0,0 +1,40 @@
+import sqlite3
+
+from src.db.run_repo import (
+    create_pipeline_run,
+    get_resumable_run,
+    list_stage_checkpoints,
+    set_stage_checkpoint,
+    set_stage_checkpoints,
+    update_pipeline_run,
+)
+from src.db.schema import create_schema
+
+
+def test_only_latest_unfinished_run_is_resumable() -> None:
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+
+    create_pipeline_run(conn, "run_a", "2025-01-01T00:00:00Z")
+    assert get_resumable_run(conn)["run_id"] == "run_a"
+
+    update_pipeline_run(conn, "run_a", "failed", "2025-01-01T00:05:00Z", error="boom")
+    assert get_resumable_run(conn)["error"] == "boom"
+
+    create_pipeline_run(conn, "run_b", "2025-01-02T00:00:00Z")
+    update_pipeline_run(conn, "run_b", "completed", "2025-01-02T00:05:00Z")
+    assert get_resumable_run(conn) is None
+
+
+def test_stage_checkpoints_roundtrip() -> None:
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+    create_pipeline_run(conn, "run_a", "2025-01-01T00:00:00Z")
+
+    set_stage_checkpoints(conn, "run_a", "parse", ["pdf1", "pdf2"], "pending", "t0")
+    set_stage_checkpoint(conn, "run_a", "parse", "pdf1", "parsed", "t1")
+    set_stage_checkpoint(conn, "run_a", "parse", "pdf2", "failed", "t1", detail="bad pdf")
+    rows = {row["unit_id"]: row for row in list_stage_checkpoints(conn, "run_a", "parse")}
+    assert rows["pdf1"]["status"] == "parsed"
+    assert rows["pdf2"]["status"] == "failed"
+    assert rows["pdf2"]["detail"] == "bad pdf"
@@ -0,0 +1,80 @@
+from src.db.connection import connect
+from src.db.content_repo import delete_content_blocks_for_pdf, insert_content_blocks
+from src.db.domain_repo import insert_domain_aliases, insert_domains
+from src.db.maintenance import full_vacuum
+from src.db.repo import insert_pdf
+from src.db.search_repo import search_content_blocks, search_domain_aliases
+
+
+def _block(block_id: str, pdf_id: str, section_path: str, text: str, position: int) -> dict:
+    return {
+        "block_id": block_id,
+        "pdf_id": pdf_id,
+        "section_path": section_path,
+        "heading_level": 0,
+        "block_type": "paragraph",
+        "text": text,
+        "page_index": 0,
+        "position_index": position,
+    }
+
+
+def test_search_content_blocks_ranks_matches_and_tracks_writes(tmp_path) -> None:
+    conn = connect(str(tmp_path / "app.db"))
+    insert_pdf(conn, "pdf1", "manuals/a.pdf", "abc", "t0")
+    insert_pdf(conn, "pdf2", "manuals/b.pdf", "def", "t0")
+    insert_content_blocks(
+        conn,
+        [
+            _block("pdf1_b0", "pdf1", "Security", "SSO setup: enable SSO, then test SSO.", 0),
+            _block("pdf1_b1", "pdf1", "Billing", "Invoices are sent monthly.", 1),
+            _block("pdf2_b0", "pdf2", "登入", "使用單一登入 SSO 登入系統", 0),
+        ],
+    )
+
+    hits = search_content_blocks(conn, "sso")
+    assert [hit["block_id"] for hit in hits] == ["pdf1_b0", "pdf2_b0"]
+    assert "**SSO**" in hits[0]["snippet"]
+    assert hits[0]["file_path"] == "manuals/a.pdf"
+    assert [hit["block_id"] for hit in search_content_blocks(conn, "單一登入")] == ["pdf2_b0"]
+    assert [hit["block_id"] for hit in search_content_blocks(conn, "sso", pdf_id="pdf2")] == [
+        "pdf2_b0"
+    ]
+    assert [hit["block_id"] for hit in search_content_blocks(conn, "登入 SSO")] == ["pdf2_b0"]
+    assert search_content_blocks(conn, '"unbalanced') == []
+    assert search_content_blocks(conn, "  ") == []
+
+    insert_content_blocks(
+        conn, [_block("pdf1_b1", "pdf1", "Billing", "Invoices support SSO login.", 1)]
+    )
+    assert {hit["block_id"] for hit in search_content_blocks(conn, "invoices sso")} == {
+        "pdf1_b1"
+    }
+    assert search_content_blocks(conn, "monthly") == []
+
+    delete_content_blocks_for_pdf(conn, "pdf1")
+    full_vacuum(conn)
+    assert [hit["block_id"] for hit in search_content_blocks(conn, "sso")] == ["pdf2_b0"]
+
+
+def test_search_domain_aliases_returns_owning_domain(tmp_path) -> None:
+    conn = connect(str(tmp_path / "app.db"))
+    insert_pdf(conn, "pdf1", "a.pdf", "abc", "t0")
+    insert_domains(conn, [("domain_001", "Identity", "t0"), ("domain_002", "Billing", "t0")])
+    insert_domain_aliases(
+        conn,
+        [
+            ("domain_001", "Single Sign-On", "pdf1", 1),
+            ("domain_001", "SSO", "pdf1", 2),
+            ("domain_002", "Invoicing", "pdf1", 1),
+        ],
+    )
+
+    hits = search_domain_aliases(conn, "sign-on")
+    assert [(hit["domain_id"], hit["display_name"]) for hit in hits] == [
+        ("domain_001", "Identity")
+    ]
+    conn.execute("DELETE FROM domains WHERE domain_id = 'domain_001';")
+    conn.commit()
+    assert search_domain_aliases(conn, "sso") == []
+    assert [hit["alias"] for hit in search_domain_aliases(conn, "invoic")] == ["Invoicing"]
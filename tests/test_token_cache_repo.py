@@ -1,16 +1,22 @@
 import sqlite3
 
+from src.db.migrations import MIGRATIONS, migrate
 from src.db.schema import create_schema
 from src.db.token_cache_repo import (
     get_token_count_cache,
     set_token_count_cache,
     get_trunc_text_cache,
     set_trunc_text_cache,
+    get_token_count_cache_entries,
+    set_token_count_cache_entries,
     get_token_count_cache_for_text,
     set_token_count_cache_for_text,
+    get_trunc_text_cache_entries,
     get_trunc_text_cache_for_text,
     set_trunc_text_cache_for_text,
 )
+from src.pipeline.embedding import _prepare_texts
+from src.pipeline.hash_utils import text_hash
 
 
 def test_token_count_cache_roundtrip() -> None:
@@ -66,3 +72,68 @@ def test_token_cache_helpers_use_text_hash() -> None:
     )
     row = get_trunc_text_cache_for_text(conn, text="world", model_name="m1", max_tokens=3)
     assert row["truncated_text"] == "wor"
+
+
+def test_untruncated_text_is_stored_as_null() -> None:
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+
+    set_trunc_text_cache_for_text(
+        conn,
+        text="short",
+        model_name="m1",
+        max_tokens=10,
+        truncated_text="short",
+        tokenization_mode="exact",
+    )
+    row = get_trunc_text_cache(conn, text_hash=text_hash("short"), model_name="m1", max_tokens=10)
+    assert row["truncated_text"] is None
+    row = get_trunc_text_cache_for_text(conn, text="short", model_name="m1", max_tokens=10)
+    assert row["truncated_text"] == "short"
+
+
+def test_bulk_token_count_lookup_spans_chunks() -> None:
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+
+    set_token_count_cache_entries(
+        conn, [(f"h{idx}", "m1", idx, "exact") for idx in range(1200)]
+    )
+    found = get_token_count_cache_entries(conn, ["h0", "h999", "h1199", "missing"], "m1")
+
+    assert sorted(found) == ["h0", "h1199", "h999"]
+    assert found["h999"]["token_count"] == 999
+
+
+def test_prepare_texts_caches_each_distinct_text_once() -> None:
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+    texts = ["alpha beta", "gamma", "alpha beta"]
+
+    first = _prepare_texts(conn, texts, "m1", 100, True)
+    second = _prepare_texts(conn, texts, "m1", 100, True)
+
+    assert first == second
+    assert first[0] == texts
+    hashes = [text_hash(text) for text in texts]
+    trunc_rows = get_trunc_text_cache_entries(conn, hashes, "m1", 100)
+    assert len(trunc_rows) == 2
+    assert all(row["truncated_text"] is None for row in trunc_rows.values())
+    assert len(get_token_count_cache_entries(conn, hashes, "m1")) == 2
+
+
+def test_migration_nulls_untruncated_cache_rows() -> None:
+    conn = sqlite3.connect(":memory:")
+    MIGRATIONS[0](conn)
+    conn.execute("PRAGMA user_version = 1;")
+    conn.executemany(
+        "INSERT INTO trunc_text_cache VALUES(?, 'm1', 3, ?, 'exact');",
+        [(text_hash("abc"), "abc"), (text_hash("abcdef"), "abc")],
+    )
+    conn.commit()
+
+    migrate(conn)
+
+    rows = get_trunc_text_cache_entries(conn, [text_hash("abc"), text_hash("abcdef")], "m1", 3)
+    assert rows[text_hash("abc")]["truncated_text"] is None
+    assert rows[text_hash("abcdef")]["truncated_text"] == "abc"
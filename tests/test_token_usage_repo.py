@@ -2,7 +2,9 @@ import sqlite3
 
 from src.db.schema import create_schema
 from src.db.token_usage_repo import (
+    cache_hit_rate,
     get_latest_run_usage,
+    get_total_cache_usage,
     get_total_usage,
     insert_token_usage,
 )
@@ -25,6 +27,8 @@ def test_token_usage_repo_roundtrip() -> None:
         model_name="text-embedding-3-small",
         total_tokens=80,
         created_at="2025-01-02T00:00:00Z",
+        cache_hits=95,
+        cache_misses=5,
     )
     insert_token_usage(
         conn,
@@ -47,3 +51,7 @@ def test_token_usage_repo_roundtrip() -> None:
         "text-embedding-3-large": 200,
         "text-embedding-3-small": 200,
     }
+    assert latest.cache_by_model["text-embedding-3-small"] == (95, 5)
+    assert get_total_cache_usage(conn)["text-embedding-3-small"] == (95, 5)
+    assert cache_hit_rate(95, 5) == 0.95
+    assert cache_hit_rate(0, 0) is None
@@ -68,3 +68,59 @@ def test_exact_token_count_fallback_to_cl100k_base() -> None:
         else:
             sys.modules.pop("tiktoken", None)
         importlib.reload(tokenization)
+
+
+def test_tokenize_texts_encodes_each_text_once_in_a_batch() -> None:
+    calls = []
+
+    class FakeEncoding:
+        def encode(self, text: str) -> list[int]:
+            calls.append(("encode", text))
+            return list(range(len(text)))
+
+        def encode_batch(self, texts: list[str], num_threads: int) -> list[list[int]]:
+            calls.append(("encode_batch", tuple(texts)))
+            return [list(range(len(text))) for text in texts]
+
+        def decode(self, tokens: list[int]) -> str:
+            return "x" * len(tokens)
+
+    original = tokenization._get_tiktoken_encoding
+    try:
+        tokenization._get_tiktoken_encoding = lambda _: FakeEncoding()
+        results = tokenization.tokenize_texts(
+            ["abc", "abcdefgh"], model_name="m", max_tokens=5, approx_enabled=False
+        )
+    finally:
+        tokenization._get_tiktoken_encoding = original
+
+    assert calls == [("encode_batch", ("abc", "abcdefgh"))]
+    assert results == [
+        tokenization.TokenizedText("abc", 3, "exact"),
+        tokenization.TokenizedText("xxxxx", 5, "exact"),
+    ]
+
+
+def test_tiktoken_encoding_is_resolved_once_per_model() -> None:
+    original = sys.modules.get("tiktoken")
+    fake = ModuleType("tiktoken")
+    lookups = []
+
+    def encoding_for_model(name: str):
+        lookups.append(name)
+        return object()
+
+    fake.encoding_for_model = encoding_for_model
+    sys.modules["tiktoken"] = fake
+    importlib.reload(tokenization)
+    try:
+        first = tokenization._get_tiktoken_encoding("m1")
+        assert tokenization._get_tiktoken_encoding("m1") is first
+        tokenization._get_tiktoken_encoding("m2")
+        assert lookups == ["m1", "m2"]
+    finally:
+        if original is not None:
+            sys.modules["tiktoken"] = original
+        else:
+            sys.modules.pop("tiktoken", None)
+        importlib.reload(tokenization)
@@ -0,0 +1,36 @@
+import sqlite3
+
+import pytest
+
+from src.db.domain_repo import insert_domain, insert_domains, list_domains
+from src.db.schema import create_schema
+from src.db.transaction import unit_of_work
+
+
+def test_unit_of_work_commits_once_at_outermost_exit(tmp_path) -> None:
+    db_path = tmp_path / "app.db"
+    conn = sqlite3.connect(db_path)
+    create_schema(conn)
+    observer = sqlite3.connect(db_path)
+
+    with unit_of_work(conn):
+        insert_domain(conn, "domain_001", "Billing", "t0")
+        with unit_of_work(conn):
+            insert_domains(conn, [("domain_002", "Search", "t0")])
+        assert observer.execute("SELECT COUNT(*) FROM domains;").fetchone()[0] == 0
+
+    assert observer.execute("SELECT COUNT(*) FROM domains;").fetchone()[0] == 2
+
+
+def test_unit_of_work_rolls_back_on_error() -> None:
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+
+    with pytest.raises(RuntimeError):
+        with unit_of_work(conn):
+            insert_domain(conn, "domain_001", "Billing", "t0")
+            raise RuntimeError("boom")
+
+    assert list_domains(conn) == []
+    insert_domain(conn, "domain_002", "Search", "t0")
+    assert [row["domain_id"] for row in list_domains(conn)] == ["domain_002"]
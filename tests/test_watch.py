@@ -0,0 +1,70 @@
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+from src.pipeline import watch
+from src.pipeline.watch import ArrivalQueue, watch_directory
+
+
+def test_arrival_queue_debounces_until_files_stop_changing() -> None:
+    queue = ArrivalQueue(debounce_seconds=5)
+    a = Path("a.pdf")
+    b = Path("b.pdf")
+
+    queue.observe({a: (10, 1)}, now=0)
+    queue.observe({a: (20, 2), b: (5, 1)}, now=3)
+    assert queue.take_ready(now=6) == []
+    assert queue.take_ready(now=8) == [a, b]
+
+    queue.mark_handled([a, b])
+    assert queue.is_drained()
+    queue.observe({a: (20, 2), b: (5, 1)}, now=9)
+    assert queue.is_drained()
+
+    queue.observe({a: (30, 3)}, now=10)
+    assert not queue.is_drained()
+    assert queue.take_ready(now=15) == [a]
+
+
+def test_arrival_queue_forgets_deleted_files() -> None:
+    queue = ArrivalQueue(debounce_seconds=0)
+    a = Path("a.pdf")
+    queue.observe({a: (10, 1)}, now=0)
+    queue.mark_handled(queue.take_ready(now=0))
+
+    queue.observe({}, now=1)
+    assert queue._handled == {}
+
+    queue.observe({a: (10, 1)}, now=2)
+    assert queue.take_ready(now=2) == [a]
+
+
+def test_watch_directory_survives_a_failing_run(tmp_path, monkeypatch) -> None:
+    config = SimpleNamespace(
+        db_path=str(tmp_path / "app.db"), pdf_storage_dir=str(tmp_path / "store")
+    )
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    (inbox / "a.pdf").write_bytes(b"%PDF-1.4 a")
+    stop = threading.Event()
+    runs = []
+    passes = []
+
+    def fake_run_pipeline(config, pdf_ids=None):
+        runs.append(set(pdf_ids))
+        if len(runs) == 1:
+            raise RuntimeError("embedding API unavailable")
+        return True
+
+    def on_pass(success: bool) -> None:
+        passes.append(success)
+        stop.set()
+
+    monkeypatch.setattr(watch, "parse_registered_pdfs", lambda config, pdf_ids: True)
+    monkeypatch.setattr(watch, "run_pipeline", fake_run_pipeline)
+
+    watch_directory(config, inbox, 0, 0.01, stop=stop, on_pass=on_pass)
+
+    assert len(runs) == 2
+    assert runs[0] == runs[1]
+    assert passes == [True]